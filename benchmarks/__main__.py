@@ -0,0 +1,89 @@
+"""Command-line entry point: ``python -m benchmarks run|compare|load``."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from .cases import ASYNC_CASES, SYNC_CASES
+from .harness import BenchResult, compare as compare_results, report
+from .load import run_load
+from .nimble_sim import SimConfig
+
+cli = typer.Typer(help="Controller hot-path benchmarks")
+
+
+@cli.command()
+def run(
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write JSON results to this file"),
+    only: List[str] = typer.Option([], "--only", help="Restrict to these case groups"),
+    scale: float = typer.Option(1.0, "--scale", help="Multiply iteration counts"),
+) -> None:
+    """Run the benchmark suite and print JSON results."""
+    results: List[BenchResult] = []
+    for name, case in SYNC_CASES.items():
+        if not only or name in only:
+            results.extend(case(scale))
+    for name, async_case in ASYNC_CASES.items():
+        if not only or name in only:
+            results.extend(asyncio.run(async_case(scale)))
+    data = json.dumps(report(results), indent=2)
+    if output:
+        output.write_text(data + "\n", encoding="utf-8")
+    typer.echo(data)
+
+
+@cli.command()
+def compare(
+    baseline: Path = typer.Argument(..., exists=True, dir_okay=False),
+    current: Path = typer.Argument(..., exists=True, dir_okay=False),
+    threshold: float = typer.Option(0.10, "--threshold", help="Allowed relative slowdown"),
+) -> None:
+    """Compare two result files and exit non-zero on regressions."""
+    regressions = compare_results(
+        json.loads(baseline.read_text(encoding="utf-8")),
+        json.loads(current.read_text(encoding="utf-8")),
+        threshold=threshold,
+    )
+    for regression in regressions:
+        typer.echo(
+            f"REGRESSION {regression.name} {regression.metric}: "
+            f"{regression.baseline:.2f} -> {regression.current:.2f} ({regression.change:+.1%})"
+        )
+    if regressions:
+        raise typer.Exit(code=1)
+    typer.echo("no regressions")
+
+
+@cli.command()
+def load(
+    streams: int = typer.Option(1000, "--streams", help="Number of simulated streams"),
+    url: Optional[str] = typer.Option(None, "--url", help="Simulator base URL; omit to run it in-process"),
+    hosts: int = typer.Option(2, "--hosts", help="Simulated primary/backup node pairs (in-process only)"),
+    workers: int = typer.Option(32, "--workers", help="Reconcile scheduler workers"),
+    per_host: int = typer.Option(16, "--per-host", help="Concurrent calls per origin host"),
+    latency_ms: float = typer.Option(5.0, "--latency-ms", help="Mean simulated latency"),
+    latency_dist: str = typer.Option("lognormal", "--latency-dist", help="fixed, uniform or lognormal"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Fraction of requests answered with 503"),
+    rate_limit: float = typer.Option(0.0, "--rate-limit", help="Requests per second per node before 429"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write JSON results to this file"),
+) -> None:
+    """Reconcile and poll stats for many streams against simulated Nimble nodes."""
+    # Injected failures are counted in the report; don't log each one.
+    logging.getLogger("controller.adapters").setLevel(logging.CRITICAL)
+    sim = SimConfig(latency_ms=latency_ms, latency_dist=latency_dist, error_rate=error_rate, rate_limit=rate_limit)
+    outcome = asyncio.run(
+        run_load(streams, sim=sim, url=url, hosts=hosts, workers=workers, per_host=per_host)
+    )
+    data = json.dumps({**report(outcome.pop("results")), **outcome}, indent=2)
+    if output:
+        output.write_text(data + "\n", encoding="utf-8")
+    typer.echo(data)
+
+
+if __name__ == "__main__":
+    cli()
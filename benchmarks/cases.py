@@ -0,0 +1,150 @@
+"""Benchmark cases for the sign, policy, API and reconcile hot paths."""
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from controller.config_loader import load_from_directory
+from controller.core.models import IngestSpec, PlaybackProfile, SignRequest, StreamStats, TokenRules
+from controller.core.policy import CompiledPolicyEngine, PolicyEngine
+from controller.core.signer import SigningKey, URLSigner
+from controller.repository import Repository
+
+from .harness import BenchResult, run_async, run_sync
+from .policy_lookup import build_fixture
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+
+
+def bench_signer(scale: float) -> List[BenchResult]:
+    client, stream = build_fixture(1)
+    signer = URLSigner({"v1": SigningKey(kid="v1", secret=b"bench-secret")})
+    request = SignRequest(client_id=client.id, stream_id=stream.id)
+    signed = signer.sign(client=client, stream=stream, request=request, expiry=4102444800)
+    uri = signed.url.split("https://cdn.example", 1)[1]
+    payload, _, signature = uri.rpartition("&sig=")
+    iterations = int(50000 * scale)
+    return [
+        run_sync(
+            "signer.sign",
+            lambda: signer.sign(client=client, stream=stream, request=request, expiry=4102444800),
+            iterations=iterations,
+        ),
+        run_sync("signer.verify", lambda: signer.verify(payload, signature=signature), iterations=iterations),
+        run_sync("signer.verify_uri", lambda: signer.verify_uri(uri, now=1700000000), iterations=iterations),
+    ]
+
+
+def bench_policy(scale: float) -> List[BenchResult]:
+    client, stream = build_fixture(1000)
+    request = SignRequest(client_id=client.id, stream_id=stream.id, ip="203.0.113.77", country="SE")
+    compiled = CompiledPolicyEngine({client.id: client}, {stream.id: stream})
+    plain = PolicyEngine({client.id: client}, {stream.id: stream})
+    return [
+        run_sync(
+            "policy.authorize.compiled_1000_cidrs",
+            lambda: compiled.authorize(request, ip=request.ip, country=request.country),
+            iterations=int(50000 * scale),
+        ),
+        run_sync(
+            "policy.authorize.plain_1000_cidrs",
+            lambda: plain.authorize(request, ip=request.ip, country=request.country),
+            iterations=max(10, int(200 * scale)),
+            warmup=5,
+        ),
+    ]
+
+
+async def bench_api_sign(scale: float) -> List[BenchResult]:
+    from controller.api.routes import get_state
+    from controller.app import create_app
+    from controller.state import AppState
+
+    state = AppState(config_dir=str(CONFIG_DIR))
+    app = create_app()
+    app.dependency_overrides[get_state] = lambda: state
+    payload = {
+        "client_id": "betsson",
+        "stream_id": "TT-2025-10-07-001",
+        "ip": "203.0.113.10",
+        "country": "SE",
+        "session_id": "bench-viewer",
+    }
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+
+        async def call() -> None:
+            resp = await http.post("/v1/sign", json=payload)
+            resp.raise_for_status()
+
+        result = await run_async("api.sign", call, iterations=int(3000 * scale), concurrency=8)
+    await state.shutdown()
+    return [result]
+
+
+class FakeAdapter:
+    """In-memory adapter that sleeps ``latency`` seconds per management call."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.calls = 0
+
+    async def _call(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    async def ensure_input(self, stream_id: str, spec: IngestSpec) -> None:
+        await self._call()
+
+    async def ensure_transcode_profile(self, stream_id: str, profile: PlaybackProfile) -> None:
+        await self._call()
+
+    async def ensure_packaging_ll_hls(self, stream_id: str, path: str, profile: PlaybackProfile) -> None:
+        await self._call()
+
+    async def ensure_token_policy(self, client_id: str, rules: TokenRules) -> None:
+        await self._call()
+
+    async def fetch_stats(self, stream_id: str) -> StreamStats:
+        await self._call()
+        return StreamStats(stream_id=stream_id, ingest_status="online")
+
+    async def delete_stream(self, stream_id: str) -> None:
+        await self._call()
+
+
+async def bench_reconcile(scale: float, latency: float = 0.002) -> List[BenchResult]:
+    from controller.workers.reconciler import Reconciler
+
+    bundle = load_from_directory(CONFIG_DIR)
+    stream_id = next(iter(bundle.streams))
+    adapters = {f"{stream_id}:primary": FakeAdapter(latency), f"{stream_id}:backup": FakeAdapter(latency)}
+    reconciler = Reconciler(adapters=adapters, repository=Repository.from_config(bundle))
+    iterations = max(10, int(200 * scale))
+    return [
+        await run_async(
+            "reconciler.apply.forced",
+            lambda: reconciler.apply(stream_id, force=True),
+            iterations=iterations,
+            warmup=2,
+        ),
+        await run_async(
+            "reconciler.apply.unchanged",
+            lambda: reconciler.apply(stream_id),
+            iterations=iterations,
+            warmup=2,
+        ),
+    ]
+
+
+SYNC_CASES: Dict[str, Callable[[float], List[BenchResult]]] = {
+    "signer": bench_signer,
+    "policy": bench_policy,
+}
+
+ASYNC_CASES: Dict[str, Callable[[float], Awaitable[List[BenchResult]]]] = {
+    "api": bench_api_sign,
+    "reconcile": bench_reconcile,
+}
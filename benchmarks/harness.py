@@ -0,0 +1,121 @@
+"""Timing, reporting and baseline comparison for the benchmark suite."""
+from __future__ import annotations
+
+import asyncio
+import platform
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    seconds: float
+    ops_per_second: float
+    p50_us: float
+    p99_us: float
+
+    @classmethod
+    def from_samples(cls, name: str, samples_ns: List[int], wall_seconds: float) -> "BenchResult":
+        ordered = sorted(samples_ns)
+        return cls(
+            name=name,
+            iterations=len(ordered),
+            seconds=wall_seconds,
+            ops_per_second=len(ordered) / wall_seconds if wall_seconds else 0.0,
+            p50_us=_percentile(ordered, 0.50) / 1000,
+            p99_us=_percentile(ordered, 0.99) / 1000,
+        )
+
+
+@dataclass
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+
+def _percentile(ordered: List[int], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return float(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))])
+
+
+def run_sync(name: str, fn: Callable[[], object], *, iterations: int, warmup: int = 100) -> BenchResult:
+    for _ in range(warmup):
+        fn()
+    samples: List[int] = []
+    clock = time.perf_counter_ns
+    started = time.perf_counter()
+    for _ in range(iterations):
+        begin = clock()
+        fn()
+        samples.append(clock() - begin)
+    return BenchResult.from_samples(name, samples, time.perf_counter() - started)
+
+
+async def run_async(
+    name: str,
+    fn: Callable[[], Awaitable[object]],
+    *,
+    iterations: int,
+    concurrency: int = 1,
+    warmup: int = 10,
+) -> BenchResult:
+    """Run ``fn`` ``iterations`` times spread over ``concurrency`` concurrent loops."""
+    for _ in range(warmup):
+        await fn()
+    samples: List[int] = []
+    clock = time.perf_counter_ns
+
+    async def loop(count: int) -> None:
+        for _ in range(count):
+            begin = clock()
+            await fn()
+            samples.append(clock() - begin)
+
+    per_loop, extra = divmod(iterations, concurrency)
+    started = time.perf_counter()
+    await asyncio.gather(*(loop(per_loop + (1 if i < extra else 0)) for i in range(concurrency)))
+    return BenchResult.from_samples(name, samples, time.perf_counter() - started)
+
+
+def report(results: List[BenchResult]) -> Dict:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": {result.name: asdict(result) for result in results},
+    }
+
+
+def compare(baseline: Dict, current: Dict, *, threshold: float) -> List[Regression]:
+    """Flag benchmarks whose throughput dropped or p99 grew by more than ``threshold``."""
+    regressions: List[Regression] = []
+    for name, now in current.get("results", {}).items():
+        before: Optional[Dict] = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        if before["ops_per_second"] and now["ops_per_second"] < before["ops_per_second"] * (1 - threshold):
+            regressions.append(_regression(name, "ops_per_second", before, now))
+        if before["p99_us"] and now["p99_us"] > before["p99_us"] * (1 + threshold):
+            regressions.append(_regression(name, "p99_us", before, now))
+    return regressions
+
+
+def _regression(name: str, metric: str, before: Dict, now: Dict) -> Regression:
+    return Regression(
+        name=name,
+        metric=metric,
+        baseline=before[metric],
+        current=now[metric],
+        change=(now[metric] - before[metric]) / before[metric],
+    )
@@ -0,0 +1,147 @@
+"""Drive the reconciler and stats path against simulated Nimble origins."""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+import httpx
+
+from controller.adapters.base import MediaAdapter
+from controller.adapters.registry import AdapterRegistry, PoolSettings
+from controller.config_loader import ConfigBundle, load_from_directory
+from controller.core.models import PackagingSpec, StreamAdapters
+from controller.repository import Repository
+from controller.workers.reconciler import HostLimiter, Reconciler
+from controller.workers.scheduler import ReconcileScheduler
+from controller.workers.stats import StatsCollector
+
+from .cases import CONFIG_DIR
+from .harness import BenchResult
+from .nimble_sim import SimConfig, create_app
+
+
+def synthetic_bundle(streams: int, *, hosts: int = 2, url: Optional[str] = None) -> ConfigBundle:
+    """Clone the repo's first stream ``streams`` times, spread over ``hosts`` primary/backup pairs.
+
+    With ``url`` every adapter points at that one simulator instead.
+    """
+    base = load_from_directory(CONFIG_DIR)
+    template = next(iter(base.streams.values()))
+    clones = []
+    for index in range(streams):
+        stream_id = f"SIM-{index:06d}"
+        host = index % hosts
+        clones.append(
+            replace(
+                template,
+                id=stream_id,
+                adapters=StreamAdapters(
+                    primary=replace(template.adapters.primary, base_url=url or f"http://nimble-sim-{host}a"),
+                    backup=replace(template.adapters.backup, base_url=url or f"http://nimble-sim-{host}b"),
+                ),
+                ingest=replace(template.ingest, srt=replace(template.ingest.srt, port=10000 + index)),
+                packaging=PackagingSpec(ll_hls_path=f"/live/{stream_id}/index.m3u8"),
+            )
+        )
+    return ConfigBundle(list(base.clients.values()), list(base.playback_profiles.values()), clones)
+
+
+async def _reconcile_pass(
+    name: str, scheduler: ReconcileScheduler, stream_ids: List[str], *, force: bool
+) -> tuple[BenchResult, int]:
+    """Queue every stream at once; latency is submit-to-done per stream."""
+    samples: List[int] = []
+    submitted = time.perf_counter_ns()
+    started = time.perf_counter()
+    futures = scheduler.submit(stream_ids, force=force)
+    for future in futures.values():
+        future.add_done_callback(lambda _: samples.append(time.perf_counter_ns() - submitted))
+    outcomes = await asyncio.gather(*futures.values(), return_exceptions=True)
+    failed = sum(isinstance(outcome, BaseException) for outcome in outcomes)
+    return BenchResult.from_samples(name, samples, time.perf_counter() - started), failed
+
+
+async def _stats_pass(
+    name: str, adapters: Dict[str, MediaAdapter], concurrency: int
+) -> tuple[BenchResult, int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[int] = []
+    failed = 0
+
+    async def fetch(adapter_key: str) -> None:
+        nonlocal failed
+        stream_id = adapter_key.rpartition(":")[0]
+        async with semaphore:
+            begin = time.perf_counter_ns()
+            try:
+                await adapters[adapter_key].fetch_stats(stream_id)
+            except Exception:  # noqa: BLE001 - counted, not fatal
+                failed += 1
+            samples.append(time.perf_counter_ns() - begin)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch(key) for key in adapters))
+    return BenchResult.from_samples(name, samples, time.perf_counter() - started), failed
+
+
+async def run_load(
+    streams: int = 1000,
+    *,
+    sim: Optional[SimConfig] = None,
+    url: Optional[str] = None,
+    hosts: int = 2,
+    workers: int = 32,
+    per_host: int = 16,
+    stats_rounds: int = 3,
+) -> Dict:
+    """Reconcile ``streams`` simulated streams twice (forced, then unchanged) and poll their stats.
+
+    Without ``url`` the simulator runs in-process behind ``httpx.ASGITransport``;
+    with it, requests go to a simulator (or real node) listening there.
+    """
+    repository = Repository.from_config(synthetic_bundle(streams, hosts=hosts, url=url))
+    sim_app = None if url else create_app(sim)
+    registry = AdapterRegistry(
+        PoolSettings(max_connections=per_host * 2, max_keepalive=per_host, bulk_api=True),
+        transport=httpx.ASGITransport(app=sim_app) if sim_app is not None else None,
+    )
+    adapters: Dict[str, MediaAdapter] = {}
+    for stream in repository.streams.values():
+        for label, spec in (("primary", stream.adapters.primary), ("backup", stream.adapters.backup)):
+            adapters[f"{stream.id}:{label}"] = registry.get(spec.kind, spec.base_url, spec.api_key)
+    reconciler = Reconciler(adapters=adapters, repository=repository, limiter=HostLimiter(per_host))
+    scheduler = ReconcileScheduler(reconciler, workers=workers)
+    collector = StatsCollector(adapters=adapters, repository=repository, interval=60.0, concurrency=workers * 2)
+    stream_ids = list(repository.streams)
+    results: List[BenchResult] = []
+    failures: Dict[str, int] = {}
+    try:
+        for name, force in (("load.reconcile.initial", True), ("load.reconcile.unchanged", False)):
+            result, failed = await _reconcile_pass(name, scheduler, stream_ids, force=force)
+            results.append(result)
+            failures[name] = failed
+        result, failed = await _stats_pass("load.stats.fetch", adapters, workers * 2)
+        results.append(result)
+        failures["load.stats.fetch"] = failed
+        rounds: List[int] = []
+        started = time.perf_counter()
+        for _ in range(stats_rounds):
+            begin = time.perf_counter_ns()
+            await collector.collect_once()
+            rounds.append(time.perf_counter_ns() - begin)
+        results.append(BenchResult.from_samples("load.stats.collect_round", rounds, time.perf_counter() - started))
+        failures["load.stats.collect_round"] = collector.counters["errors"]
+        pools, breakers = registry.stats(), registry.breakers()
+    finally:
+        await scheduler.stop()
+        await registry.close()
+    return {
+        "streams": streams,
+        "results": results,
+        "failures": failures,
+        "pools": pools,
+        "breakers": breakers,
+        "simulator": sim_app.state.sim.summary() if sim_app is not None else None,
+    }
@@ -0,0 +1,219 @@
+"""Simulated Nimble Streamer management API for load and scale testing.
+
+Run it on localhost with ``uvicorn benchmarks.nimble_sim:app --port 8091`` or
+mount it in-process through ``httpx.ASGITransport(app=create_app(config))``.
+It implements every endpoint ``NimbleAdapter`` calls, keeps the applied
+resources in memory and answers stats requests with synthetic values.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+@dataclass
+class SimConfig:
+    """Behaviour knobs; every field can be changed at runtime via ``POST /sim/config``."""
+
+    latency_ms: float = 5.0
+    # fixed | uniform (0..2x mean) | lognormal (mean latency_ms, shape latency_sigma)
+    latency_dist: str = "lognormal"
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    error_status: int = 503
+    # Requests per second across the whole node; 0 disables throttling (429 beyond it).
+    rate_limit: float = 0.0
+    api_key: Optional[str] = None
+    seed: Optional[int] = None
+    # False answers the bulk endpoints with 404, like a stock Nimble node.
+    bulk_api: bool = True
+
+
+class TokenBucket:
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class NimbleSimulator:
+    def __init__(self, config: SimConfig | None = None) -> None:
+        self.config = config or SimConfig()
+        self.random = random.Random(self.config.seed)
+        self.inputs: Dict[str, Dict[str, Any]] = {}
+        self.transcodes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.packaging: Dict[str, Dict[str, Any]] = {}
+        self.token_policies: Dict[str, Dict[str, Any]] = {}
+        self.requests: Counter = Counter()
+        self.failures: Counter = Counter()
+        self._bucket = TokenBucket(self.config.rate_limit) if self.config.rate_limit > 0 else None
+
+    def configure(self, **changes: Any) -> SimConfig:
+        for key, value in changes.items():
+            if hasattr(self.config, key):
+                setattr(self.config, key, value)
+        self._bucket = TokenBucket(self.config.rate_limit) if self.config.rate_limit > 0 else None
+        return self.config
+
+    def latency(self) -> float:
+        mean = self.config.latency_ms / 1000
+        if mean <= 0:
+            return 0.0
+        if self.config.latency_dist == "fixed":
+            return mean
+        if self.config.latency_dist == "uniform":
+            return self.random.uniform(0, 2 * mean)
+        sigma = self.config.latency_sigma
+        # Pick mu so the lognormal's mean equals ``mean``.
+        return self.random.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+
+    async def admit(self, request: Request, endpoint: str) -> Optional[Response]:
+        """Apply auth, rate limit, latency and error injection; return a response to short-circuit."""
+        self.requests[endpoint] += 1
+        if self.config.api_key is not None and request.headers.get("X-API-KEY") != self.config.api_key:
+            self.failures["unauthorized"] += 1
+            return JSONResponse({"error": "unauthorized"}, status_code=401)
+        if self._bucket is not None and not self._bucket.take():
+            self.failures["throttled"] += 1
+            return JSONResponse({"error": "rate limited"}, status_code=429)
+        await asyncio.sleep(self.latency())
+        if self.config.error_rate and self.random.random() < self.config.error_rate:
+            self.failures["injected"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=self.config.error_status)
+        return None
+
+    def apply_transcode(self, payload: Dict[str, Any]) -> None:
+        renditions = {rendition["name"]: rendition for rendition in payload.get("renditions", [])}
+        self.transcodes.setdefault(payload["stream_id"], {}).update(renditions)
+
+    def stats(self, stream_id: str) -> Dict[str, Any]:
+        if stream_id not in self.inputs:
+            return {"ingest_status": "missing"}
+        rnd = self.random
+        return {
+            "ingest_status": "live",
+            "part_age": round(rnd.uniform(0.2, 1.2), 3),
+            "segment_age": round(rnd.uniform(1.0, 4.0), 3),
+            "cpu": round(rnd.uniform(10, 70), 1),
+            "http_errors": round(rnd.uniform(0, 0.01), 4),
+            "renditions": {
+                name: {"kbps": rendition.get("bitrate_kbps", 0) * rnd.uniform(0.9, 1.1), "fps": rendition.get("fps", 0)}
+                for name, rendition in self.transcodes.get(stream_id, {}).items()
+            },
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "config": asdict(self.config),
+            "requests": dict(self.requests),
+            "failures": dict(self.failures),
+            "streams": len(self.inputs),
+            "token_policies": len(self.token_policies),
+        }
+
+
+def create_app(config: SimConfig | None = None) -> FastAPI:
+    sim = NimbleSimulator(config)
+    app = FastAPI(title="Nimble simulator")
+    app.state.sim = sim
+
+    @app.post("/api/inputs")
+    async def inputs(request: Request):
+        if (denied := await sim.admit(request, "inputs")) is not None:
+            return denied
+        payload = await request.json()
+        sim.inputs[payload["id"]] = payload
+        return {"status": "ok"}
+
+    @app.post("/api/transcode")
+    async def transcode(request: Request):
+        if (denied := await sim.admit(request, "transcode")) is not None:
+            return denied
+        sim.apply_transcode(await request.json())
+        return {"status": "ok"}
+
+    @app.post("/api/packaging/ll-hls")
+    async def packaging(request: Request):
+        if (denied := await sim.admit(request, "packaging")) is not None:
+            return denied
+        payload = await request.json()
+        sim.packaging[payload["stream_id"]] = payload
+        return {"status": "ok"}
+
+    @app.post("/api/token-policy")
+    async def token_policy(request: Request):
+        if (denied := await sim.admit(request, "token_policy")) is not None:
+            return denied
+        payload = await request.json()
+        sim.token_policies[payload["client_id"]] = payload
+        return {"status": "ok"}
+
+    @app.post("/api/token-policy/bulk")
+    async def token_policy_bulk(request: Request):
+        if (denied := await sim.admit(request, "token_policy_bulk")) is not None:
+            return denied
+        if not sim.config.bulk_api:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        policies = (await request.json())["policies"]
+        for policy in policies:
+            sim.token_policies[policy["client_id"]] = policy
+        return {"status": "ok", "count": len(policies)}
+
+    @app.post("/api/provision")
+    async def provision(request: Request):
+        if (denied := await sim.admit(request, "provision")) is not None:
+            return denied
+        if not sim.config.bulk_api:
+            return JSONResponse({"error": "not found"}, status_code=404)
+        payload = await request.json()
+        sim.inputs[payload["input"]["id"]] = payload["input"]
+        for transcode_payload in payload.get("transcode", []):
+            sim.apply_transcode(transcode_payload)
+        for packaging_payload in payload.get("packaging", []):
+            sim.packaging[packaging_payload["stream_id"]] = packaging_payload
+        return {"status": "ok"}
+
+    @app.get("/api/streams/{stream_id}/stats")
+    async def stream_stats(stream_id: str, request: Request):
+        if (denied := await sim.admit(request, "stats")) is not None:
+            return denied
+        return sim.stats(stream_id)
+
+    @app.delete("/api/streams/{stream_id}")
+    async def delete_stream(stream_id: str, request: Request):
+        if (denied := await sim.admit(request, "delete")) is not None:
+            return denied
+        existed = sim.inputs.pop(stream_id, None) is not None
+        sim.transcodes.pop(stream_id, None)
+        sim.packaging.pop(stream_id, None)
+        return Response(status_code=204 if existed else 404)
+
+    @app.get("/sim/stats")
+    async def sim_stats() -> Dict[str, Any]:
+        return sim.summary()
+
+    @app.post("/sim/config")
+    async def sim_config(changes: Dict[str, Any]) -> Dict[str, Any]:
+        return asdict(sim.configure(**changes))
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,60 @@
+"""Compare per-request policy cost of the plain and compiled engines as allowlists grow.
+
+Run with ``python -m benchmarks.policy_lookup``.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+from ipaddress import IPv4Address
+
+from controller.core.models import AdapterSpec, Client, IngestSpec, IngestSRT, PackagingSpec, SignRequest, Stream, StreamAdapters
+from controller.core.policy import CompiledPolicyEngine, PolicyEngine
+
+SIZES = (1, 10, 100, 1000, 5000)
+
+
+def build_fixture(cidr_count: int) -> tuple[Client, Stream]:
+    rng = random.Random(cidr_count)
+    cidrs = [f"{IPv4Address(rng.getrandbits(24) << 8)}/24" for _ in range(cidr_count - 1)]
+    cidrs.append("203.0.113.0/24")
+    client = Client(
+        id="bench",
+        display_name="Bench",
+        playback_profile="default_abr",
+        token_ttl_seconds=60,
+        ip_allowlist=cidrs,
+        geo={"allow_countries": ["SE", "EE", "LT", "LV", "FI"]},
+    )
+    stream = Stream(
+        id="bench-stream",
+        description=None,
+        adapters=StreamAdapters(
+            primary=AdapterSpec(kind="nimble", base_url="https://primary", api_key="k"),
+            backup=AdapterSpec(kind="nimble", base_url="https://backup", api_key="k"),
+        ),
+        ingest=IngestSpec(srt=IngestSRT(mode="listener", port=9001, passphrase_env="PASS")),
+        packaging=PackagingSpec(ll_hls_path="/live/bench-stream/index.m3u8"),
+        assigned_clients=[f"other-{i}" for i in range(50)] + ["bench"],
+    )
+    return client, stream
+
+
+def measure(engine, request: SignRequest, number: int) -> float:
+    elapsed = timeit.timeit(lambda: engine.authorize(request, ip=request.ip, country=request.country), number=number)
+    return elapsed / number * 1e6
+
+
+def main() -> None:
+    request = SignRequest(client_id="bench", stream_id="bench-stream", ip="203.0.113.77", country="SE")
+    print(f"{'cidrs':>6} {'plain us/op':>12} {'compiled us/op':>15}")
+    for size in SIZES:
+        client, stream = build_fixture(size)
+        plain = PolicyEngine({client.id: client}, {stream.id: stream})
+        compiled = CompiledPolicyEngine({client.id: client}, {stream.id: stream})
+        number = max(20, 20000 // size)
+        print(f"{size:>6} {measure(plain, request, number):>12.2f} {measure(compiled, request, 20000):>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Media distribution controller."""
+import time
+
+# Start of the ``import`` startup phase reported by ``AppState.startup``.
+IMPORT_STARTED = time.perf_counter()
@@ -1,11 +1,24 @@
 """Adapter interfaces for interacting with media servers."""
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
+import random
+import time
 from abc import ABC, abstractmethod
-from typing import Protocol
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Protocol, Sequence, Tuple, TypeVar
 
 from ..core.models import IngestSpec, PlaybackProfile, StreamStats, TokenRules
 
+TokenPolicy = Tuple[str, TokenRules]
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
 
 class MediaAdapter(Protocol):
     """Protocol for media server adapters."""
@@ -18,6 +31,12 @@ class MediaAdapter(Protocol):
 
     async def ensure_token_policy(self, client_id: str, rules: TokenRules) -> None: ...
 
+    async def ensure_token_policies(self, policies: Sequence[TokenPolicy]) -> None: ...
+
+    async def provision_stream(
+        self, stream_id: str, spec: IngestSpec, path: str, profiles: Sequence[PlaybackProfile]
+    ) -> None: ...
+
     async def fetch_stats(self, stream_id: str) -> StreamStats: ...
 
     async def delete_stream(self, stream_id: str) -> None: ...
@@ -27,12 +46,300 @@ class AdapterError(RuntimeError):
     """Raised when an adapter call fails."""
 
 
+class TransientAdapterError(AdapterError):
+    """A failure worth retrying: network error, timeout or 5xx from the origin."""
+
+
+class CircuitOpenError(AdapterError):
+    """Raised without calling the origin while its circuit breaker is open."""
+
+
+class DeadlineExceeded(TransientAdapterError):
+    """The caller's deadline ran out before the adapter call finished."""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("adapter_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound every adapter call made in this context (and tasks it spawns) to ``seconds``.
+
+    Nested deadlines can only shorten the outer one.
+    """
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left on the current deadline, or ``None`` when unbounded."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half_open (one probe) -> closed."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if self._clock() - (self.opened_at or 0.0) < self.reset_timeout:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def release(self) -> None:
+        """Give back a half-open probe slot without recording an outcome (e.g. on cancellation)."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.state, self.failures, self.opened_at, self._probing = "closed", 0, None, False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state, self.opened_at, self._probing = "open", self._clock(), False
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == "open" and self.opened_at is not None:
+            retry_in = max(0.0, self.reset_timeout - (self._clock() - self.opened_at))
+        return {"state": self.state, "failures": self.failures, "trips": self.trips, "retry_in": retry_in}
+
+
+class RetryBudget:
+    """Token bucket capping retries to a fraction of calls, so retries cannot amplify an outage."""
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = min_tokens
+        self.tokens = min_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+    retry_ratio: float = 0.2
+    hedge_delay: Optional[float] = None
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        hedge = float(os.environ.get("ADAPTER_HEDGE_DELAY", "0"))
+        return cls(
+            attempts=int(os.environ.get("ADAPTER_RETRY_ATTEMPTS", "3")),
+            retry_ratio=float(os.environ.get("ADAPTER_RETRY_RATIO", "0.2")),
+            hedge_delay=hedge if hedge > 0 else None,
+            failure_threshold=int(os.environ.get("ADAPTER_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.environ.get("ADAPTER_BREAKER_RESET", "30")),
+        )
+
+
+class Resilience:
+    """Breaker, retry budget, deadlines and hedging for all calls to one origin host."""
+
+    def __init__(self, policy: ResiliencePolicy | None = None, *, clock: Callable[[], float] = time.monotonic):
+        self.policy = policy or ResiliencePolicy()
+        self.breaker = CircuitBreaker(self.policy.failure_threshold, self.policy.reset_timeout, clock)
+        self.budget = RetryBudget(self.policy.retry_ratio)
+        self.retries = 0
+        self.hedges = 0
+
+    async def call(self, fn: Callable[[], Awaitable[T]], *, idempotent: bool = True, hedge: bool = False) -> T:
+        """Run ``fn`` under the breaker; retry transient failures of idempotent calls."""
+        attempt = 0
+        self.budget.deposit()
+        while True:
+            if not self.breaker.allow():
+                raise CircuitOpenError("circuit open")
+            attempt += 1
+            try:
+                if hedge and self.policy.hedge_delay is not None:
+                    value = await self._bounded(lambda: self._hedged(fn, self.policy.hedge_delay))
+                else:
+                    value = await self._bounded(fn)
+            except DeadlineExceeded:
+                # The caller ran out of time, which says nothing about the origin; a slow but
+                # healthy host must not trip its breaker. Origin timeouts still count below.
+                self.breaker.release()
+                raise
+            except TransientAdapterError as exc:
+                self.breaker.record_failure()
+                delay = min(self.policy.max_delay, self.policy.base_delay * 2 ** (attempt - 1))
+                delay = random.uniform(0, delay)
+                left = remaining()
+                if (
+                    not idempotent
+                    or attempt >= self.policy.attempts
+                    or self.breaker.state == "open"
+                    or (left is not None and left <= delay)
+                    or not self.budget.withdraw()
+                ):
+                    raise
+                self.retries += 1
+                logger.debug("retrying adapter call after %r", exc)
+                await asyncio.sleep(delay)
+                continue
+            except AdapterError:
+                # The origin answered (e.g. 4xx), so it is healthy even though the call failed.
+                self.breaker.record_success()
+                raise
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            return value
+
+    async def _bounded(self, fn: Callable[[], Awaitable[T]]) -> T:
+        left = remaining()
+        if left is None:
+            return await fn()
+        if left <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+        try:
+            return await asyncio.wait_for(fn(), timeout=left)
+        except asyncio.TimeoutError as exc:
+            raise DeadlineExceeded("deadline exceeded") from exc
+
+    async def _hedged(self, fn: Callable[[], Awaitable[T]], delay: float) -> T:
+        """Start a second request if the first has not answered after ``delay``; first success wins."""
+        pending = {asyncio.ensure_future(fn())}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return done.pop().result()
+            self.hedges += 1
+            pending.add(asyncio.ensure_future(fn()))
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.breaker.snapshot(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "retry_tokens": round(self.budget.tokens, 2),
+        }
+
+
+async def _gather_limited(calls: Sequence[Callable[[], Awaitable[None]]], limit: Optional[int]) -> None:
+    if limit is None:
+        await asyncio.gather(*(call() for call in calls))
+        return
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(call: Callable[[], Awaitable[None]]) -> None:
+        async with semaphore:
+            await call()
+
+    await asyncio.gather(*(run(call) for call in calls))
+
+
+async def concurrent_token_policies(
+    adapter: MediaAdapter, policies: Sequence[TokenPolicy], *, limit: Optional[int] = None
+) -> None:
+    """Apply token policies one call per client, at most ``limit`` at a time (unbounded when None)."""
+    await _gather_limited(
+        [lambda client_id=client_id, rules=rules: adapter.ensure_token_policy(client_id, rules) for client_id, rules in policies],
+        limit,
+    )
+
+
+async def sequential_provision(
+    adapter: MediaAdapter,
+    stream_id: str,
+    spec: IngestSpec,
+    path: str,
+    profiles: Sequence[PlaybackProfile],
+    *,
+    limit: Optional[int] = None,
+) -> None:
+    """Provision input, then transcode and packaging per profile (up to ``limit`` profiles concurrently)."""
+
+    async def _profile(profile: PlaybackProfile) -> None:
+        await adapter.ensure_transcode_profile(stream_id, profile)
+        await adapter.ensure_packaging_ll_hls(stream_id, path, profile)
+
+    await adapter.ensure_input(stream_id, spec)
+    await _gather_limited([lambda profile=profile: _profile(profile) for profile in profiles], limit)
+
+
+async def ensure_token_policies(adapter: MediaAdapter, policies: Sequence[TokenPolicy]) -> None:
+    """Use the adapter's bulk call when it has one, else fall back to a concurrent loop."""
+    bulk = getattr(adapter, "ensure_token_policies", None)
+    if bulk is None:
+        await concurrent_token_policies(adapter, policies)
+    else:
+        await bulk(policies)
+
+
+async def provision_stream(
+    adapter: MediaAdapter, stream_id: str, spec: IngestSpec, path: str, profiles: Sequence[PlaybackProfile]
+) -> None:
+    """Use the adapter's batched provisioning call when it has one."""
+    bulk = getattr(adapter, "provision_stream", None)
+    if bulk is None:
+        await sequential_provision(adapter, stream_id, spec, path, profiles)
+    else:
+        await bulk(stream_id, spec, path, profiles)
+
+
 class AbstractAdapter(ABC):
     """Base class providing helper utilities for adapters."""
 
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(self, base_url: str, api_key: str, *, resilience: Resilience | None = None):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
+        self.resilience = resilience or Resilience()
+
+    async def _call(self, fn: Callable[[], Awaitable[T]], *, idempotent: bool = True, hedge: bool = False) -> T:
+        """Run one origin request through this host's :class:`Resilience` layer."""
+        return await self.resilience.call(fn, idempotent=idempotent, hedge=hedge)
 
     @abstractmethod
     async def ensure_input(self, stream_id: str, spec: IngestSpec) -> None:  # pragma: no cover - interface
@@ -50,6 +357,14 @@ class AbstractAdapter(ABC):
     async def ensure_token_policy(self, client_id: str, rules: TokenRules) -> None:  # pragma: no cover
         raise NotImplementedError
 
+    async def ensure_token_policies(self, policies: Sequence[TokenPolicy]) -> None:
+        await concurrent_token_policies(self, policies)
+
+    async def provision_stream(
+        self, stream_id: str, spec: IngestSpec, path: str, profiles: Sequence[PlaybackProfile]
+    ) -> None:
+        await sequential_provision(self, stream_id, spec, path, profiles)
+
     @abstractmethod
     async def fetch_stats(self, stream_id: str) -> StreamStats:  # pragma: no cover
         raise NotImplementedError
@@ -2,42 +2,105 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, Optional, Sequence
 
 import httpx
 
 from ..core.models import IngestSpec, PlaybackProfile, StreamStats, TokenRules
-from .base import AbstractAdapter, AdapterError
+from .base import (
+    AbstractAdapter,
+    AdapterError,
+    Resilience,
+    TokenPolicy,
+    TransientAdapterError,
+    concurrent_token_policies,
+    sequential_provision,
+)
+
+if TYPE_CHECKING:
+    from .registry import HostPool
 
 logger = logging.getLogger(__name__)
 
 
 class NimbleAdapter(AbstractAdapter):
-    """Adapter that manages resources on a Nimble Streamer node."""
+    """Adapter that manages resources on a Nimble Streamer node.
+
+    The bulk endpoints are only called when the pool settings enable
+    ``bulk_api``. A host that answers them with 404 or 405 is remembered on its
+    pool and gets per-resource calls, at most ``fallback_concurrency`` at once.
+    """
+
+    bulk_chunk_size = 200
+    fallback_concurrency = 8
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        *,
+        timeout: float = 10.0,
+        pool: Optional["HostPool"] = None,
+        resilience: Optional[Resilience] = None,
+    ):
+        super().__init__(base_url, api_key, resilience=resilience)
+        self._headers = {"X-API-KEY": api_key}
+        self._owns_pool = pool is None
+        if pool is None:
+            from .registry import HostPool, PoolSettings, origin_of
+
+            pool = HostPool(origin_of(self.base_url), PoolSettings(timeout=timeout))
+        self._pool = pool
 
-    def __init__(self, base_url: str, api_key: str, *, timeout: float = 10.0):
-        super().__init__(base_url, api_key)
-        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=timeout, headers={"X-API-KEY": api_key})
+    async def _request(self, method: str, path: str, *, hedge: bool = False, **kwargs: Any) -> httpx.Response:
+        """Send one request; network errors, 429 and 5xx are retried by the resilience layer."""
+
+        async def attempt() -> httpx.Response:
+            try:
+                resp = await self._pool.request(method, self.base_url + path, headers=self._headers, **kwargs)
+            except httpx.HTTPError as exc:
+                raise TransientAdapterError(f"nimble {method} {path} failed: {exc!r}") from exc
+            if resp.status_code >= 500 or resp.status_code == 429:
+                logger.error("nimble error %s %s", resp.status_code, resp.text)
+                raise TransientAdapterError(f"nimble {method} {path} failed: {resp.status_code}")
+            return resp
+
+        return await self._call(attempt, hedge=hedge)
 
     async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        resp = await self._client.post(path, json=payload)
+        resp = await self._request("POST", path, json=payload)
         if resp.status_code >= 400:
             logger.error("nimble error %s %s", resp.status_code, resp.text)
             raise AdapterError(f"nimble request failed: {resp.status_code}")
         return resp.json()
 
-    async def ensure_input(self, stream_id: str, spec: IngestSpec) -> None:
-        payload = {
+    def _bulk_enabled(self) -> bool:
+        return self._pool.settings.bulk_api and "bulk" not in self._pool.unsupported
+
+    async def _post_bulk(self, path: str, payload: Dict[str, Any]) -> bool:
+        """POST to a bulk endpoint; False (and remembered for the host) if the origin does not have it."""
+        resp = await self._request("POST", path, json=payload)
+        if resp.status_code in (404, 405):
+            logger.warning("nimble %s not supported by %s; using per-resource calls", path, self._pool.origin)
+            self._pool.unsupported.add("bulk")
+            return False
+        if resp.status_code >= 400:
+            logger.error("nimble error %s %s", resp.status_code, resp.text)
+            raise AdapterError(f"nimble request failed: {resp.status_code}")
+        return True
+
+    @staticmethod
+    def _input_payload(stream_id: str, spec: IngestSpec) -> Dict[str, Any]:
+        return {
             "id": stream_id,
             "type": "srt_listener",
             "port": spec.srt.port,
             "passphrase": f"env:{spec.srt.passphrase_env}",
         }
-        logger.debug("ensuring Nimble input", extra={"stream_id": stream_id, "payload": payload})
-        await self._post("/api/inputs", payload)
 
-    async def ensure_transcode_profile(self, stream_id: str, profile: PlaybackProfile) -> None:
-        payload = {
+    @staticmethod
+    def _transcode_payload(stream_id: str, profile: PlaybackProfile) -> Dict[str, Any]:
+        return {
             "stream_id": stream_id,
             "gop": profile.gop_seconds,
             "renditions": [
@@ -51,32 +114,73 @@ class NimbleAdapter(AbstractAdapter):
                 for rendition in profile.renditions
             ],
         }
-        logger.debug("ensuring Nimble transcode", extra={"stream_id": stream_id})
-        await self._post("/api/transcode", payload)
 
-    async def ensure_packaging_ll_hls(self, stream_id: str, path: str, profile: PlaybackProfile) -> None:
-        payload = {
+    @staticmethod
+    def _packaging_payload(stream_id: str, path: str, profile: PlaybackProfile) -> Dict[str, Any]:
+        return {
             "stream_id": stream_id,
             "output_path": path,
             "segment_seconds": profile.segment_seconds,
             "part_seconds": profile.parts_seconds,
             "low_latency": True,
         }
-        logger.debug("ensuring Nimble LL-HLS", extra={"stream_id": stream_id})
-        await self._post("/api/packaging/ll-hls", payload)
 
-    async def ensure_token_policy(self, client_id: str, rules: TokenRules) -> None:
-        payload = {
+    @staticmethod
+    def _token_payload(client_id: str, rules: TokenRules) -> Dict[str, Any]:
+        return {
             "client_id": client_id,
             "max_sessions": rules.max_sessions,
             "ttl": rules.ttl_seconds,
             "path_prefix": rules.path_prefix,
         }
+
+    async def ensure_input(self, stream_id: str, spec: IngestSpec) -> None:
+        payload = self._input_payload(stream_id, spec)
+        logger.debug("ensuring Nimble input", extra={"stream_id": stream_id, "payload": payload})
+        await self._post("/api/inputs", payload)
+
+    async def ensure_transcode_profile(self, stream_id: str, profile: PlaybackProfile) -> None:
+        logger.debug("ensuring Nimble transcode", extra={"stream_id": stream_id})
+        await self._post("/api/transcode", self._transcode_payload(stream_id, profile))
+
+    async def ensure_packaging_ll_hls(self, stream_id: str, path: str, profile: PlaybackProfile) -> None:
+        logger.debug("ensuring Nimble LL-HLS", extra={"stream_id": stream_id})
+        await self._post("/api/packaging/ll-hls", self._packaging_payload(stream_id, path, profile))
+
+    async def ensure_token_policy(self, client_id: str, rules: TokenRules) -> None:
         logger.debug("ensuring Nimble token policy", extra={"client_id": client_id})
-        await self._post("/api/token-policy", payload)
+        await self._post("/api/token-policy", self._token_payload(client_id, rules))
+
+    async def ensure_token_policies(self, policies: Sequence[TokenPolicy]) -> None:
+        start = 0
+        while start < len(policies) and self._bulk_enabled():
+            chunk = policies[start : start + self.bulk_chunk_size]
+            logger.debug("ensuring Nimble token policies", extra={"count": len(chunk)})
+            if not await self._post_bulk(
+                "/api/token-policy/bulk",
+                {"policies": [self._token_payload(client_id, rules) for client_id, rules in chunk]},
+            ):
+                break
+            start += len(chunk)
+        await concurrent_token_policies(self, policies[start:], limit=self.fallback_concurrency)
+
+    async def provision_stream(
+        self, stream_id: str, spec: IngestSpec, path: str, profiles: Sequence[PlaybackProfile]
+    ) -> None:
+        if not self._bulk_enabled():
+            await sequential_provision(self, stream_id, spec, path, profiles, limit=self.fallback_concurrency)
+            return
+        payload = {
+            "input": self._input_payload(stream_id, spec),
+            "transcode": [self._transcode_payload(stream_id, profile) for profile in profiles],
+            "packaging": [self._packaging_payload(stream_id, path, profile) for profile in profiles],
+        }
+        logger.debug("provisioning Nimble stream", extra={"stream_id": stream_id})
+        if not await self._post_bulk("/api/provision", payload):
+            await sequential_provision(self, stream_id, spec, path, profiles, limit=self.fallback_concurrency)
 
     async def fetch_stats(self, stream_id: str) -> StreamStats:
-        resp = await self._client.get(f"/api/streams/{stream_id}/stats")
+        resp = await self._request("GET", f"/api/streams/{stream_id}/stats", hedge=True)
         if resp.status_code >= 400:
             raise AdapterError(f"nimble stats failed: {resp.status_code}")
         data = resp.json()
@@ -91,9 +195,10 @@ class NimbleAdapter(AbstractAdapter):
         )
 
     async def delete_stream(self, stream_id: str) -> None:
-        resp = await self._client.delete(f"/api/streams/{stream_id}")
+        resp = await self._request("DELETE", f"/api/streams/{stream_id}")
         if resp.status_code not in (200, 204, 404):
             raise AdapterError(f"nimble delete failed: {resp.status_code}")
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._owns_pool:
+            await self._pool.aclose()
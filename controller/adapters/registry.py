@@ -0,0 +1,221 @@
+"""Shared adapter instances and per-host HTTP connection pools."""
+from __future__ import annotations
+
+import logging
+import os
+import ssl
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..core.models import AdapterKind
+from ..metrics import ADAPTER_REQUEST_DURATION, ADAPTER_REQUEST_ERRORS
+from .antmedia import AntMediaAdapter
+from .base import MediaAdapter, Resilience, ResiliencePolicy
+from .nimble import NimbleAdapter
+from .wowza import WowzaAdapter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 10.0
+    # Try the bulk endpoints (``/api/token-policy/bulk``, ``/api/provision``) that not every origin has.
+    bulk_api: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            max_connections=int(os.environ.get("ADAPTER_POOL_MAX_CONNECTIONS", "100")),
+            max_keepalive=int(os.environ.get("ADAPTER_POOL_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.environ.get("ADAPTER_POOL_KEEPALIVE_EXPIRY", "30")),
+            http2=os.environ.get("ADAPTER_HTTP2", "0").lower() in ("1", "true", "yes"),
+            timeout=float(os.environ.get("ADAPTER_TIMEOUT", "10")),
+            bulk_api=os.environ.get("ADAPTER_BULK_API", "0").lower() in ("1", "true", "yes"),
+        )
+
+
+def origin_of(base_url: str) -> str:
+    """Return ``scheme://host:port`` for ``base_url``; pools are shared per origin."""
+    parts = urlsplit(base_url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+class HostPool:
+    """One pooled ``httpx.AsyncClient`` for an origin host plus usage counters."""
+
+    def __init__(
+        self,
+        origin: str,
+        settings: PoolSettings | None = None,
+        *,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        settings = settings or PoolSettings()
+        self.origin = origin
+        self.settings = settings
+        http2 = settings.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("ADAPTER_HTTP2 set but h2 is not installed; using HTTP/1.1 for %s", origin)
+                http2 = False
+        self.client = httpx.AsyncClient(
+            timeout=settings.timeout,
+            http2=http2,
+            transport=transport,
+            verify=ssl_context if ssl_context is not None else True,
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+        )
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        # Optional endpoints this origin answered 404/405 for; adapters stop calling them.
+        self.unsupported: Set[str] = set()
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        self.in_flight += 1
+        self.requests += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.errors += 1
+            ADAPTER_REQUEST_ERRORS.inc(self.origin, "timeout" if isinstance(exc, httpx.TimeoutException) else "network")
+            raise
+        finally:
+            self.in_flight -= 1
+            ADAPTER_REQUEST_DURATION.observe(time.perf_counter() - started, self.origin, method)
+        if resp.status_code >= 500:
+            ADAPTER_REQUEST_ERRORS.inc(self.origin, "5xx")
+        elif resp.status_code == 429:
+            ADAPTER_REQUEST_ERRORS.inc(self.origin, "throttled")
+        return resp
+
+    def stats(self) -> Dict[str, Any]:
+        connections = self._connections()
+        return {
+            "max_connections": self.settings.max_connections,
+            "connections": None if connections is None else len(connections),
+            "idle": None if connections is None else sum(1 for conn in connections if conn.is_idle()),
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "utilization": round(self.in_flight / self.settings.max_connections, 3),
+        }
+
+    def _connections(self) -> Optional[List[Any]]:
+        """Open connections of the client's pool, or ``None`` when they cannot be read.
+
+        httpx has no public API for this. ``AsyncHTTPTransport._pool`` is the
+        httpcore ``AsyncConnectionPool`` (tested against httpx 0.27/0.28), whose
+        ``connections`` list is public; a custom transport or a change in httpx
+        internals makes the counts ``None`` rather than wrong.
+        """
+        transport = getattr(self.client, "_transport", None)
+        if not isinstance(transport, httpx.AsyncHTTPTransport):
+            return None
+        connections = getattr(getattr(transport, "_pool", None), "connections", None)
+        if not isinstance(connections, list):
+            return None
+        return connections
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+AdapterFactory = Callable[[str, str, HostPool, Resilience], MediaAdapter]
+
+FACTORIES: Dict[AdapterKind, AdapterFactory] = {
+    AdapterKind.nimble: lambda base_url, api_key, pool, resilience: NimbleAdapter(
+        base_url, api_key, pool=pool, resilience=resilience
+    ),
+    AdapterKind.wowza: lambda base_url, api_key, pool, resilience: WowzaAdapter(base_url, api_key, resilience=resilience),
+    AdapterKind.antmedia: lambda base_url, api_key, pool, resilience: AntMediaAdapter(
+        base_url, api_key, resilience=resilience
+    ),
+}
+
+
+class AdapterRegistry:
+    """Hands out one adapter per (kind, base_url, api_key) and one pool and breaker per origin host."""
+
+    def __init__(
+        self,
+        settings: PoolSettings | None = None,
+        factories: Optional[Dict[AdapterKind, AdapterFactory]] = None,
+        *,
+        policy: ResiliencePolicy | None = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """``transport`` replaces the network for every pool, e.g. an in-process simulator."""
+        self.settings = settings or PoolSettings()
+        self.policy = policy or ResiliencePolicy()
+        self._transport = transport
+        self._factories = factories or FACTORIES
+        self._pools: Dict[str, HostPool] = {}
+        self._resilience: Dict[str, Resilience] = {}
+        self._adapters: Dict[Tuple[AdapterKind, str, str], MediaAdapter] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def pool(self, base_url: str) -> HostPool:
+        origin = origin_of(base_url)
+        pool = self._pools.get(origin)
+        if pool is None:
+            if self._ssl_context is None and self._transport is None:
+                # Loading the CA bundle costs tens of milliseconds; do it once, not per origin.
+                self._ssl_context = httpx.create_ssl_context()
+            pool = self._pools[origin] = HostPool(
+                origin, self.settings, transport=self._transport, ssl_context=self._ssl_context
+            )
+        return pool
+
+    def resilience(self, base_url: str) -> Resilience:
+        origin = origin_of(base_url)
+        resilience = self._resilience.get(origin)
+        if resilience is None:
+            resilience = self._resilience[origin] = Resilience(self.policy)
+        return resilience
+
+    def get(self, kind: AdapterKind, base_url: str, api_key: str) -> MediaAdapter:
+        key = (kind, base_url.rstrip("/"), api_key)
+        adapter = self._adapters.get(key)
+        if adapter is None:
+            factory = self._factories.get(kind)
+            if factory is None:
+                raise ValueError(f"unsupported adapter kind {kind}")
+            adapter = self._adapters[key] = factory(base_url, api_key, self.pool(base_url), self.resilience(base_url))
+        return adapter
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "adapters": len(self._adapters),
+            "pools": {origin: pool.stats() for origin, pool in self._pools.items()},
+        }
+
+    def breakers(self) -> Dict[str, Dict[str, Any]]:
+        return {origin: resilience.snapshot() for origin, resilience in self._resilience.items()}
+
+    async def close(self) -> None:
+        for pool in self._pools.values():
+            await pool.aclose()
+        self._pools.clear()
+        self._adapters.clear()
@@ -0,0 +1,126 @@
+"""Prometheus ``/metrics`` exposition."""
+from __future__ import annotations
+
+import time
+from typing import Iterable, List
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..core.health import ORIGINS, UP_STATUSES
+from ..metrics import REGISTRY, MetricFamily
+from ..state import AppState
+from .routes import get_state
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def stream_families(app: AppState) -> List[MetricFamily]:
+    """Stream gauges from the stats collector; samples older than three intervals count as down."""
+    now = time.time()
+    stale_after = 3 * app.stats.interval
+    up, part_age, segment_age, cpu, error_rate, sample_age = [], [], [], [], [], []
+    for adapter_key, (stats, sampled_at) in sorted(app.stats.snapshot().items()):
+        stream_id, _, origin = adapter_key.rpartition(":")
+        labels = {"stream": stream_id, "origin": origin}
+        age = now - sampled_at
+        sample_age.append((labels, round(age, 3)))
+        up.append((labels, 1.0 if age <= stale_after and stats.ingest_status in UP_STATUSES else 0.0))
+        for samples, value in (
+            (part_age, stats.last_part_age_seconds),
+            (segment_age, stats.last_segment_age_seconds),
+            (cpu, stats.cpu_percent),
+            (error_rate, stats.http_error_rate),
+        ):
+            if value is not None:
+                samples.append((labels, value))
+    return [
+        MetricFamily("media_ingest_up", "1 when the origin reports the stream ingest as live.", up),
+        MetricFamily("media_part_age_seconds", "Age of the newest LL-HLS part.", part_age),
+        MetricFamily("media_segment_age_seconds", "Age of the newest HLS segment.", segment_age),
+        MetricFamily("media_origin_cpu_percent", "Origin CPU use reported with the stream stats.", cpu),
+        MetricFamily("media_origin_http_error_rate", "Origin HTTP error rate for the stream.", error_rate),
+        MetricFamily("media_stats_sample_age_seconds", "Seconds since the stats were collected.", sample_age),
+    ]
+
+
+def controller_families(app: AppState) -> List[MetricFamily]:
+    sessions = [({"client": client_id}, entry["total"]) for client_id, entry in sorted(app.sessions.snapshot().items())]
+    breakers = [
+        ({"origin": origin}, 1.0 if snapshot["state"] == "open" else 0.0)
+        for origin, snapshot in sorted(app.adapter_registry.breakers().items())
+    ]
+    in_flight = [
+        ({"origin": origin}, pool["in_flight"]) for origin, pool in sorted(app.adapter_registry.stats()["pools"].items())
+    ]
+    scheduler = app.scheduler.status()
+    decisions = sorted(app.origins.snapshot().items())
+    selected = [({"stream": stream_id}, 1.0 if decision.origin == "backup" else 0.0) for stream_id, decision in decisions]
+    health = [
+        ({"stream": stream_id, "origin": origin}, decision.scores[origin])
+        for stream_id, decision in decisions
+        for origin in ORIGINS
+        if origin in decision.scores
+    ]
+    families = [
+        MetricFamily("media_origin_backup_selected", "1 while signing hands out backup URLs for the stream.", selected),
+        MetricFamily("media_origin_health_score", "Origin health score from 0 (down) to 1.", health),
+        MetricFamily("media_sessions_active", "Active playback sessions in this worker.", sessions),
+        MetricFamily("media_adapter_breaker_open", "1 while the origin circuit breaker is open.", breakers),
+        MetricFamily("media_adapter_requests_in_flight", "Requests in flight per origin host.", in_flight),
+        MetricFamily(
+            "media_startup_phase_seconds",
+            "Time spent in each startup phase of this worker.",
+            [({"phase": phase}, seconds) for phase, seconds in app.startup.items()],
+        ),
+        MetricFamily("media_stats_live_subscribers", "Open live stats subscriptions.", [({}, len(app.live_stats))]),
+        MetricFamily(
+            "media_stats_live_dropped_total",
+            "Live stats frames superseded before a slow subscriber read them.",
+            [({}, app.live_stats.counters["dropped"])],
+            type="counter",
+        ),
+        MetricFamily("media_reconcile_pending", "Streams waiting in the reconcile queue.", [({}, scheduler["pending"])]),
+        MetricFamily(
+            "media_reconcile_applied_total",
+            "Reconcile calls applied since start.",
+            [({}, app.reconciler.totals["applied"])],
+            type="counter",
+        ),
+        MetricFamily(
+            "media_reconcile_skipped_total",
+            "Reconcile calls skipped as unchanged since start.",
+            [({}, app.reconciler.totals["skipped"])],
+            type="counter",
+        ),
+    ]
+    if app.writer is not None:
+        families.extend(
+            [
+                MetricFamily("media_repository_pending_writes", "Entity writes queued for the store.", [({}, app.writer.pending)]),
+                MetricFamily(
+                    "media_repository_store_healthy",
+                    "0 while store flushes fail or too many writes are queued.",
+                    [({}, 1.0 if app.writer.healthy else 0.0)],
+                ),
+            ]
+        )
+    if app.shared is not None:
+        families.extend(shared_families(app.shared.totals()))
+    return families
+
+
+def shared_families(totals: dict) -> Iterable[MetricFamily]:
+    """Host-wide per-client counters summed across workers through shared state."""
+    signs = [({"client": name.split(":", 1)[1]}, value) for name, value in sorted(totals.items()) if name.startswith("sign_total:")]
+    sessions = [({"client": name.split(":", 1)[1]}, value) for name, value in sorted(totals.items()) if name.startswith("sessions:")]
+    yield MetricFamily("media_host_signs_total", "Signed URLs across all workers on this host.", signs, type="counter")
+    yield MetricFamily("media_host_sessions_active", "Active sessions across all workers on this host.", sessions)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(app: AppState = Depends(get_state)) -> PlainTextResponse:
+    body = REGISTRY.render([lambda: stream_families(app), lambda: controller_families(app)])
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
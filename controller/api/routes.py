@@ -1,15 +1,45 @@
 """REST API routes for the controller."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse
+import json
+from dataclasses import asdict
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
 
-from ..core.models import Client, PlaybackProfile, SignRequest, SignResponse, Stream
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from starlette.types import Receive, Scope, Send
+
+from ..adapters.base import AdapterError
+from ..core.models import (
+    Client,
+    PlaybackProfile,
+    ReconcileRequest,
+    SignBatchRequest,
+    SignBatchResponse,
+    SignBatchResult,
+    SignRequest,
+    SignResponse,
+    Stream,
+)
 from ..core.policy import AuthorizationError
+from ..core.signer import TOKEN_COOKIE
 from ..state import AppState
+from ..workers.live import Subscription, TooManySubscribers
 
 router = APIRouter(prefix="/v1")
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+BATCH_CHUNK_SIZE = 1000
+STATS_MAX_IDS = 500
+# Default RECONCILE_JOB_HISTORY; a larger history is still listed 1000 jobs at a time.
+JOBS_MAX_LIMIT = 1000
+SSE_MEDIA_TYPE = "text/event-stream"
+LIVE_KEEPALIVE = 15.0
+
+_sign_batch_adapter = TypeAdapter(SignBatchRequest)
+_sign_request_adapter = TypeAdapter(SignRequest)
+
 
 def get_state() -> AppState:
     from ..app import state
@@ -25,6 +55,7 @@ async def create_client(client: Client, app: AppState = Depends(get_state)) -> C
 
 @router.get("/clients/{client_id}", response_model=Client)
 async def read_client(client_id: str, app: AppState = Depends(get_state)) -> Client:
+    await app.repository.ensure_loaded("client", client_id)
     client = app.repository.get_client(client_id)
     if client is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="client not found")
@@ -46,22 +77,295 @@ async def create_stream(stream: Stream, app: AppState = Depends(get_state)) -> S
 @router.post("/sign", response_model=SignResponse)
 async def sign(request: SignRequest, app: AppState = Depends(get_state)) -> SignResponse:
     try:
-        url, ttl, kid = await app.sign(request)
+        return await app.sign(request)
     except AuthorizationError as exc:  # pragma: no cover - simple mapping
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=exc.reason) from exc
-    return SignResponse(url=url, ttl=ttl, kid=kid)
 
 
-@router.post("/reconcile/{stream_id}")
-async def reconcile(stream_id: str, app: AppState = Depends(get_state)) -> dict[str, str]:
-    await app.reconcile(stream_id)
-    return {"status": "ok"}
+@router.get("/sign/cache")
+async def sign_cache_stats(app: AppState = Depends(get_state)) -> dict:
+    cache = app.signer.cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.post("/sign/batch", response_model=SignBatchResponse)
+async def sign_batch(request: Request, app: AppState = Depends(get_state)):
+    """Sign many requests at once; send ``application/x-ndjson`` to stream items in and results out."""
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        return _DuplexStreamingResponse(_sign_ndjson(request, app), media_type=NDJSON_MEDIA_TYPE)
+    try:
+        batch = _sign_batch_adapter.validate_json(await request.body())
+    except ValidationError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=exc.errors(include_url=False)) from exc
+    results = await app.sign_batch(enumerate(batch.items))
+    return SignBatchResponse(results=results)
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """Streaming response whose body iterator still reads the request body.
+
+    The stock implementation polls ``receive`` for disconnects while streaming,
+    which would race the iterator for request body messages.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def _sign_ndjson(request: Request, app: AppState) -> AsyncIterator[str]:
+    resolved: Dict = {}
+    chunk: List[Tuple[int, Union[SignRequest, str]]] = []
+
+    async def flush() -> str:
+        valid = [(index, item) for index, item in chunk if not isinstance(item, str)]
+        results = await app.sign_batch(valid, resolved=resolved)
+        results.extend(SignBatchResult(index=index, error=item) for index, item in chunk if isinstance(item, str))
+        results.sort(key=lambda result: result.index)
+        chunk.clear()
+        return "".join(json.dumps(asdict(result)) + "\n" for result in results)
+
+    index = 0
+    async for line in _ndjson_lines(request):
+        try:
+            chunk.append((index, _sign_request_adapter.validate_json(line)))
+        except ValidationError:
+            chunk.append((index, "invalid_request"))
+        index += 1
+        if len(chunk) >= BATCH_CHUNK_SIZE:
+            yield await flush()
+    if chunk:
+        yield await flush()
+
+
+@router.get("/auth", status_code=status.HTTP_200_OK, response_class=Response)
+async def edge_auth(request: Request, app: AppState = Depends(get_state)) -> Response:
+    """nginx ``auth_request`` target: 200 if the signed URI or prefix token is valid, 403 otherwise."""
+    uri = request.headers.get("x-original-uri") or request.query_params.get("uri")
+    if uri and app.authorize_edge(uri, token=request.cookies.get(TOKEN_COOKIE)) is None:
+        return Response(status_code=status.HTTP_200_OK)
+    return Response(status_code=status.HTTP_403_FORBIDDEN)
+
+
+@router.get("/sessions")
+async def session_counts(app: AppState = Depends(get_state)) -> dict:
+    return app.sessions.snapshot()
+
+
+@router.get("/counters")
+async def shared_counters(app: AppState = Depends(get_state)) -> dict:
+    """Host-wide sign and session counters summed across all workers."""
+    if app.shared is None:
+        return {"enabled": False}
+    grouped: Dict[str, Dict[str, int]] = {}
+    for name, value in app.shared.totals().items():
+        metric, _, client_id = name.partition(":")
+        grouped.setdefault(metric, {})[client_id] = value
+    return {"enabled": True, **grouped}
+
+
+@router.delete("/sessions/{client_id}/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_session(client_id: str, session_id: str, app: AppState = Depends(get_state)) -> Response:
+    if not app.release_session(client_id, session_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="session not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/reconcile", status_code=status.HTTP_202_ACCEPTED)
+async def reconcile_many(request: ReconcileRequest, app: AppState = Depends(get_state)) -> dict:
+    """Queue a set of streams, or every stream when ``streams`` is omitted."""
+    queued = app.schedule_reconcile(request.streams, priority=request.priority, force=request.force)
+    return {"status": "queued", "streams": queued}
+
+
+@router.get("/reconcile/status")
+async def reconcile_status(app: AppState = Depends(get_state)) -> dict:
+    return {**app.scheduler.status(), "in_flight_per_host": app.reconciler.limiter_in_flight()}
+
+
+@router.get("/adapters/pools")
+async def adapter_pools(app: AppState = Depends(get_state)) -> dict:
+    return app.adapter_registry.stats()
+
+
+@router.get("/adapters/breakers")
+async def adapter_breakers(app: AppState = Depends(get_state)) -> dict:
+    return app.adapter_registry.breakers()
+
+
+@router.get("/origins")
+async def list_origins(app: AppState = Depends(get_state)) -> dict:
+    return {stream_id: asdict(decision) for stream_id, decision in app.origins.snapshot().items()}
+
+
+@router.get("/origins/{stream_id}")
+async def read_origin(stream_id: str, app: AppState = Depends(get_state)) -> dict:
+    try:
+        return asdict(app.origin_decision(stream_id))
+    except ValueError as exc:  # pragma: no cover - simple mapping
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+
+@router.put("/origins/{stream_id}/override")
+async def override_origin(stream_id: str, payload: Dict[str, str], app: AppState = Depends(get_state)) -> dict:
+    origin = payload.get("origin")
+    if origin is None:
+        # An empty body must not clear the override; that is what DELETE is for.
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail='"origin" is required')
+    if app.repository.get_stream(stream_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="stream not found")
+    try:
+        return asdict(app.override_origin(stream_id, origin))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.delete("/origins/{stream_id}/override")
+async def clear_origin_override(stream_id: str, app: AppState = Depends(get_state)) -> dict:
+    try:
+        return asdict(app.override_origin(stream_id, None))
+    except ValueError as exc:  # pragma: no cover - simple mapping
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+
+@router.get("/config")
+async def config_status(app: AppState = Depends(get_state)) -> dict:
+    """Repository version, the outcome of the last config reload and write-behind store counters."""
+    watcher = app.config_watcher
+    return {
+        "version": app.repository.version,
+        "reloads": watcher.reloads,
+        "last_reload": asdict(watcher.last_reload) if watcher.last_reload is not None else None,
+        "startup": {"phases": app.startup, "config_source": app.config_loader.source},
+        "store": app.writer.stats() if app.writer is not None else None,
+    }
+
+
+@router.post("/config/reload")
+async def reload_config(app: AppState = Depends(get_state)) -> dict:
+    """Re-read changed config files now instead of waiting for the watcher."""
+    report = await app.config_watcher.reload()
+    if report.error is not None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=report.error)
+    return asdict(report)
+
+
+@router.get("/drift")
+async def drift_status(app: AppState = Depends(get_state)) -> dict:
+    return app.drift.snapshot()
+
+
+@router.post("/reconcile/{stream_id}", status_code=status.HTTP_202_ACCEPTED)
+async def reconcile(stream_id: str, force: bool = False, app: AppState = Depends(get_state)) -> dict:
+    try:
+        job = app.submit_reconcile_job(stream_id, force=force)
+    except ValueError as exc:  # pragma: no cover - simple mapping
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    return {"job_id": job.id, "status": job.state, "status_url": f"{router.prefix}/jobs/{job.id}"}
+
+
+@router.get("/jobs")
+async def list_jobs(limit: int = Query(50, ge=1, le=JOBS_MAX_LIMIT), app: AppState = Depends(get_state)) -> list:
+    return [job.to_dict() for job in app.jobs.recent(limit)]
+
+
+@router.get("/jobs/{job_id}")
+async def read_job(job_id: str, app: AppState = Depends(get_state)) -> dict:
+    job = app.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="job not found")
+    return job.to_dict()
+
+
+def _stream_ids(ids: str) -> List[str]:
+    stream_ids = [stream_id for stream_id in (part.strip() for part in ids.split(",")) if stream_id]
+    if len(stream_ids) > STATS_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"at most {STATS_MAX_IDS} ids")
+    return stream_ids
+
+
+@router.get("/stats/streams")
+async def streams_stats(ids: str, app: AppState = Depends(get_state)) -> dict:
+    """Combined primary+backup stats for a comma-separated list of streams."""
+    stream_ids = _stream_ids(ids)
+    results = await app.combined_stats_many(stream_ids)
+    return {stream_id: result if isinstance(result, dict) else asdict(result) for stream_id, result in results.items()}
+
+
+@router.get("/stats/live")
+async def live_stats(request: Request, ids: Optional[str] = None, app: AppState = Depends(get_state)):
+    """Server-Sent Events with the stats fields that changed, for the given streams or all of them."""
+    stream_ids = None if ids is None else _stream_ids(ids)
+    unknown = [stream_id for stream_id in stream_ids or () if app.repository.get_stream(stream_id) is None]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"unknown streams: {', '.join(unknown)}")
+    try:
+        subscription = app.live_stats.subscribe(stream_ids)
+    except TooManySubscribers as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    return StreamingResponse(
+        _sse_frames(request, app, subscription),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_frames(request: Request, app: AppState, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        while not await request.is_disconnected():
+            frames = await subscription.next(LIVE_KEEPALIVE)
+            if not frames:
+                yield ": keepalive\n\n"
+                continue
+            events = []
+            for adapter_key, frame in frames.items():
+                stream_id, _, origin = adapter_key.rpartition(":")
+                payload = {"stream_id": stream_id, "origin": origin, "dropped": subscription.dropped, **frame}
+                events.append(f"event: stats\ndata: {json.dumps(payload)}\n\n")
+            yield "".join(events)
+    finally:
+        app.live_stats.unsubscribe(subscription)
 
 
 @router.get("/stats/streams/{stream_id}")
-async def stream_stats(stream_id: str, app: AppState = Depends(get_state)):
+async def stream_stats(
+    stream_id: str, origin: str = "primary", combined: bool = False, app: AppState = Depends(get_state)
+):
+    try:
+        if combined:
+            return await app.combined_stats(stream_id)
+        return await app.fetch_stats(stream_id, origin=origin)
+    except ValueError as exc:  # pragma: no cover - simple mapping
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except AdapterError as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+
+
+@router.get("/stats/streams/{stream_id}/history")
+async def stream_stats_history(
+    stream_id: str,
+    origin: str = "primary",
+    window: float = 300.0,
+    step: float = 0.0,
+    app: AppState = Depends(get_state),
+) -> dict:
     try:
-        return await app.fetch_stats(stream_id)
+        return app.stats_history(stream_id, origin=origin, window=window, step=step)
     except ValueError as exc:  # pragma: no cover - simple mapping
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
 
@@ -96,7 +400,11 @@ async def admin_home(app: AppState = Depends(get_state)) -> str:
         "<section><h2>Clients</h2><ul>",
     ]
     for client in clients:
-        html.append(f"<li><strong>{client.display_name}</strong> ({client.id}) – profile {client.playback_profile}</li>")
+        streams_for_client = len(app.repository.streams_for_client(client.id))
+        html.append(
+            f"<li><strong>{client.display_name}</strong> ({client.id}) – profile {client.playback_profile}, "
+            f"{streams_for_client} streams</li>"
+        )
     html.append("</ul></section>")
     html.append("<section><h2>Streams</h2><ul>")
     for stream in streams:
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from fastapi import FastAPI
 
+from .api.metrics import router as metrics_router
 from .api.routes import router
 from .state import AppState
 
@@ -12,11 +13,16 @@ state = AppState()
 def create_app() -> FastAPI:
     app = FastAPI(title="Media Controller", version="0.1.0")
     app.include_router(router)
+    app.include_router(metrics_router)
 
     @app.get("/")
     async def index() -> dict[str, str]:
         return {"message": "media controller online"}
 
+    @app.on_event("startup")
+    async def _startup() -> None:
+        await state.start()
+
     @app.on_event("shutdown")
     async def _shutdown() -> None:
         await state.shutdown()
@@ -1,13 +1,27 @@
 """Helpers to load controller configuration from YAML."""
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import yaml
 
+from .core import models
 from .core.models import Client, PlaybackProfile, Stream
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
 
 class ConfigBundle:
     """Container for parsed configuration data."""
@@ -27,18 +41,195 @@ class ConfigBundle:
         return self.streams[stream_id]
 
 
-def _load_yaml(path: Path) -> Dict:
-    with path.open("r", encoding="utf-8") as fp:
-        return yaml.safe_load(fp)
+# File name, top-level YAML key and model for each entity kind, in ``ConfigBundle`` order.
+CONFIG_FILES: Dict[str, Tuple[str, str, Callable[..., Any]]] = {
+    "clients": ("clients.yaml", "clients", Client),
+    "playback_profiles": ("playback_profiles.yaml", "profiles", PlaybackProfile),
+    "streams": ("streams.yaml", "streams", Stream),
+}
+
+
+def _parse(data: bytes, key: str, model: Callable[..., Any]) -> List[Any]:
+    return [model(**item) for item in yaml.load(data, Loader=SafeLoader)[key]]
+
+
+def _entity_key(entity: Any) -> str:
+    return entity.name if isinstance(entity, PlaybackProfile) else entity.id
 
 
 def load_from_directory(config_dir: Path) -> ConfigBundle:
-    clients_raw = _load_yaml(config_dir / "clients.yaml")
-    profiles_raw = _load_yaml(config_dir / "playback_profiles.yaml")
-    streams_raw = _load_yaml(config_dir / "streams.yaml")
+    return ConfigBundle(*(_parse((config_dir / name).read_bytes(), key, model) for name, key, model in CONFIG_FILES.values()))
+
+
+# Bump when the snapshot layout changes; model changes are covered by hashing models.py.
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_PREFIX = "config-"
+
+
+def content_hash(files: Dict[str, bytes]) -> str:
+    """Hash of the config file contents plus everything that shapes the compiled model graph."""
+    digest = hashlib.sha256(f"format={SNAPSHOT_FORMAT}".encode())
+    digest.update(Path(models.__file__).read_bytes())
+    for name in sorted(files):
+        digest.update(name.encode() + b"\0" + files[name] + b"\0")
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """Already-validated ``ConfigBundle`` contents keyed by :func:`content_hash`.
+
+    Snapshots hold the plain field values as JSON and are rebuilt with the
+    model constructors, so loading one skips YAML parsing and never runs code
+    from the file; a tampered snapshot can at most change the config, like
+    editing the YAML would.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / f"{SNAPSHOT_PREFIX}{digest}.json"
+
+    def read(self, digest: str) -> Optional[ConfigBundle]:
+        path = self._path(digest)
+        try:
+            payload = json.loads(path.read_bytes())
+            if payload.get("format") != SNAPSHOT_FORMAT or payload.get("hash") != digest:
+                return None
+            return ConfigBundle(
+                *([model(**item) for item in payload[kind]] for kind, (_, _, model) in CONFIG_FILES.items())
+            )
+        except FileNotFoundError:
+            return None
+        except Exception as exc:  # noqa: BLE001 - a bad snapshot only costs a YAML parse
+            logger.warning("ignoring unreadable config snapshot", extra={"path": str(path), "error": str(exc)})
+            return None
+
+    def write(self, digest: str, bundle: ConfigBundle) -> None:
+        """Atomically store ``bundle`` under ``digest`` and drop snapshots of older contents."""
+        payload: Dict[str, Any] = {"format": SNAPSHOT_FORMAT, "hash": digest}
+        payload.update((kind, [asdict(item) for item in getattr(bundle, kind).values()]) for kind in CONFIG_FILES)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self._path(digest)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as fp:
+                json.dump(payload, fp, separators=(",", ":"))
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        for stale in self.directory.glob(f"{SNAPSHOT_PREFIX}*"):
+            if stale != target:
+                stale.unlink(missing_ok=True)
+
+
+@dataclass
+class EntityDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+@dataclass
+class ConfigDiff:
+    clients: EntityDiff = field(default_factory=EntityDiff)
+    playback_profiles: EntityDiff = field(default_factory=EntityDiff)
+    streams: EntityDiff = field(default_factory=EntityDiff)
+
+    def __bool__(self) -> bool:
+        return bool(self.clients or self.playback_profiles or self.streams)
+
+
+def diff_bundles(old: ConfigBundle, new: ConfigBundle) -> ConfigDiff:
+    """Entity-level differences between two bundles; entities shared by identity are skipped cheaply."""
+    diff = ConfigDiff()
+    for kind in CONFIG_FILES:
+        before: Dict[str, Any] = getattr(old, kind)
+        after: Dict[str, Any] = getattr(new, kind)
+        if before is after:
+            continue
+        entity = getattr(diff, kind)
+        entity.added = sorted(after.keys() - before.keys())
+        entity.removed = sorted(before.keys() - after.keys())
+        entity.changed = sorted(
+            key for key in after.keys() & before.keys() if after[key] is not before[key] and after[key] != before[key]
+        )
+    return diff
+
+
+class IncrementalLoader:
+    """Loads a config directory, re-parsing only files whose size or mtime changed.
+
+    Each :meth:`load` returns a new :class:`ConfigBundle`. Entity maps of files
+    that did not change are shared with the previous bundle, so bundles are
+    copy-on-write snapshots that must not be mutated in place. With a
+    :class:`SnapshotCache` the first load reuses a compiled snapshot when the
+    file contents hash matches, and every parse refreshes it.
+    """
+
+    def __init__(self, config_dir: Path, *, snapshots: Optional[SnapshotCache] = None) -> None:
+        self.config_dir = Path(config_dir)
+        self.snapshots = snapshots
+        self.source: Optional[str] = None
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._attempted: Dict[str, Tuple[int, int]] = {}
+        self._bundle: ConfigBundle | None = None
+
+    def _stamp(self, name: str) -> Tuple[int, int]:
+        stat = (self.config_dir / name).stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed_files(self) -> List[str]:
+        """Files modified since they were last read, successfully or not."""
+        return [
+            name
+            for name, _, _ in CONFIG_FILES.values()
+            if self._bundle is None or self._stamp(name) != self._attempted.get(name)
+        ]
+
+    def load(self) -> Tuple[ConfigBundle, List[str]]:
+        """Return the current bundle and the files parsed to build it.
+
+        If a file fails to parse the error propagates and the previous bundle
+        stays current; :meth:`changed_files` stops reporting the file until it
+        changes again. ``source`` tells whether the bundle came from ``yaml``
+        or a compiled ``snapshot``.
+        """
+        previous = self._bundle
+        stamps = {name: self._stamp(name) for name, _, _ in CONFIG_FILES.values()}
+        changed = {name for name, stamp in stamps.items() if previous is None or stamp != self._stamps.get(name)}
+        self._attempted.update((name, stamps[name]) for name in changed)
+        wanted = stamps if self.snapshots is not None and changed else changed
+        contents = {name: (self.config_dir / name).read_bytes() for name in wanted}
+        digest = content_hash(contents) if self.snapshots is not None and changed else None
 
-    clients = [Client(**data) for data in clients_raw["clients"]]
-    profiles = [PlaybackProfile(**data) for data in profiles_raw["profiles"]]
-    streams = [Stream(**data) for data in streams_raw["streams"]]
+        bundle = self.snapshots.read(digest) if previous is None and digest is not None else None
+        if bundle is not None:
+            self.source, parsed = "snapshot", []
+        else:
+            bundle = ConfigBundle([], [], [])
+            parsed = []
+            for kind, (name, key, model) in CONFIG_FILES.items():
+                if name not in changed:
+                    setattr(bundle, kind, getattr(previous, kind))
+                    continue
+                setattr(bundle, kind, {_entity_key(item): item for item in _parse(contents[name], key, model)})
+                parsed.append(name)
+            if parsed:
+                self.source = "yaml"
+            if digest is not None:
+                self._save_snapshot(digest, bundle)
+        self._stamps = stamps
+        self._bundle = bundle
+        return bundle, parsed
 
-    return ConfigBundle(clients, profiles, streams)
+    def _save_snapshot(self, digest: str, bundle: ConfigBundle) -> None:
+        assert self.snapshots is not None
+        try:
+            self.snapshots.write(digest, bundle)
+        except OSError as exc:
+            logger.warning("could not write config snapshot", extra={"error": str(exc)})
@@ -0,0 +1,53 @@
+"""Edge token verification for ``auth_request``-style subrequests."""
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional, Tuple
+
+from .signer import TOKEN_PARAM, URLSigner, query_value, strip_origin
+
+_CACHEABLE_REASONS = frozenset({"unknown_kid", "bad_signature"})
+
+
+class EdgeAuthorizer:
+    """Verifies signed URIs and prefix tokens for CDN edges, remembering recent rejections.
+
+    A prefix token is taken from the ``token`` argument (the cookie) or the
+    ``token`` query parameter; otherwise the URI must carry its own signature.
+    Rejected credentials are kept in a small FIFO-bounded negative cache so replayed
+    bad tokens skip the HMAC. The cache is dropped whenever the signer's key
+    ring changes, since a previously unknown ``kid`` may have become valid.
+    """
+
+    def __init__(self, signer: URLSigner, *, negative_cache_size: int = 4096, negative_ttl: int = 30) -> None:
+        self._signer = signer
+        self._negative: Dict[str, Tuple[str, float]] = {}
+        self._negative_cache_size = negative_cache_size
+        self._negative_ttl = negative_ttl
+        self._generation = signer.generation
+
+    def check(self, uri: str, *, token: Optional[str] = None, now: Optional[float] = None) -> Optional[str]:
+        """Return ``None`` if ``uri`` is authorized, else the denial reason."""
+        now = time.time() if now is None else now
+        if self._generation != self._signer.generation:
+            self._negative.clear()
+            self._generation = self._signer.generation
+        uri = strip_origin(uri)
+        start = uri.find("?")
+        if not token and start >= 0:
+            token = query_value(uri[start + 1 :], f"{TOKEN_PARAM}=")
+        credential = token or uri
+        cached = self._negative.get(credential)
+        if cached is not None:
+            if cached[1] > now:
+                return cached[0]
+            del self._negative[credential]
+        if token:
+            reason = self._signer.verify_token(token, uri if start < 0 else uri[:start], now=int(now))
+        else:
+            reason = self._signer.verify_uri(uri, now=int(now))
+        if reason in _CACHEABLE_REASONS:
+            if len(self._negative) >= self._negative_cache_size:
+                del self._negative[next(iter(self._negative))]
+            self._negative[credential] = (reason, now + self._negative_ttl)
+        return reason
@@ -0,0 +1,149 @@
+"""Origin health scoring and primary/backup selection for the sign path."""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional
+
+from .models import CombinedStats, OriginStats, StreamStats
+
+ORIGINS = ("primary", "backup")
+UP_STATUSES = frozenset({"live", "online", "up", "active", "ok"})
+
+
+@dataclass(frozen=True)
+class HealthThresholds:
+    part_age: float = 1.5
+    segment_age: float = 6.0
+    error_rate: float = 0.05
+    cpu: float = 90.0
+    # Fail over when primary scores below ``degraded`` and backup beats it by ``margin``.
+    degraded: float = 0.5
+    recovered: float = 0.8
+    margin: float = 0.2
+    # Consecutive stats rounds a condition must hold before the decision changes.
+    switch_after: int = 2
+    recover_after: int = 3
+
+
+def score(stats: Optional[StreamStats], thresholds: HealthThresholds = HealthThresholds()) -> float:
+    """Health in ``[0, 1]``; 0 when the origin did not answer or ingest is down.
+
+    Part age over the alert threshold alone takes an origin below the failover
+    line; segment age, error rate and CPU each cost a smaller share.
+    """
+    if stats is None or stats.ingest_status not in UP_STATUSES:
+        return 0.0
+    value = 1.0
+    if stats.last_part_age_seconds is not None and stats.last_part_age_seconds > thresholds.part_age:
+        value -= 0.6 if stats.last_part_age_seconds <= 2 * thresholds.part_age else 0.8
+    if stats.last_segment_age_seconds is not None and stats.last_segment_age_seconds > thresholds.segment_age:
+        value -= 0.3
+    if stats.http_error_rate is not None and stats.http_error_rate > thresholds.error_rate:
+        value -= 0.3
+    if stats.cpu_percent is not None and stats.cpu_percent > thresholds.cpu:
+        value -= 0.1
+    return max(0.0, round(value, 3))
+
+
+@dataclass
+class OriginDecision:
+    origin: str = "primary"
+    reason: str = "default"
+    since: float = 0.0
+    override: Optional[str] = None
+    scores: Dict[str, float] = field(default_factory=dict)
+    streak: int = 0
+
+
+class OriginSelector:
+    """Keeps a per-stream primary/backup decision with hysteresis.
+
+    Decisions change only when stats rounds are observed, so the sign path
+    reads a cached boolean per stream. An override pins a stream to one origin
+    until it is cleared.
+    """
+
+    def __init__(self, thresholds: HealthThresholds | None = None, *, clock: Callable[[], float] = time.time) -> None:
+        self.thresholds = thresholds or HealthThresholds()
+        self._clock = clock
+        self._decisions: Dict[str, OriginDecision] = {}
+        self._use_backup: Dict[str, bool] = {}
+
+    def use_backup(self, stream_id: str) -> bool:
+        return self._use_backup.get(stream_id, False)
+
+    def observe_round(self, results: Mapping[str, Optional[StreamStats]], now: Optional[float] = None) -> None:
+        """Feed one stats round keyed by ``stream:origin``; ``None`` means the poll failed."""
+        now = self._clock() if now is None else now
+        per_stream: Dict[str, Dict[str, float]] = {}
+        for adapter_key, stats in results.items():
+            stream_id, _, origin = adapter_key.rpartition(":")
+            per_stream.setdefault(stream_id, {})[origin] = score(stats, self.thresholds)
+        for stream_id, scores in per_stream.items():
+            self._evaluate(stream_id, scores, now)
+
+    def _evaluate(self, stream_id: str, scores: Dict[str, float], now: float) -> None:
+        decision = self._decisions.setdefault(stream_id, OriginDecision(since=now))
+        decision.scores.update(scores)
+        if decision.override is not None:
+            return
+        t = self.thresholds
+        primary = decision.scores.get("primary", 0.0)
+        backup = decision.scores.get("backup", 0.0)
+        if decision.origin == "primary":
+            wants_change = primary < t.degraded and backup >= primary + t.margin
+            needed, target, reason = t.switch_after, "backup", "primary_degraded"
+        else:
+            backup_worse = backup < t.degraded and primary >= backup + t.margin
+            wants_change = backup_worse or primary >= t.recovered
+            needed = t.switch_after if backup_worse else t.recover_after
+            target, reason = "primary", "backup_degraded" if backup_worse else "primary_recovered"
+        decision.streak = decision.streak + 1 if wants_change else 0
+        if decision.streak >= needed:
+            self._set(stream_id, decision, target, reason, now)
+
+    def _set(self, stream_id: str, decision: OriginDecision, origin: str, reason: str, now: float) -> None:
+        decision.origin, decision.reason, decision.since, decision.streak = origin, reason, now, 0
+        self._use_backup[stream_id] = origin == "backup"
+
+    def override(self, stream_id: str, origin: Optional[str]) -> OriginDecision:
+        """Pin ``stream_id`` to ``origin``; ``None`` returns it to automatic selection on primary."""
+        if origin is not None and origin not in ORIGINS:
+            raise ValueError(f"unknown origin {origin}")
+        decision = self._decisions.setdefault(stream_id, OriginDecision(since=self._clock()))
+        decision.override = origin
+        self._set(stream_id, decision, origin or "primary", "override" if origin else "override_cleared", self._clock())
+        return decision
+
+    def decision(self, stream_id: str) -> OriginDecision:
+        return self._decisions.get(stream_id) or OriginDecision()
+
+    def forget(self, stream_id: str) -> None:
+        self._decisions.pop(stream_id, None)
+        self._use_backup.pop(stream_id, None)
+
+    def snapshot(self) -> Dict[str, OriginDecision]:
+        return dict(self._decisions)
+
+
+def combine(
+    stream_id: str,
+    origins: Mapping[str, OriginStats],
+    selected_origin: str,
+    thresholds: HealthThresholds = HealthThresholds(),
+) -> CombinedStats:
+    """Merge per-origin stats into one view with health scores and per-rendition metrics."""
+    combined = CombinedStats(stream_id=stream_id, selected_origin=selected_origin)
+    for origin in ORIGINS:
+        entry = origins.get(origin) or OriginStats(origin=origin, error="not queried")
+        entry.health = score(entry.stats, thresholds)
+        combined.origins[origin] = entry
+        if entry.stats is None:
+            combined.partial = True
+            continue
+        if entry.health >= thresholds.degraded:
+            combined.healthy_origins.append(origin)
+        for rendition, metrics in entry.stats.renditions.items():
+            combined.renditions.setdefault(rendition, {})[origin] = metrics
+    return combined
@@ -164,6 +164,11 @@ class Stream:
             self.packaging = PackagingSpec(**self.packaging)
 
 
+def stream_path_prefix(stream_id: str) -> str:
+    """Path prefix under which all playlists, parts and segments of a stream live."""
+    return f"/live/{stream_id}/"
+
+
 @dataclass
 class TokenRules:
     max_sessions: int
@@ -177,13 +182,25 @@ class SignedURL:
     ttl: int
 
 
+class TokenScope(str, Enum):
+    path = "path"
+    prefix = "prefix"
+
+
 @dataclass
 class SignRequest:
     client_id: str
     stream_id: str
-    use_backup: bool = False
+    # None lets the controller pick the healthier origin; True/False pins it.
+    use_backup: Optional[bool] = None
     ip: Optional[str] = None
     country: Optional[str] = None
+    scope: TokenScope = TokenScope.path
+    session_id: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if isinstance(self.scope, str):
+            self.scope = TokenScope(self.scope)
 
 
 @dataclass
@@ -191,6 +208,36 @@ class SignResponse:
     url: str
     ttl: int
     kid: str
+    token: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+@dataclass
+class SignBatchRequest:
+    items: List[SignRequest] = field(default_factory=list)
+
+
+@dataclass
+class SignBatchResult:
+    index: int
+    url: Optional[str] = None
+    ttl: Optional[int] = None
+    kid: Optional[str] = None
+    token: Optional[str] = None
+    session_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class SignBatchResponse:
+    results: List[SignBatchResult] = field(default_factory=list)
+
+
+@dataclass
+class ReconcileRequest:
+    streams: Optional[List[str]] = None
+    priority: List[str] = field(default_factory=list)
+    force: bool = False
 
 
 @dataclass
@@ -202,3 +249,23 @@ class StreamStats:
     cpu_percent: Optional[float] = None
     http_error_rate: Optional[float] = None
     renditions: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+@dataclass
+class OriginStats:
+    origin: str
+    stats: Optional[StreamStats] = None
+    source: Optional[str] = None  # "cache" or "live"
+    error: Optional[str] = None
+    health: float = 0.0
+
+
+@dataclass
+class CombinedStats:
+    stream_id: str
+    selected_origin: str
+    origins: Dict[str, OriginStats] = field(default_factory=dict)
+    # rendition name -> origin -> metrics reported by that origin
+    renditions: Dict[str, Dict[str, Dict[str, float]]] = field(default_factory=dict)
+    healthy_origins: List[str] = field(default_factory=list)
+    partial: bool = False
@@ -1,11 +1,17 @@
 """Policy evaluation for playback authorization."""
 from __future__ import annotations
 
+from bisect import bisect_right
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Optional
+from ipaddress import IPv4Network, ip_address, ip_network
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 from .models import Client, SignRequest, Stream
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..repository import Repository
+
 
 class AuthorizationError(Exception):
     """Raised when a request does not satisfy policy checks."""
@@ -23,25 +29,165 @@ class PolicyEngine:
         self._streams = streams
 
     def authorize(self, req: SignRequest, *, ip: Optional[str], country: Optional[str]) -> Client:
-        client = self._clients.get(req.client_id)
+        client, _ = self.resolve(req.client_id, req.stream_id)
+        self.check_access(client, ip=ip, country=country)
+        return client
+
+    def resolve(self, client_id: str, stream_id: str) -> Tuple[Client, Stream]:
+        """Run the viewer-independent checks for a client/stream pair."""
+        client = self._clients.get(client_id)
         if client is None:
             raise AuthorizationError("unknown_client")
 
-        stream = self._streams.get(req.stream_id)
+        stream = self._streams.get(stream_id)
         if stream is None:
             raise AuthorizationError("unknown_stream")
 
-        if req.client_id not in stream.assigned_clients:
+        if client_id not in stream.assigned_clients:
             raise AuthorizationError("client_not_assigned")
 
+        return client, stream
+
+    def check_access(self, client: Client, *, ip: Optional[str], country: Optional[str]) -> None:
+        """Run the per-viewer IP and geo checks."""
         if ip and not client.is_ip_allowed(ip):
             raise AuthorizationError("ip_not_allowed")
 
         if not client.is_geo_allowed(country):
             raise AuthorizationError("geo_not_allowed")
 
-        return client
-
     @staticmethod
     def build_expiry(client: Client, *, now: Optional[datetime] = None) -> int:
         return int(client.token_expiry(now).timestamp())
+
+
+@dataclass(frozen=True)
+class IntervalTable:
+    """Sorted, non-overlapping ``[start, end]`` integer ranges searched with bisect."""
+
+    starts: Tuple[int, ...] = ()
+    ends: Tuple[int, ...] = ()
+
+    @classmethod
+    def build(cls, ranges: Iterable[Tuple[int, int]]) -> "IntervalTable":
+        merged: List[List[int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return cls(tuple(r[0] for r in merged), tuple(r[1] for r in merged))
+
+    def __contains__(self, value: int) -> bool:
+        idx = bisect_right(self.starts, value) - 1
+        return idx >= 0 and value <= self.ends[idx]
+
+
+@dataclass(frozen=True)
+class CompiledClient:
+    """Lookup-ready form of a client's IP and geo policy."""
+
+    client: Client
+    ipv4: IntervalTable
+    ipv6: IntervalTable
+    any_ip: bool
+    allow_countries: Optional[FrozenSet[str]]
+    deny_countries: FrozenSet[str]
+
+    @classmethod
+    def compile(cls, client: Client) -> "CompiledClient":
+        v4: List[Tuple[int, int]] = []
+        v6: List[Tuple[int, int]] = []
+        for cidr in client.ip_allowlist:
+            network = ip_network(cidr)
+            target = v4 if isinstance(network, IPv4Network) else v6
+            target.append((int(network.network_address), int(network.broadcast_address)))
+        allow = client.geo.allow_countries
+        return cls(
+            client=client,
+            ipv4=IntervalTable.build(v4),
+            ipv6=IntervalTable.build(v6),
+            any_ip=not client.ip_allowlist,
+            allow_countries=frozenset(allow) if allow else None,
+            deny_countries=frozenset(client.geo.deny_countries or ()),
+        )
+
+    def is_ip_allowed(self, ip: str) -> bool:
+        if self.any_ip:
+            return True
+        target = ip_address(ip)
+        table = self.ipv4 if target.version == 4 else self.ipv6
+        return int(target) in table
+
+    def is_geo_allowed(self, country_code: Optional[str]) -> bool:
+        if country_code is None:
+            return self.allow_countries is None
+        country_code = country_code.upper()
+        if country_code in self.deny_countries:
+            return False
+        if self.allow_countries is not None:
+            return country_code in self.allow_countries
+        return True
+
+
+class CompiledPolicyEngine(PolicyEngine):
+    """Policy engine backed by precomputed lookup tables.
+
+    CIDR allowlists become sorted interval tables, geo lists become frozensets and
+    stream assignments become per-stream sets. Call :meth:`on_change` whenever a
+    client or stream is added or replaced so the affected entry is recompiled.
+    """
+
+    def __init__(self, clients: Dict[str, Client], streams: Dict[str, Stream]):
+        super().__init__(clients, streams)
+        self._compiled: Dict[str, CompiledClient] = {}
+        self._assignments: Dict[str, FrozenSet[str]] = {}
+        self.rebuild()
+
+    @classmethod
+    def from_repository(cls, repository: "Repository") -> "CompiledPolicyEngine":
+        """Engine reading the repository's maps, kept compiled through its change feed."""
+        engine = cls(repository.clients, repository.streams)
+        repository.subscribe(engine.on_change)
+        return engine
+
+    def rebuild(self) -> None:
+        self._compiled = {client_id: CompiledClient.compile(client) for client_id, client in self._clients.items()}
+        self._assignments = {stream_id: frozenset(stream.assigned_clients) for stream_id, stream in self._streams.items()}
+
+    def on_change(self, kind: str, key: str) -> None:
+        """Recompile a single entity after a repository write."""
+        if kind == "client":
+            client = self._clients.get(key)
+            if client is None:
+                self._compiled.pop(key, None)
+            else:
+                self._compiled[key] = CompiledClient.compile(client)
+        elif kind == "stream":
+            stream = self._streams.get(key)
+            if stream is None:
+                self._assignments.pop(key, None)
+            else:
+                self._assignments[key] = frozenset(stream.assigned_clients)
+
+    def resolve(self, client_id: str, stream_id: str) -> Tuple[Client, Stream]:
+        compiled = self._compiled.get(client_id)
+        if compiled is None:
+            raise AuthorizationError("unknown_client")
+
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            raise AuthorizationError("unknown_stream")
+
+        if client_id not in self._assignments.get(stream_id, ()):
+            raise AuthorizationError("client_not_assigned")
+
+        return compiled.client, stream
+
+    def check_access(self, client: Client, *, ip: Optional[str], country: Optional[str]) -> None:
+        compiled = self._compiled[client.id]
+        if ip and not compiled.is_ip_allowed(ip):
+            raise AuthorizationError("ip_not_allowed")
+
+        if not compiled.is_geo_allowed(country):
+            raise AuthorizationError("geo_not_allowed")
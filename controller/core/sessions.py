@@ -0,0 +1,169 @@
+"""Per-client playback session accounting for admission control."""
+from __future__ import annotations
+
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .policy import AuthorizationError
+
+
+@dataclass(eq=False)
+class Session:
+    id: str
+    client_id: str
+    stream_id: str
+    expires_at: int
+
+
+@dataclass
+class ClientShard:
+    """Sessions and per-stream counts for a single client."""
+
+    sessions: Dict[str, Session] = field(default_factory=dict)
+    per_stream: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, session: Session) -> None:
+        self.sessions[session.id] = session
+        self.per_stream[session.stream_id] = self.per_stream.get(session.stream_id, 0) + 1
+
+    def remove(self, session: Session) -> None:
+        del self.sessions[session.id]
+        remaining = self.per_stream[session.stream_id] - 1
+        if remaining:
+            self.per_stream[session.stream_id] = remaining
+        else:
+            del self.per_stream[session.stream_id]
+
+
+class TimerWheel:
+    """Hashed timer wheel with one slot per ``tick_seconds``.
+
+    Entries are bucketed by expiry tick; advancing the wheel hands back whole
+    slots instead of scanning every live entry. Entries more than one
+    revolution out stay in their slot until their tick comes round.
+    """
+
+    def __init__(self, *, slots: int = 512, tick_seconds: int = 1, now: Optional[int] = None) -> None:
+        self._slots: List[List[Tuple[int, Session]]] = [[] for _ in range(slots)]
+        self._tick = tick_seconds
+        self._cursor = int(time.time() if now is None else now) // tick_seconds
+
+    def schedule(self, session: Session) -> None:
+        tick = max(session.expires_at // self._tick, self._cursor + 1)
+        self._slots[tick % len(self._slots)].append((tick, session))
+
+    def advance(self, now: int) -> List[Session]:
+        """Pop every entry whose tick is due by ``now``."""
+        target = now // self._tick
+        due: List[Session] = []
+        steps = min(target - self._cursor, len(self._slots))
+        for tick in range(target - steps + 1, target + 1):
+            slot = self._slots[tick % len(self._slots)]
+            if not slot:
+                continue
+            keep = [entry for entry in slot if entry[0] > target]
+            due.extend(session for entry_tick, session in slot if entry_tick <= target)
+            slot[:] = keep
+        self._cursor = max(self._cursor, target)
+        return due
+
+
+class SessionTable:
+    """Admission control enforcing ``Client.max_sessions``.
+
+    Sessions are sharded by client so admission, refresh and release are O(1)
+    dictionary operations. Expired sessions are reclaimed in bulk from a
+    :class:`TimerWheel` on each admission (or :meth:`expire` call); refreshed
+    sessions are only pushed back onto the wheel when their original slot
+    comes due. ``on_expire`` is called with the ids of clients that lost
+    sessions to expiry.
+    """
+
+    def __init__(
+        self, *, wheel: Optional[TimerWheel] = None, on_expire: Optional[Callable[[Set[str]], None]] = None
+    ) -> None:
+        self._shards: Dict[str, ClientShard] = {}
+        self._wheel = wheel or TimerWheel()
+        self._on_expire = on_expire
+
+    def admit(
+        self,
+        client_id: str,
+        stream_id: str,
+        *,
+        limit: int,
+        expires_at: int,
+        session_id: Optional[str] = None,
+        now: Optional[int] = None,
+    ) -> str:
+        """Admit or refresh a session and return its id.
+
+        Raises :class:`AuthorizationError` with ``max_sessions_exceeded`` when the
+        client already holds ``limit`` live sessions.
+        """
+        self.expire(int(time.time()) if now is None else now)
+        shard = self._shards.setdefault(client_id, ClientShard())
+        if session_id is not None:
+            session = shard.sessions.get(session_id)
+            if session is not None and session.stream_id == stream_id:
+                session.expires_at = max(session.expires_at, expires_at)
+                return session.id
+            if session is not None:
+                shard.remove(session)
+        if len(shard.sessions) >= limit:
+            raise AuthorizationError("max_sessions_exceeded")
+        session = Session(
+            id=session_id or secrets.token_urlsafe(12),
+            client_id=client_id,
+            stream_id=stream_id,
+            expires_at=expires_at,
+        )
+        shard.add(session)
+        self._wheel.schedule(session)
+        return session.id
+
+    def release(self, client_id: str, session_id: str) -> bool:
+        shard = self._shards.get(client_id)
+        session = shard.sessions.get(session_id) if shard else None
+        if session is None:
+            return False
+        shard.remove(session)
+        return True
+
+    def expire(self, now: int) -> int:
+        """Reclaim sessions whose tokens expired at or before ``now``."""
+        reclaimed = 0
+        clients: Set[str] = set()
+        for session in self._wheel.advance(now):
+            shard = self._shards.get(session.client_id)
+            if shard is None or shard.sessions.get(session.id) is not session:
+                continue
+            if session.expires_at > now:
+                self._wheel.schedule(session)
+                continue
+            shard.remove(session)
+            clients.add(session.client_id)
+            reclaimed += 1
+        if clients and self._on_expire is not None:
+            self._on_expire(clients)
+        return reclaimed
+
+    def count(self, client_id: str, stream_id: Optional[str] = None) -> int:
+        shard = self._shards.get(client_id)
+        if shard is None:
+            return 0
+        if stream_id is None:
+            return len(shard.sessions)
+        return shard.per_stream.get(stream_id, 0)
+
+    def stream_count(self, stream_id: str) -> int:
+        return sum(shard.per_stream.get(stream_id, 0) for shard in self._shards.values())
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {
+            client_id: {"total": len(shard.sessions), "streams": dict(shard.per_stream)}
+            for client_id, shard in self._shards.items()
+            if shard.sessions
+        }
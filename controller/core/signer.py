@@ -4,12 +4,17 @@ from __future__ import annotations
 import base64
 import hmac
 import os
+import posixpath
+from collections import OrderedDict
 from dataclasses import dataclass
 from hashlib import sha256
-from typing import Dict
-from urllib.parse import urlencode, urljoin
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlencode, urljoin
 
-from .models import Client, SignRequest, SignResponse, Stream
+from .models import Client, SignRequest, SignResponse, Stream, TokenScope, stream_path_prefix
+
+TOKEN_PARAM = "token"
+TOKEN_COOKIE = "mc_token"
 
 
 @dataclass
@@ -24,43 +29,300 @@ class SigningKey:
         return cls(kid=kid, secret=secret)
 
 
+CacheKey = Tuple[str, str, bool, TokenScope, str, int]
+
+
+class SignedURLCache:
+    """Bounded LRU of signed URLs keyed on (client, stream, use_backup, scope, kid, expiry bucket).
+
+    Expiries are rounded up to the next ``bucket_seconds`` boundary so viewers of
+    the same client and stream share one signature per bucket; tokens therefore
+    live up to ``bucket_seconds`` longer than the client TTL.
+    """
+
+    def __init__(self, max_entries: int = 10000, bucket_seconds: int = 10) -> None:
+        if max_entries <= 0 or bucket_seconds <= 0:
+            raise ValueError("max_entries and bucket_seconds must be positive")
+        self.max_entries = max_entries
+        self.bucket_seconds = bucket_seconds
+        self._entries: "OrderedDict[CacheKey, SignResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bucket(self, expiry: int) -> int:
+        return -(-expiry // self.bucket_seconds) * self.bucket_seconds
+
+    def get(self, key: CacheKey) -> Optional[SignResponse]:
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: CacheKey, response: SignResponse) -> None:
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "bucket_seconds": self.bucket_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
 class URLSigner:
     """Signs LL-HLS playlists and segments."""
 
-    def __init__(self, keys: Dict[str, SigningKey]) -> None:
+    def __init__(self, keys: Dict[str, SigningKey], *, cache: Optional[SignedURLCache] = None) -> None:
         if not keys:
             raise ValueError("at least one signing key is required")
         self._keys = keys
         self._current_kid = max(keys.keys())
+        self._macs = {kid: hmac.new(key.secret, digestmod=sha256) for kid, key in keys.items()}
+        self.cache = cache
+        self.generation = 0
 
     @property
     def current_key(self) -> SigningKey:
         return self._keys[self._current_kid]
 
+    @property
+    def keys(self) -> List[SigningKey]:
+        return list(self._keys.values())
+
     def rotate(self, key: SigningKey) -> None:
         self._keys[key.kid] = key
+        self._macs[key.kid] = hmac.new(key.secret, digestmod=sha256)
         self._current_kid = key.kid
+        self.generation += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def load(self, keys: Iterable[SigningKey], current_kid: str) -> None:
+        """Replace the whole key ring, e.g. with one published by another worker."""
+        ring = {key.kid: key for key in keys}
+        if current_kid not in ring:
+            raise ValueError(f"current kid {current_kid} missing from key ring")
+        self._keys = ring
+        self._macs = {kid: hmac.new(key.secret, digestmod=sha256) for kid, key in ring.items()}
+        self._current_kid = current_kid
+        self.generation += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def on_change(self, kind: str, key: str) -> None:
+        """Repository listener: cached URLs may embed the old client or stream, so drop them."""
+        if self.cache is not None and kind in ("client", "stream"):
+            self.cache.clear()
 
     def sign(self, *, client: Client, stream: Stream, request: SignRequest, expiry: int) -> SignResponse:
+        key = self.current_key
+        return self._sign_cached(self._macs[key.kid], key, client, stream, request, expiry)
+
+    def sign_many(self, items: Iterable[Tuple[Client, Stream, SignRequest, int]]) -> List[SignResponse]:
+        """Sign a batch of (client, stream, request, expiry) tuples with one keyed HMAC state."""
+        key = self.current_key
+        mac = self._macs[key.kid]
+        return [self._sign_cached(mac, key, client, stream, request, expiry) for client, stream, request, expiry in items]
+
+    def _sign_cached(
+        self,
+        mac: hmac.HMAC,
+        key: SigningKey,
+        client: Client,
+        stream: Stream,
+        request: SignRequest,
+        expiry: int,
+    ) -> SignResponse:
+        cache = self.cache
+        if cache is None:
+            return self._sign_with(mac, key, client, stream, request, expiry)
+        bucketed = cache.bucket(expiry)
+        cache_key = (client.id, stream.id, bool(request.use_backup), request.scope, key.kid, bucketed)
+        response = cache.get(cache_key)
+        if response is None:
+            response = self._sign_with(mac, key, client, stream, request, bucketed)
+            cache.put(cache_key, response)
+        # ``expiry`` is now + TTL; report how long this URL actually lives, which the bucket extends.
+        # Built directly rather than with ``dataclasses.replace``, which costs several times more per hit.
+        return SignResponse(response.url, client.token_ttl_seconds + bucketed - expiry, response.kid, response.token)
+
+    @staticmethod
+    def _sign_with(
+        mac: hmac.HMAC,
+        key: SigningKey,
+        client: Client,
+        stream: Stream,
+        request: SignRequest,
+        expiry: int,
+    ) -> SignResponse:
         base_path = stream.packaging.ll_hls_path
-        path = f"/live/{stream.id}/index.m3u8" if not base_path else base_path
+        path = f"{stream_path_prefix(stream.id)}index.m3u8" if not base_path else base_path
+        if request.scope == TokenScope.prefix:
+            token = URLSigner._prefix_token(mac, key, client, stream, request, expiry)
+            url = urljoin("https://cdn.example", f"{path}?{TOKEN_PARAM}={token}")
+            return SignResponse(url=url, ttl=client.token_ttl_seconds, kid=key.kid, token=token)
         params = {
             "client": client.id,
             "exp": str(expiry),
-            "kid": self.current_key.kid,
+            "kid": key.kid,
         }
         if request.use_backup:
             params["backup"] = "1"
         query = urlencode(params)
         to_sign = f"{path}?{query}".encode()
-        signature = hmac.new(self.current_key.secret, to_sign, sha256).digest()
-        sig_b64 = base64.urlsafe_b64encode(signature).rstrip(b"=").decode()
+        digest = mac.copy()
+        digest.update(to_sign)
+        sig_b64 = base64.urlsafe_b64encode(digest.digest()).rstrip(b"=").decode()
         params["sig"] = sig_b64
         url = urljoin("https://cdn.example", f"{path}?{urlencode(params)}")
-        return SignResponse(url=url, ttl=client.token_ttl_seconds, kid=self.current_key.kid)
+        return SignResponse(url=url, ttl=client.token_ttl_seconds, kid=key.kid)
+
+    @staticmethod
+    def _prefix_token(
+        mac: hmac.HMAC,
+        key: SigningKey,
+        client: Client,
+        stream: Stream,
+        request: SignRequest,
+        expiry: int,
+    ) -> str:
+        """Build a ``~``-separated token valid for every path under the stream prefix."""
+        fields = (
+            f"exp={expiry}~kid={quote(key.kid, safe='')}~client={quote(client.id, safe='')}"
+            f"~prefix={quote(stream_path_prefix(stream.id), safe='')}"
+        )
+        if request.use_backup:
+            fields += "~backup=1"
+        digest = mac.copy()
+        digest.update(fields.encode())
+        sig_b64 = base64.urlsafe_b64encode(digest.digest()).rstrip(b"=").decode()
+        return f"{fields}~sig={sig_b64}"
+
+    def verify(self, url_path: str, *, signature: str, now: Optional[int] = None) -> bool:
+        """Check ``signature`` over ``url_path`` using the key named by its ``kid``.
+
+        Falls back to the current key when the payload carries no ``kid``. When
+        ``now`` is given the ``exp`` parameter is enforced as well.
+        """
+        query = url_path[url_path.find("?") + 1 :]
+        kid = query_value(query, "kid=") or self._current_kid
+        mac = self._macs.get(kid)
+        if mac is None:
+            return False
+        if now is not None and not _unexpired(query_value(query, "exp="), now):
+            return False
+        digest = mac.copy()
+        digest.update(url_path.encode())
+        expected = base64.urlsafe_b64encode(digest.digest()).rstrip(b"=")
+        return _compare_signature(expected, signature)
+
+    def verify_uri(self, uri: str, *, now: int) -> Optional[str]:
+        """Verify a signed request URI as produced by :meth:`sign`.
+
+        ``uri`` is the path and query (a full URL is accepted too). Returns
+        ``None`` when the URI is valid, otherwise a short denial reason.
+        """
+        uri = strip_origin(uri)
+        start = uri.find("?")
+        marker = uri.rfind("&sig=")
+        if start < 0 or marker < start:
+            return "missing_signature"
+        query = uri[start + 1 : marker]
+        mac = self._macs.get(query_value(query, "kid=") or "")
+        if mac is None:
+            return "unknown_kid"
+        if not _unexpired(query_value(query, "exp="), now):
+            return "expired"
+        digest = mac.copy()
+        digest.update(uri[:marker].encode())
+        expected = base64.urlsafe_b64encode(digest.digest()).rstrip(b"=")
+        if not _compare_signature(expected, uri[marker + 5 :]):
+            return "bad_signature"
+        return None
+
+    def verify_token(self, token: str, path: str, *, now: int) -> Optional[str]:
+        """Verify a prefix-scoped token for a request ``path``.
+
+        Returns ``None`` when the token is valid and covers ``path``, otherwise a
+        short denial reason.
+        """
+        marker = token.rfind("~sig=")
+        if marker < 0:
+            return "missing_signature"
+        fields = token[:marker]
+        mac = self._macs.get(unquote(query_value(fields, "kid=", "~") or ""))
+        if mac is None:
+            return "unknown_kid"
+        if not _unexpired(query_value(fields, "exp=", "~"), now):
+            return "expired"
+        prefix = unquote(query_value(fields, "prefix=", "~") or "")
+        path = normalize_path(path)
+        if not prefix or path is None or not path.startswith(prefix):
+            return "path_not_covered"
+        digest = mac.copy()
+        digest.update(fields.encode())
+        expected = base64.urlsafe_b64encode(digest.digest()).rstrip(b"=")
+        if not _compare_signature(expected, token[marker + 5 :]):
+            return "bad_signature"
+        return None
+
+
+def strip_origin(uri: str) -> str:
+    """Drop scheme and host from a full URL, leaving the path and query."""
+    if uri.startswith(("http://", "https://")):
+        slash = uri.find("/", uri.find("://") + 3)
+        return uri[slash:] if slash >= 0 else "/"
+    return uri
+
+
+def normalize_path(path: str) -> Optional[str]:
+    """Percent-decode ``path`` and resolve dot segments the way the origin will.
+
+    Returns ``None`` for paths that cannot be compared safely: an escape left
+    after decoding (double encoding), a backslash or a NUL byte.
+    """
+    if "%" not in path and "/." not in path and "//" not in path and "\\" not in path:
+        return path
+    decoded = unquote(path)
+    if "%" in decoded or "\\" in decoded or "\x00" in decoded:
+        return None
+    normalized = posixpath.normpath(decoded)
+    if decoded.endswith("/") and not normalized.endswith("/"):
+        normalized += "/"
+    return normalized
+
+
+def query_value(query: str, name: str, sep: str = "&") -> Optional[str]:
+    """Return the raw value of ``name`` (including its trailing ``=``) in ``query``."""
+    idx = query.find(name)
+    while idx > 0 and query[idx - 1] != sep:
+        idx = query.find(name, idx + 1)
+    if idx < 0:
+        return None
+    end = query.find(sep, idx)
+    return query[idx + len(name) : end if end >= 0 else len(query)]
+
+
+def _unexpired(exp: Optional[str], now: int) -> bool:
+    return exp is not None and exp.isdigit() and int(exp) >= now
+
 
-    def verify(self, url_path: str, *, signature: str) -> bool:
-        expected = hmac.new(self.current_key.secret, url_path.encode(), sha256).digest()
-        padding = "=" * (-len(signature) % 4)
-        provided = base64.urlsafe_b64decode(signature + padding)
-        return hmac.compare_digest(expected, provided)
+def _compare_signature(expected: bytes, provided: str) -> bool:
+    try:
+        return hmac.compare_digest(expected, provided.rstrip("=").encode("ascii"))
+    except UnicodeEncodeError:
+        return False
@@ -0,0 +1,163 @@
+"""In-process Prometheus instruments and text exposition.
+
+Each worker process owns its instruments. They are only touched from the
+event loop thread, so updates are plain dict and ``array`` writes with no
+locks, cheap enough for the sign hot path. Host-wide totals across workers
+come from :mod:`controller.shared_state` instead.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        name = f"{name}{{{rendered}}}"
+    if math.isinf(value):
+        text = "+Inf" if value > 0 else "-Inf"
+    elif math.isnan(value):
+        text = "NaN"
+    elif float(value).is_integer():
+        text = str(int(value))
+    else:
+        text = repr(float(value))
+    return f"{name} {text}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, total in sorted(self._values.items()):
+            lines.append(_format(self.name, dict(zip(self.labels, values)), total))
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; each label set keeps its counts in one ``array('d')``."""
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per label set: one slot per bucket, +Inf, then sum.
+        self._series: Dict[LabelValues, array] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = array("d", [0.0]) * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return 0 if series is None else int(sum(series[:-1]))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            labels = dict(zip(self.labels, values))
+            cumulative = 0.0
+            for bound, hits in zip((*self.buckets, math.inf), series):
+                cumulative += hits
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(_format(f"{self.name}_bucket", {**labels, "le": le}, cumulative))
+            lines.append(_format(f"{self.name}_sum", labels, series[-1]))
+            lines.append(_format(f"{self.name}_count", labels, cumulative))
+        return lines
+
+
+class MetricFamily:
+    """Samples produced at scrape time from cached state (gauges, or counters kept elsewhere)."""
+
+    def __init__(
+        self, name: str, help: str, samples: Iterable[Tuple[Dict[str, str], float]], type: str = "gauge"
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.type = type
+        self.samples = list(samples)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(_format(self.name, labels, value) for labels, value in self.samples)
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._instruments: List[object] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        instrument = Counter(name, help, labels)
+        self._instruments.append(instrument)
+        return instrument
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        instrument = Histogram(name, help, labels, buckets)
+        self._instruments.append(instrument)
+        return instrument
+
+    def render(self, collectors: Iterable[Callable[[], Iterable[MetricFamily]]] = ()) -> str:
+        lines: List[str] = []
+        for instrument in self._instruments:
+            lines.extend(instrument.render())  # type: ignore[attr-defined]
+        for collect in collectors:
+            for family in collect():
+                lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+SIGN_DURATION = REGISTRY.histogram(
+    "media_sign_duration_seconds", "Time to authorize and sign one playback URL, by outcome.", ("outcome",)
+)
+SIGN_BATCH_DURATION = REGISTRY.histogram(
+    "media_sign_batch_duration_seconds", "Time to sign one batch chunk."
+)
+SIGN_OUTCOMES = REGISTRY.counter(
+    "media_sign_outcomes_total", "Sign results by mode and outcome (ok or denial reason).", ("mode", "outcome")
+)
+RECONCILE_DURATION = REGISTRY.histogram(
+    "media_reconcile_duration_seconds",
+    "Duration of one reconcile step against one adapter origin.",
+    ("adapter", "step", "outcome"),
+    SLOW_BUCKETS,
+)
+ADAPTER_REQUEST_DURATION = REGISTRY.histogram(
+    "media_adapter_request_duration_seconds", "Latency of HTTP requests to origin hosts.", ("origin", "method")
+)
+ADAPTER_REQUEST_ERRORS = REGISTRY.counter(
+    "media_adapter_request_errors_total", "Failed HTTP requests to origin hosts by reason.", ("origin", "reason")
+)
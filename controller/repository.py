@@ -1,44 +1,282 @@
-"""Simple in-memory repositories for controller entities."""
+"""In-memory indexed store for controller entities."""
 from __future__ import annotations
 
-from typing import Dict, Optional
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
-from .core.models import Client, PlaybackProfile, Stream
+from .core.models import AdapterKind, Client, PlaybackProfile, Stream
+from .persistence import WriteBehind, digest
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .config_loader import ConfigBundle
+
+ChangeListener = Callable[[str, str], None]
+
+ADAPTER_LABELS = ("primary", "backup")
+# How long an id the store did not have is remembered, and how many such ids are kept.
+MISS_TTL = 5.0
+MAX_MISSES = 10_000
+# ``ConfigBundle`` attribute holding each entity kind.
+SEED_MAPS = {"client": "clients", "profile": "playback_profiles", "stream": "streams"}
+KIND_ORDER = ("profile", "client", "stream")
+
+
+def _link(index: Dict[str, Set[str]], key: str, value: str) -> None:
+    index.setdefault(key, set()).add(value)
+
+
+def _unlink(index: Dict[str, Set[str]], key: str, value: str) -> None:
+    members = index.get(key)
+    if members is not None:
+        members.discard(value)
+        if not members:
+            del index[key]
 
 
 class Repository:
-    """In-memory repository seeded from configuration."""
+    """Single source of truth for clients, playback profiles and streams.
+
+    Besides the primary maps it maintains secondary indexes so relationship
+    queries never scan: client to streams, profile to clients, adapter
+    ``base_url`` to streams and adapter kind to adapter keys
+    (``stream:label``). ``version`` goes up on every write, so readers can tell
+    whether anything changed without comparing contents.
+
+    With a store attached, writes made with ``persist=True`` (the default) are
+    queued to it. Lookups only ever read memory; :meth:`ensure_loaded` pulls
+    an id this worker does not have from the store, off the event loop, which
+    is how a worker picks up entities created by another one before the next
+    poll, and :meth:`apply_stored` applies the updates and deletes the writer
+    polls from the store. ``seed`` is the
+    YAML bundle currently applied; seed and reload paths write with
+    ``persist=False`` (see :mod:`controller.persistence` for how stored rows
+    and YAML take precedence).
+    """
 
     def __init__(self) -> None:
         self.clients: Dict[str, Client] = {}
         self.playback_profiles: Dict[str, PlaybackProfile] = {}
         self.streams: Dict[str, Stream] = {}
+        self.version = 0
+        self._streams_by_client: Dict[str, Set[str]] = {}
+        self._clients_by_profile: Dict[str, Set[str]] = {}
+        self._streams_by_host: Dict[str, Set[str]] = {}
+        self._adapters_by_kind: Dict[str, Set[str]] = {}
+        self._listeners: List[ChangeListener] = []
+        self.seed: Optional["ConfigBundle"] = None
+        self._writer: Optional[WriteBehind] = None
+        self._misses: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._miss_ttl = MISS_TTL
+        self._clock: Callable[[], float] = time.monotonic
+
+    def attach(self, writer: WriteBehind, *, miss_ttl: float = MISS_TTL, clock: Callable[[], float] = time.monotonic) -> None:
+        """Persist writes through ``writer``; :meth:`ensure_loaded` remembers store misses for ``miss_ttl`` seconds."""
+        self._writer = writer
+        self._miss_ttl = miss_ttl
+        self._clock = clock
+        writer.on_remote = self.apply_stored
+
+    def seed_entity(self, kind: str, key: str) -> Any:
+        """The YAML definition of ``key``, or None."""
+        return None if self.seed is None else getattr(self.seed, SEED_MAPS[kind]).get(key)
+
+    def _persist(self, kind: str, key: str, entity: Any) -> None:
+        self._misses.pop((kind, key), None)
+        if self._writer is not None:
+            self._writer.enqueue(kind, key, entity, digest(self.seed_entity(kind, key)))
+
+    def discard_override(self, kind: str, key: str) -> None:
+        """Drop any stored row for ``key`` so its YAML definition (or absence) applies from now on."""
+        self._misses.pop((kind, key), None)
+        if self._writer is not None:
+            self._writer.enqueue(kind, key, None)
+
+    async def ensure_loaded(self, kind: str, key: str) -> bool:
+        """Make sure ``key`` is in memory, loading it from the store if another worker created it.
+
+        Store reads run in a worker thread; ids the store does not have are
+        remembered (bounded, oldest first out) so repeated misses stay in memory.
+        """
+        if key in getattr(self, SEED_MAPS[kind]):
+            return True
+        writer = self._writer
+        if writer is None:
+            return False
+        entry = (kind, key)
+        now = self._clock()
+        expires = self._misses.get(entry)
+        if expires is not None:
+            if expires > now:
+                return False
+            del self._misses[entry]
+        queued, entity = writer.pending_write(kind, key)
+        if not queued:
+            entity = await asyncio.to_thread(writer.store.get, kind, key)
+        if key in getattr(self, SEED_MAPS[kind]):
+            return True  # written while the store was queried
+        if entity is None:
+            self._misses[entry] = now + self._miss_ttl
+            while len(self._misses) > MAX_MISSES:
+                self._misses.popitem(last=False)
+            return False
+        if kind == "client":
+            # Bring the profile in first so listeners compiling the client can see it.
+            await self.ensure_loaded("profile", entity.playback_profile)
+        self.add(kind, entity, persist=False)
+        return True
+
+    def apply_stored(self, rows: Iterable[Tuple[str, str, Any, str]]) -> int:
+        """Apply rows other workers wrote (entity ``None`` for a delete) without writing them back.
 
-    def add_client(self, client: Client) -> None:
+        Rows overriding a YAML definition this worker no longer has are
+        skipped, as are rows equal to what memory already holds. Returns how
+        many entities changed.
+        """
+        changed = 0
+        # Profiles before the clients that use them, clients before their streams.
+        for kind, key, entity, base in sorted(rows, key=lambda row: KIND_ORDER.index(row[0])):
+            if base != digest(self.seed_entity(kind, key)):
+                continue
+            self._misses.pop((kind, key), None)
+            current = getattr(self, SEED_MAPS[kind]).get(key)
+            if entity is None:
+                changed += self.remove(kind, key, persist=False)
+            elif entity != current:
+                self.add(kind, entity, persist=False)
+                changed += 1
+        return changed
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """Register ``listener(kind, key)`` to be called after every write."""
+        self._listeners.append(listener)
+
+    def _notify(self, kind: str, key: str) -> None:
+        self.version += 1
+        for listener in self._listeners:
+            listener(kind, key)
+
+    def add_client(self, client: Client, *, persist: bool = True) -> None:
+        previous = self.clients.get(client.id)
+        if previous is not None:
+            _unlink(self._clients_by_profile, previous.playback_profile, previous.id)
         self.clients[client.id] = client
+        _link(self._clients_by_profile, client.playback_profile, client.id)
+        if persist:
+            self._persist("client", client.id, client)
+        self._notify("client", client.id)
+
+    def remove_client(self, client_id: str, *, persist: bool = True) -> bool:
+        client = self.clients.pop(client_id, None)
+        if client is None:
+            return False
+        _unlink(self._clients_by_profile, client.playback_profile, client_id)
+        if persist:
+            self._persist("client", client_id, None)
+        self._notify("client", client_id)
+        return True
 
     def get_client(self, client_id: str) -> Optional[Client]:
         return self.clients.get(client_id)
 
-    def add_playback_profile(self, profile: PlaybackProfile) -> None:
+    def add_playback_profile(self, profile: PlaybackProfile, *, persist: bool = True) -> None:
         self.playback_profiles[profile.name] = profile
+        if persist:
+            self._persist("profile", profile.name, profile)
+        self._notify("profile", profile.name)
+
+    def remove_playback_profile(self, name: str, *, persist: bool = True) -> bool:
+        if self.playback_profiles.pop(name, None) is None:
+            return False
+        if persist:
+            self._persist("profile", name, None)
+        self._notify("profile", name)
+        return True
 
     def get_playback_profile(self, name: str) -> Optional[PlaybackProfile]:
         return self.playback_profiles.get(name)
 
-    def add_stream(self, stream: Stream) -> None:
+    def add_stream(self, stream: Stream, *, persist: bool = True) -> None:
+        previous = self.streams.get(stream.id)
+        if previous is not None:
+            self._unindex_stream(previous)
         self.streams[stream.id] = stream
+        for client_id in stream.assigned_clients:
+            _link(self._streams_by_client, client_id, stream.id)
+        for label in ADAPTER_LABELS:
+            spec = getattr(stream.adapters, label)
+            _link(self._streams_by_host, spec.base_url, stream.id)
+            _link(self._adapters_by_kind, spec.kind.value, f"{stream.id}:{label}")
+        if persist:
+            self._persist("stream", stream.id, stream)
+        self._notify("stream", stream.id)
+
+    def remove_stream(self, stream_id: str, *, persist: bool = True) -> bool:
+        stream = self.streams.pop(stream_id, None)
+        if stream is None:
+            return False
+        self._unindex_stream(stream)
+        if persist:
+            self._persist("stream", stream_id, None)
+        self._notify("stream", stream_id)
+        return True
+
+    def _unindex_stream(self, stream: Stream) -> None:
+        for client_id in stream.assigned_clients:
+            _unlink(self._streams_by_client, client_id, stream.id)
+        for label in ADAPTER_LABELS:
+            spec = getattr(stream.adapters, label)
+            _unlink(self._streams_by_host, spec.base_url, stream.id)
+            _unlink(self._adapters_by_kind, spec.kind.value, f"{stream.id}:{label}")
 
     def get_stream(self, stream_id: str) -> Optional[Stream]:
         return self.streams.get(stream_id)
 
+    def streams_for_client(self, client_id: str) -> List[Stream]:
+        return [self.streams[stream_id] for stream_id in sorted(self._streams_by_client.get(client_id, ()))]
+
+    def clients_for_profile(self, name: str) -> List[Client]:
+        return [self.clients[client_id] for client_id in sorted(self._clients_by_profile.get(name, ()))]
+
+    def streams_on_host(self, base_url: str) -> List[Stream]:
+        return [self.streams[stream_id] for stream_id in sorted(self._streams_by_host.get(base_url, ()))]
+
+    def adapters_of_kind(self, kind: Union[AdapterKind, str]) -> List[str]:
+        """Adapter keys (``stream:label``) whose origin is of ``kind``."""
+        return sorted(self._adapters_by_kind.get(AdapterKind(kind).value, ()))
+
+    def profiles_for_stream(self, stream: Stream) -> List[PlaybackProfile]:
+        """Distinct playback profiles of the clients assigned to ``stream``, in assignment order.
+
+        Clients or profiles that do not exist (yet) are skipped.
+        """
+        names = dict.fromkeys(
+            client.playback_profile for client in map(self.clients.get, stream.assigned_clients) if client is not None
+        )
+        return [self.playback_profiles[name] for name in names if name in self.playback_profiles]
+
+    def add(self, kind: str, entity: Any, *, persist: bool = True) -> None:
+        {"client": self.add_client, "profile": self.add_playback_profile, "stream": self.add_stream}[kind](
+            entity, persist=persist
+        )
+
+    def remove(self, kind: str, key: str, *, persist: bool = True) -> bool:
+        removers = {"client": self.remove_client, "profile": self.remove_playback_profile, "stream": self.remove_stream}
+        return removers[kind](key, persist=persist)
+
+    def load(self, clients: Iterable[Client], profiles: Iterable[PlaybackProfile], streams: Iterable[Stream]) -> None:
+        """Bulk insert without persisting, e.g. from the YAML seed or the store itself."""
+        for client in clients:
+            self.add_client(client, persist=False)
+        for profile in profiles:
+            self.add_playback_profile(profile, persist=False)
+        for stream in streams:
+            self.add_stream(stream, persist=False)
+
     @classmethod
     def from_config(cls, bundle) -> "Repository":
         repo = cls()
-        for client in bundle.clients.values():
-            repo.add_client(client)
-        for profile in bundle.playback_profiles.values():
-            repo.add_playback_profile(profile)
-        for stream in bundle.streams.values():
-            repo.add_stream(stream)
+        repo.seed = bundle
+        repo.load(bundle.clients.values(), bundle.playback_profiles.values(), bundle.streams.values())
         return repo
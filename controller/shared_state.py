@@ -0,0 +1,267 @@
+"""Memory-mapped state shared by all worker processes on one host."""
+from __future__ import annotations
+
+import fcntl
+import logging
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .core.signer import SigningKey
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MCSHM002"
+MAX_KEYS = 16
+MIN_COUNTERS = 256
+MAX_WORKERS = 64
+
+KIND_COUNTER = 1
+KIND_GAUGE = 2
+
+# Header: magic, key ring version (seqlock), current key slot, key count, counter count, counter capacity.
+_HEADER = struct.Struct("<8sQIIII")
+_HEADER_SIZE = 64
+_KEY_ENTRY = struct.Struct("<B63sH446s")
+_KEY_AREA = _HEADER_SIZE
+_NAME_ENTRY = struct.Struct("<B63s")
+_NAME_AREA = _KEY_AREA + MAX_KEYS * _KEY_ENTRY.size
+
+_VERSION_OFFSET = 8
+_SEQLOCK_SPINS = 1000
+_U64 = struct.Struct("<Q")
+_I64 = struct.Struct("<q")
+
+
+class CounterTableFull(RuntimeError):
+    """No slot is left in the shared counter table for a new name."""
+
+
+class SharedState:
+    """Versioned key ring and per-worker counters in a memory-mapped file.
+
+    Writers serialize on an ``flock`` of the backing file. The key ring is
+    guarded by a seqlock so readers never block: the sign path only compares
+    the 8-byte ring version with the one it last loaded. Each worker owns one
+    counter row and is its only writer, so increments need no locking;
+    totals are summed across rows on read.
+
+    Counter names are allocated with :meth:`register`, which takes the file
+    lock; :meth:`incr`, :meth:`set_gauge` and :meth:`peer_total` only use
+    names registered beforehand and never lock or make system calls. The
+    table holds ``counters`` names, fixed by the first process to create the
+    file.
+    """
+
+    def __init__(self, path: Path, *, counters: int = MIN_COUNTERS) -> None:
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            header = os.pread(self._fd, _HEADER.size, 0)
+            fresh = len(header) < _HEADER.size or header[:8] != MAGIC
+            if not fresh:
+                existing = _HEADER.unpack(header)[5]
+                if existing < counters:
+                    logger.warning(
+                        "shared state file has fewer counter slots than requested; remove it while no worker runs to resize",
+                        extra={"path": str(path), "counters": existing, "requested": counters},
+                    )
+                counters = existing
+            self.capacity = counters
+            self._row_size = 8 + counters * 8
+            self._row_area = _NAME_AREA + counters * _NAME_ENTRY.size
+            size = self._row_area + MAX_WORKERS * self._row_size
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+            if fresh:
+                self._mm[:size] = bytes(size)
+                _HEADER.pack_into(self._mm, 0, MAGIC, 0, 0, 0, 0, counters)
+            self._row = self._claim_row()
+        self._names: Dict[str, int] = {}
+        self._values: List[int] = [_I64.unpack_from(self._mm, self._row + 8 + i * 8)[0] for i in range(counters)]
+        self._peers: List[int] = []
+        self.refresh_peers()
+
+    @classmethod
+    def from_env(cls, *, counters: int = MIN_COUNTERS) -> Optional["SharedState"]:
+        path = os.environ.get("CONTROLLER_SHARED_STATE")
+        return cls(Path(path), counters=max(counters, MIN_COUNTERS)) if path else None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _claim_row(self) -> int:
+        pid = os.getpid()
+        free: Optional[int] = None
+        for index in range(MAX_WORKERS):
+            offset = self._row_area + index * self._row_size
+            owner = _U64.unpack_from(self._mm, offset)[0]
+            if owner == pid:
+                return offset
+            if free is None and (owner == 0 or not _pid_alive(owner)):
+                free = offset
+        if free is None:
+            raise RuntimeError(f"no free worker slot in {self.path}")
+        _U64.pack_into(self._mm, free, pid)
+        self._reset_gauges(free)
+        return free
+
+    def _reset_gauges(self, row: int) -> None:
+        for index in range(self.capacity):
+            if self._mm[_NAME_AREA + index * _NAME_ENTRY.size] == KIND_GAUGE:
+                _I64.pack_into(self._mm, row + 8 + index * 8, 0)
+
+    # Key ring -----------------------------------------------------------------
+
+    @property
+    def key_version(self) -> int:
+        return _U64.unpack_from(self._mm, _VERSION_OFFSET)[0]
+
+    def read_keys(self) -> Tuple[int, List[SigningKey], Optional[str]]:
+        """Return ``(version, keys, current_kid)`` from a consistent snapshot."""
+        for _ in range(_SEQLOCK_SPINS):
+            before = self.key_version
+            if before % 2:
+                continue
+            try:
+                snapshot = self._read_key_area()
+            except (ValueError, IndexError, struct.error):
+                # A writer got in between; the version check below would reject this read anyway.
+                continue
+            if self.key_version == before:
+                return (before, *snapshot)
+        # A writer is slow or died mid-update; the file lock orders us after it.
+        with self._locked():
+            return (self.key_version, *self._read_key_area())
+
+    def _read_key_area(self) -> Tuple[List[SigningKey], Optional[str]]:
+        """Decode the key ring; raises ``ValueError`` on values a concurrent write left inconsistent."""
+        _, _, current, count, _, _ = _HEADER.unpack_from(self._mm, 0)
+        if count > MAX_KEYS or (count and current >= count):
+            raise ValueError(f"inconsistent key ring header: current={current} count={count}")
+        keys = []
+        for slot in range(count):
+            kid_len, kid, secret_len, secret = _KEY_ENTRY.unpack_from(self._mm, _KEY_AREA + slot * _KEY_ENTRY.size)
+            if kid_len > len(kid) or secret_len > len(secret):
+                raise ValueError(f"inconsistent key slot {slot}")
+            keys.append(SigningKey(kid=kid[:kid_len].decode(), secret=secret[:secret_len]))
+        return keys, keys[current].kid if keys else None
+
+    def publish_key(self, key: SigningKey) -> int:
+        """Add or replace ``key``, make it current and return the new ring version."""
+        kid = key.kid.encode()
+        if len(kid) > 63 or len(key.secret) > 446:
+            raise ValueError("kid must be <= 63 bytes and secret <= 446 bytes")
+        with self._locked():
+            keys, _ = self._read_key_area()
+            keys = [existing for existing in keys if existing.kid != key.kid][-(MAX_KEYS - 1) :] + [key]
+            writing = self.key_version | 1
+            _U64.pack_into(self._mm, _VERSION_OFFSET, writing)
+            for slot, entry in enumerate(keys):
+                raw_kid = entry.kid.encode()
+                _KEY_ENTRY.pack_into(
+                    self._mm, _KEY_AREA + slot * _KEY_ENTRY.size, len(raw_kid), raw_kid, len(entry.secret), entry.secret
+                )
+            struct.pack_into("<II", self._mm, 16, len(keys) - 1, len(keys))
+            _U64.pack_into(self._mm, _VERSION_OFFSET, writing + 1)
+            return writing + 1
+
+    # Counters -----------------------------------------------------------------
+
+    def register(self, name: str, kind: int) -> int:
+        """Return the slot of counter ``name``, allocating it if no worker has yet.
+
+        Raises :class:`CounterTableFull` when the table has no room left.
+        """
+        index = self._names.get(name)
+        if index is not None:
+            return index
+        raw = name.encode()[:63]
+        with self._locked():
+            count = struct.unpack_from("<I", self._mm, 24)[0]
+            for index in range(count):
+                entry_kind, entry_name = _NAME_ENTRY.unpack_from(self._mm, _NAME_AREA + index * _NAME_ENTRY.size)
+                if entry_name.rstrip(b"\0") == raw:
+                    self._names[name] = index
+                    return index
+            if count >= self.capacity:
+                raise CounterTableFull(f"all {self.capacity} shared counter slots in {self.path} are in use")
+            _NAME_ENTRY.pack_into(self._mm, _NAME_AREA + count * _NAME_ENTRY.size, kind, raw)
+            struct.pack_into("<I", self._mm, 24, count + 1)
+        self._names[name] = count
+        return count
+
+    def registered(self, name: str) -> bool:
+        return name in self._names
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        """Add ``amount`` to counter ``name``; raises ``KeyError`` unless it was registered."""
+        index = self._names[name]
+        self._values[index] += amount
+        _I64.pack_into(self._mm, self._row + 8 + index * 8, self._values[index])
+
+    def set_gauge(self, name: str, value: int) -> None:
+        """Set this worker's value of gauge ``name``; raises ``KeyError`` unless it was registered."""
+        index = self._names[name]
+        self._values[index] = value
+        _I64.pack_into(self._mm, self._row + 8 + index * 8, value)
+
+    def refresh_peers(self) -> None:
+        """Re-read which other worker rows belong to live processes.
+
+        This signals every row owner, so it runs from a periodic task rather
+        than per request. A worker that exits is still counted by
+        :meth:`peer_total` until the next refresh, which errs on the strict side.
+        """
+        peers = []
+        for row in range(MAX_WORKERS):
+            offset = self._row_area + row * self._row_size
+            owner = _U64.unpack_from(self._mm, offset)[0]
+            if owner != 0 and offset != self._row and _pid_alive(owner):
+                peers.append(offset)
+        self._peers = peers
+
+    def peer_total(self, name: str) -> int:
+        """Sum of gauge ``name`` over the other workers alive at the last :meth:`refresh_peers`."""
+        offset = 8 + self._names[name] * 8
+        return sum(_I64.unpack_from(self._mm, row + offset)[0] for row in self._peers)
+
+    def totals(self) -> Dict[str, int]:
+        """Sum every counter across worker rows; gauges only count live workers."""
+        count = struct.unpack_from("<I", self._mm, 24)[0]
+        names = [_NAME_ENTRY.unpack_from(self._mm, _NAME_AREA + i * _NAME_ENTRY.size) for i in range(count)]
+        totals = {name.rstrip(b"\0").decode(): 0 for _, name in names}
+        for row in range(MAX_WORKERS):
+            offset = self._row_area + row * self._row_size
+            owner = _U64.unpack_from(self._mm, offset)[0]
+            if owner == 0:
+                continue
+            alive = _pid_alive(owner)
+            for index, (kind, name) in enumerate(names):
+                if kind == KIND_GAUGE and not alive:
+                    continue
+                totals[name.rstrip(b"\0").decode()] += _I64.unpack_from(self._mm, offset + 8 + index * 8)[0]
+        return totals
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
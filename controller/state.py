@@ -2,80 +2,463 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict
-
-from .adapters.antmedia import AntMediaAdapter
-from .adapters.base import MediaAdapter
-from .adapters.nimble import NimbleAdapter
-from .adapters.wowza import WowzaAdapter
-from .config_loader import load_from_directory
-from .core.models import AdapterKind, SignRequest
-from .core.policy import AuthorizationError, PolicyEngine
-from .core.signer import SigningKey, URLSigner
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import IMPORT_STARTED
+
+from .adapters.base import AdapterError, MediaAdapter, ResiliencePolicy, deadline
+from .adapters.registry import AdapterRegistry, PoolSettings
+from .config_loader import IncrementalLoader, SnapshotCache
+from .core.edge_auth import EdgeAuthorizer
+from .core.health import ORIGINS, OriginDecision, OriginSelector, combine
+from .core.models import Client, CombinedStats, OriginStats, SignBatchResult, SignRequest, SignResponse, Stream
+from .core.policy import AuthorizationError, CompiledPolicyEngine
+from .core.sessions import SessionTable
+from .core.signer import SignedURLCache, SigningKey, URLSigner
+from .persistence import WriteBehind, bulk_load
+from .metrics import SIGN_BATCH_DURATION, SIGN_DURATION, SIGN_OUTCOMES
 from .repository import Repository
-from .workers.reconciler import Reconciler
+from .shared_state import KIND_COUNTER, KIND_GAUGE, CounterTableFull, SharedState
+from .workers.config_watch import ConfigWatcher
+from .workers.drift import DriftDetector
+from .workers.jobs import Job, JobStore
+from .workers.live import StatsBroadcaster
+from .workers.reconciler import HostLimiter, Reconciler
+from .workers.scheduler import ReconcileScheduler
+from .workers.stats import StatsCollector
+
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _timed(phases: Dict[str, float], name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = round(time.perf_counter() - started, 6)
 
 
 class AppState:
     """Holds long-lived application components."""
 
     def __init__(self, config_dir: str | None = None) -> None:
+        started = time.perf_counter()
+        # Seconds per startup phase; ``import`` runs from the first controller import to here.
+        self.startup: Dict[str, float] = {"import": round(started - IMPORT_STARTED, 6)}
         config_path = Path(config_dir or os.environ.get("CONTROLLER_CONFIG", "config"))
-        self.config_bundle = load_from_directory(config_path)
-        self.repository = Repository.from_config(self.config_bundle)
-        self.policy = PolicyEngine(self.repository.clients, self.repository.streams)
-        self.signer = URLSigner({"default": SigningKey(kid="default", secret=os.environ.get("SIGNING_SECRET", "dev-secret").encode())})
-        self.adapters: Dict[str, MediaAdapter] = {}
-        self._build_adapters()
-        self.reconciler = Reconciler(adapters=self.adapters, config=self.config_bundle)
+        snapshot_dir = os.environ.get("CONFIG_SNAPSHOT_DIR")
+        self.config_loader = IncrementalLoader(config_path, snapshots=SnapshotCache(Path(snapshot_dir)) if snapshot_dir else None)
+        with _timed(self.startup, "parse"):
+            snapshot, _ = self.config_loader.load()
+        with _timed(self.startup, "build"):
+            self.repository = Repository.from_config(snapshot)
+            # Entities created through the API live in the store and win over the YAML seed.
+            self.writer = WriteBehind.from_env()
+            if self.writer is not None:
+                with _timed(self.startup, "store"):
+                    bulk_load(self.repository, self.writer.store)
+                self.repository.attach(self.writer)
+            self.policy = CompiledPolicyEngine.from_repository(self.repository)
+            self.signer = URLSigner(
+                {"default": SigningKey(kid="default", secret=os.environ.get("SIGNING_SECRET", "dev-secret").encode())},
+                cache=self._build_sign_cache(),
+            )
+            self.repository.subscribe(self.signer.on_change)
+        self.edge_auth = EdgeAuthorizer(self.signer)
+        self.sessions = SessionTable(on_expire=self._publish_sessions)
+        # Two counters per client, with room for as many clients again created through the API.
+        counters = int(os.environ.get("SHARED_COUNTERS", "0")) or 4 * len(self.repository.clients)
+        self.shared = SharedState.from_env(counters=counters)
+        self._key_version = -1
+        if self.shared is not None:
+            if self.shared.read_keys()[2] is None:
+                self.shared.publish_key(self.signer.current_key)
+            self._sync_keys()
+            for client_id in self.repository.clients:
+                self._register_counters(client_id)
+        with _timed(self.startup, "adapters"):
+            self.adapter_registry = AdapterRegistry(PoolSettings.from_env(), policy=ResiliencePolicy.from_env())
+            self.adapters: Dict[str, MediaAdapter] = {}
+            for stream in self.repository.streams.values():
+                self._build_adapters(stream)
+        self.repository.subscribe(self._on_repository_change)
+        self.reconciler = Reconciler(
+            adapters=self.adapters,
+            repository=self.repository,
+            limiter=HostLimiter(int(os.environ.get("RECONCILE_PER_HOST", "4"))),
+            call_deadline=float(os.environ.get("RECONCILE_DEADLINE", "60")) or None,
+        )
+        self.scheduler = ReconcileScheduler(
+            self.reconciler,
+            workers=int(os.environ.get("RECONCILE_WORKERS", "8")),
+            is_live=lambda stream_id: self.sessions.stream_count(stream_id) > 0,
+        )
+        self.config_watcher = ConfigWatcher(
+            self.config_loader,
+            self.repository,
+            snapshot,
+            reconcile=lambda stream_ids: self.scheduler.submit(stream_ids),
+            interval=float(os.environ.get("CONFIG_RELOAD_INTERVAL", "10")) or 10.0,
+        )
+        self.jobs = JobStore(int(os.environ.get("RECONCILE_JOB_HISTORY", "1000")))
+        self.stats = StatsCollector(
+            adapters=self.adapters,
+            repository=self.repository,
+            interval=float(os.environ.get("STATS_INTERVAL", "5")) or 5.0,
+            capacity=int(os.environ.get("STATS_HISTORY", "720")),
+        )
+        self.drift = DriftDetector(
+            adapters=self.adapters,
+            repository=self.repository,
+            reconciler=self.reconciler,
+            scheduler=self.scheduler,
+            interval=float(os.environ.get("DRIFT_INTERVAL", "60")),
+            stats=self.stats,
+        )
+        self.origins = OriginSelector()
+        self.stats_deadline = float(os.environ.get("STATS_DEADLINE", "2")) or None
+        self.stats_fanout = int(os.environ.get("STATS_FANOUT", "16"))
+        self.live_stats = StatsBroadcaster(max_subscribers=int(os.environ.get("STATS_LIVE_SUBSCRIBERS", "256")))
+        self.stats.subscribe(self.origins.observe_round)
+        self.stats.subscribe(self.live_stats.observe_round)
         self._lock = asyncio.Lock()
+        self._session_sweep: Optional[asyncio.Task] = None
+        self.startup["total"] = round(time.perf_counter() - IMPORT_STARTED, 6)
+        logger.info("controller state ready", extra={"startup": self.startup, "config_source": self.config_loader.source})
+
+    @staticmethod
+    def _build_sign_cache() -> SignedURLCache | None:
+        size = int(os.environ.get("SIGN_CACHE_SIZE", "0"))
+        if size <= 0:
+            return None
+        return SignedURLCache(max_entries=size, bucket_seconds=int(os.environ.get("SIGN_CACHE_BUCKET_SECONDS", "10")))
+
+    def _build_adapters(self, stream: Stream) -> None:
+        for label, spec in (("primary", stream.adapters.primary), ("backup", stream.adapters.backup)):
+            self.adapters[f"{stream.id}:{label}"] = self.adapter_registry.get(spec.kind, spec.base_url, spec.api_key)
+
+    def _on_repository_change(self, kind: str, key: str) -> None:
+        """Keep the adapter map and shared counters in step with entities created, replaced or removed after startup."""
+        if kind == "client" and self.shared is not None and key in self.repository.clients:
+            self._register_counters(key)
+        if kind != "stream":
+            return
+        stream = self.repository.streams.get(key)
+        if stream is None:
+            for label in ("primary", "backup"):
+                self.adapters.pop(f"{key}:{label}", None)
+            self.stats.forget(key)
+            self.origins.forget(key)
+            self.live_stats.forget(key)
+        else:
+            self._build_adapters(stream)
 
-    def _build_adapters(self) -> None:
-        for stream in self.config_bundle.streams.values():
-            for label, spec in (("primary", stream.adapters.primary), ("backup", stream.adapters.backup)):
-                key = f"{stream.id}:{label}"
-                adapter = self._create_adapter(spec)
-                self.adapters[key] = adapter
-
-    def _create_adapter(self, spec) -> MediaAdapter:
-        if spec.kind == AdapterKind.nimble:
-            return NimbleAdapter(spec.base_url, spec.api_key)
-        if spec.kind == AdapterKind.wowza:
-            return WowzaAdapter(spec.base_url, spec.api_key)
-        if spec.kind == AdapterKind.antmedia:
-            return AntMediaAdapter(spec.base_url, spec.api_key)
-        raise ValueError(f"unsupported adapter kind {spec.kind}")
-
-    async def sign(self, request: SignRequest) -> tuple[str, int, str]:
+    def _sync_keys(self) -> None:
+        """Adopt the shared key ring if another worker rotated it."""
+        shared = self.shared
+        if shared is None or shared.key_version == self._key_version:
+            return
+        version, keys, current_kid = shared.read_keys()
+        if current_kid is not None:
+            self.signer.load(keys, current_kid)
+        self._key_version = version
+
+    def _register_counters(self, client_id: str) -> None:
+        """Allocate the client's shared counters, keeping the lock and table scan off the sign path."""
+        try:
+            self.shared.register(f"sign_total:{client_id}", KIND_COUNTER)
+            self.shared.register(f"sessions:{client_id}", KIND_GAUGE)
+        except CounterTableFull:
+            logger.error(
+                "shared counter table full; signing for this client is refused until workers restart with SHARED_COUNTERS raised",
+                extra={"client_id": client_id, "capacity": self.shared.capacity},
+            )
+
+    def _record_signs(self, client_id: str, count: int = 1) -> None:
+        if self.shared is not None:
+            self.shared.incr(f"sign_total:{client_id}", count)
+            self._publish_sessions((client_id,))
+
+    def _publish_sessions(self, client_ids: Iterable[str]) -> None:
+        """Share this worker's session counts so every worker enforces host-wide limits."""
+        if self.shared is not None:
+            for client_id in client_ids:
+                self.shared.set_gauge(f"sessions:{client_id}", self.sessions.count(client_id))
+
+    async def _sweep_sessions(self, interval: float) -> None:
+        """Expire sessions on idle workers too, so their shared counts do not hold other workers back."""
+        while True:
+            await asyncio.sleep(interval)
+            self.shared.refresh_peers()
+            self.sessions.expire(int(time.time()))
+
+    def authorize_edge(self, uri: str, *, token: Optional[str] = None) -> Optional[str]:
+        self._sync_keys()
+        return self.edge_auth.check(uri, token=token)
+
+    async def sign(self, request: SignRequest) -> SignResponse:
+        started = time.perf_counter()
+        await self.repository.ensure_loaded("stream", request.stream_id)
+        await self.repository.ensure_loaded("client", request.client_id)
+        try:
+            response = self._sign(request)
+        except AuthorizationError as exc:
+            SIGN_DURATION.observe(time.perf_counter() - started, exc.reason)
+            SIGN_OUTCOMES.inc("single", exc.reason)
+            raise
+        SIGN_DURATION.observe(time.perf_counter() - started, "ok")
+        SIGN_OUTCOMES.inc("single", "ok")
+        return response
+
+    def _sign(self, request: SignRequest) -> SignResponse:
+        self._sync_keys()
         stream = self.repository.get_stream(request.stream_id)
         if not stream:
             raise AuthorizationError("unknown_stream")
         client = self.policy.authorize(request, ip=request.ip, country=request.country)
         expiry = self.policy.build_expiry(client)
-        result = self.signer.sign(client=client, stream=stream, request=request, expiry=expiry)
-        return result.url, result.ttl, result.kid
+        session_id = self._admit(client, request, expiry)
+        if request.use_backup is None:
+            request = replace(request, use_backup=self.origins.use_backup(stream.id))
+        response = self.signer.sign(client=client, stream=stream, request=request, expiry=expiry)
+        self._record_signs(client.id)
+        return replace(response, session_id=session_id)
+
+    def _admit(self, client: Client, request: SignRequest, expiry: int) -> str:
+        limit = client.max_sessions
+        if self.shared is not None:
+            name = f"sessions:{client.id}"
+            if not self.shared.registered(name):
+                # Without a shared slot the host-wide limit cannot be enforced; refuse rather than over-admit.
+                raise AuthorizationError("session_limit_unavailable")
+            # Sessions held on the other workers of this host count against the same limit.
+            limit -= self.shared.peer_total(name)
+        return self.sessions.admit(
+            client.id,
+            request.stream_id,
+            limit=limit,
+            expires_at=expiry,
+            session_id=request.session_id,
+        )
+
+    async def sign_batch(
+        self,
+        items: Iterable[Tuple[int, SignRequest]],
+        *,
+        resolved: Optional[Dict[Tuple[str, str], Union[Tuple[Client, Stream], str]]] = None,
+    ) -> List[SignBatchResult]:
+        """Sign many indexed requests, resolving policy once per client/stream pair.
+
+        ``resolved`` may be shared across calls so a streamed batch keeps its
+        per-pair policy decisions between chunks.
+        """
+        started = time.perf_counter()
+        self._sync_keys()
+        resolved = {} if resolved is None else resolved
+        expiries: Dict[str, int] = {}
+        results: List[SignBatchResult] = []
+        pending: List[SignBatchResult] = []
+        to_sign = []
+        for index, request in items:
+            pair = (request.client_id, request.stream_id)
+            entry = resolved.get(pair)
+            if entry is None:
+                await self.repository.ensure_loaded("client", request.client_id)
+                await self.repository.ensure_loaded("stream", request.stream_id)
+                try:
+                    entry = self.policy.resolve(*pair)
+                except AuthorizationError as exc:
+                    entry = exc.reason
+                resolved[pair] = entry
+            if isinstance(entry, str):
+                results.append(SignBatchResult(index=index, error=entry))
+                continue
+            client, stream = entry
+            expiry = expiries.get(client.id)
+            if expiry is None:
+                expiry = expiries[client.id] = self.policy.build_expiry(client)
+            try:
+                self.policy.check_access(client, ip=request.ip, country=request.country)
+                session_id = self._admit(client, request, expiry)
+            except AuthorizationError as exc:
+                results.append(SignBatchResult(index=index, error=exc.reason))
+                continue
+            if request.use_backup is None:
+                request = replace(request, use_backup=self.origins.use_backup(stream.id))
+            result = SignBatchResult(index=index, session_id=session_id)
+            results.append(result)
+            pending.append(result)
+            to_sign.append((client, stream, request, expiry))
+        for result, signed in zip(pending, self.signer.sign_many(to_sign)):
+            result.url, result.ttl, result.kid, result.token = signed.url, signed.ttl, signed.kid, signed.token
+        if self.shared is not None:
+            for client_id, count in Counter(client.id for client, _, _, _ in to_sign).items():
+                self._record_signs(client_id, count)
+        for result in results:
+            SIGN_OUTCOMES.inc("batch", result.error or "ok")
+        SIGN_BATCH_DURATION.observe(time.perf_counter() - started)
+        return results
 
     async def rotate_key(self, kid: str, secret: str) -> str:
         async with self._lock:
-            self.signer.rotate(SigningKey(kid=kid, secret=secret.encode()))
+            key = SigningKey(kid=kid, secret=secret.encode())
+            if self.shared is not None:
+                self.shared.publish_key(key)
+                self._sync_keys()
+            else:
+                self.signer.rotate(key)
             return kid
 
-    async def reconcile(self, stream_id: str) -> None:
-        await self.reconciler.apply(stream_id)
+    def release_session(self, client_id: str, session_id: str) -> bool:
+        released = self.sessions.release(client_id, session_id)
+        if released:
+            self._publish_sessions((client_id,))
+        return released
+
+    def submit_reconcile_job(self, stream_id: str, *, force: bool = False) -> Job:
+        """Queue a priority reconcile for one stream and return a job tracking it."""
+        if self.repository.get_stream(stream_id) is None:
+            raise ValueError(f"stream {stream_id} not found")
+        job = self.jobs.create(stream_id, force=force)
+        future = self.scheduler.submit([stream_id], priority=True, force=force, progress=job.record)[stream_id]
+        future.add_done_callback(job.finish)
+        return job
+
+    def schedule_reconcile(
+        self,
+        stream_ids: Optional[Iterable[str]] = None,
+        *,
+        priority: Iterable[str] = (),
+        force: bool = False,
+    ) -> List[str]:
+        """Queue streams (all when ``stream_ids`` is None) without waiting; return the queued ids."""
+        known = self.repository.streams
+        targets = list(known) if stream_ids is None else [sid for sid in stream_ids if sid in known]
+        urgent = [sid for sid in priority if sid in known]
+        self.scheduler.submit(urgent, priority=True, force=force)
+        self.scheduler.submit(targets, force=force)
+        return list(dict.fromkeys([*urgent, *targets]))
 
-    async def fetch_stats(self, stream_id: str):
+    async def fetch_stats(self, stream_id: str, *, origin: str = "primary"):
+        """Serve collected stats when fresh, otherwise ask the origin directly."""
         stream = self.repository.get_stream(stream_id)
         if stream is None:
             raise ValueError("stream not found")
-        adapter = self.adapters.get(f"{stream_id}:primary")
+        adapter_key = f"{stream_id}:{origin}"
+        adapter = self.adapters.get(adapter_key)
         if adapter is None:
             raise ValueError("adapter not found")
-        return await adapter.fetch_stats(stream_id)
+        cached = self.stats.latest(adapter_key, max_age=3 * self.stats.interval)
+        if cached is not None:
+            return cached
+        with deadline(self.stats_deadline):
+            return await adapter.fetch_stats(stream_id)
+
+    async def combined_stats(self, stream_id: str, *, timeout: Optional[float] = None) -> CombinedStats:
+        """Query primary and backup concurrently; an origin that misses ``timeout`` is reported as such."""
+        if self.repository.get_stream(stream_id) is None:
+            raise ValueError("stream not found")
+        timeout = self.stats_deadline if timeout is None else timeout
+
+        async def one(origin: str) -> OriginStats:
+            adapter_key = f"{stream_id}:{origin}"
+            adapter = self.adapters.get(adapter_key)
+            if adapter is None:
+                return OriginStats(origin=origin, error="adapter not found")
+            cached = self.stats.latest(adapter_key, max_age=3 * self.stats.interval)
+            if cached is not None:
+                return OriginStats(origin=origin, stats=cached, source="cache")
+            try:
+                with deadline(timeout):
+                    return OriginStats(origin=origin, stats=await adapter.fetch_stats(stream_id), source="live")
+            except AdapterError as exc:
+                return OriginStats(origin=origin, error=str(exc))
+
+        tasks = {origin: asyncio.ensure_future(one(origin)) for origin in ORIGINS}
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        results = {
+            origin: task.result() if task in done else OriginStats(origin=origin, error="timeout")
+            for origin, task in tasks.items()
+        }
+        return combine(stream_id, results, self.origins.decision(stream_id).origin)
+
+    async def combined_stats_many(self, stream_ids: Iterable[str]) -> Dict[str, Union[CombinedStats, Dict[str, str]]]:
+        """Fan out :meth:`combined_stats` with at most ``stats_fanout`` streams in flight.
+
+        All streams share one ``stats_deadline`` budget; streams that start late get what is left.
+        """
+        loop = asyncio.get_running_loop()
+        ends_at = None if self.stats_deadline is None else loop.time() + self.stats_deadline
+        semaphore = asyncio.Semaphore(self.stats_fanout)
+
+        async def one(stream_id: str) -> Union[CombinedStats, Dict[str, str]]:
+            async with semaphore:
+                timeout = None if ends_at is None else max(0.0, ends_at - loop.time())
+                try:
+                    return await self.combined_stats(stream_id, timeout=timeout)
+                except ValueError as exc:
+                    return {"error": str(exc)}
+
+        ids = list(dict.fromkeys(stream_ids))
+        return dict(zip(ids, await asyncio.gather(*(one(stream_id) for stream_id in ids))))
+
+    def stats_history(self, stream_id: str, *, origin: str = "primary", window: float = 300.0, step: float = 0.0):
+        if self.repository.get_stream(stream_id) is None:
+            raise ValueError("stream not found")
+        history = self.stats.history(f"{stream_id}:{origin}", window=window, step=step)
+        if history is None:
+            raise ValueError("no stats collected yet")
+        return history
+
+    def origin_decision(self, stream_id: str) -> OriginDecision:
+        if self.repository.get_stream(stream_id) is None:
+            raise ValueError("stream not found")
+        return self.origins.decision(stream_id)
+
+    def override_origin(self, stream_id: str, origin: Optional[str]) -> OriginDecision:
+        """Pin signing for ``stream_id`` to ``origin``, or return it to automatic selection."""
+        if self.repository.get_stream(stream_id) is None:
+            raise ValueError("stream not found")
+        return self.origins.override(stream_id, origin)
+
+    async def start(self) -> None:
+        """Start background workers; ``DRIFT_INTERVAL=0``, ``STATS_INTERVAL=0`` or ``CONFIG_RELOAD_INTERVAL=0`` disable them."""
+        if float(os.environ.get("DRIFT_INTERVAL", "60")) > 0:
+            self.drift.start()
+        if float(os.environ.get("STATS_INTERVAL", "5")) > 0:
+            self.stats.start()
+        if float(os.environ.get("CONFIG_RELOAD_INTERVAL", "10")) > 0:
+            self.config_watcher.start()
+        if self.writer is not None:
+            self.writer.start()
+        if self.shared is not None and self._session_sweep is None:
+            self._session_sweep = asyncio.create_task(
+                self._sweep_sessions(float(os.environ.get("SESSION_SWEEP_INTERVAL", "5")) or 5.0)
+            )
 
     async def shutdown(self) -> None:
-        for adapter in self.adapters.values():
-            close = getattr(adapter, "close", None)
-            if close:
-                await close()
+        if self._session_sweep is not None:
+            self._session_sweep.cancel()
+            await asyncio.gather(self._session_sweep, return_exceptions=True)
+            self._session_sweep = None
+        await self.config_watcher.stop()
+        await self.drift.stop()
+        await self.stats.stop()
+        await self.scheduler.stop()
+        if self.writer is not None:
+            await self.writer.stop()
+            self.writer.close()
+        if self.shared is not None:
+            self.shared.close()
+        await self.adapter_registry.close()
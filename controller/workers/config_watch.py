@@ -0,0 +1,127 @@
+"""Background loop that hot-reloads the YAML config directory."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Set
+
+from ..config_loader import ConfigBundle, ConfigDiff, IncrementalLoader, diff_bundles
+from ..repository import Repository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReloadReport:
+    at: float = 0.0
+    duration_seconds: float = 0.0
+    files: List[str] = field(default_factory=list)
+    diff: ConfigDiff = field(default_factory=ConfigDiff)
+    reconciled: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class ConfigWatcher:
+    """Polls the config directory and applies entity-level changes to the repository.
+
+    Changed files are parsed off the event loop. The resulting diff is then
+    applied to the repository in one synchronous step, so request handlers on
+    the loop see either the old or the new config and never take a lock.
+    Entities created through the API are left alone unless the YAML defines
+    the same id. Removed streams are dropped from the controller but not torn
+    down on the origins.
+    """
+
+    def __init__(
+        self,
+        loader: IncrementalLoader,
+        repository: Repository,
+        snapshot: ConfigBundle,
+        *,
+        reconcile: Callable[[List[str]], object],
+        interval: float = 10.0,
+    ) -> None:
+        self._loader = loader
+        self._repository = repository
+        self._reconcile = reconcile
+        self.interval = interval
+        self.snapshot = snapshot
+        self.last_reload: Optional[ReloadReport] = None
+        self.reloads = 0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if self._loader.changed_files():
+                    await self.reload()
+            except Exception:  # noqa: BLE001 - keep the loop alive
+                logger.exception("config reload failed")
+
+    async def reload(self) -> ReloadReport:
+        """Re-parse changed files, apply the diff and queue reconciles for affected streams."""
+        async with self._lock:
+            started = time.perf_counter()
+            report = ReloadReport(at=time.time())
+            try:
+                bundle, report.files = await asyncio.to_thread(self._loader.load)
+            except Exception as exc:  # noqa: BLE001 - reported, old config stays live
+                logger.warning("config reload rejected", extra={"error": str(exc)})
+                report.error = f"{type(exc).__name__}: {exc}"
+            else:
+                report.diff = diff_bundles(self.snapshot, bundle)
+                affected = self._apply(bundle, report.diff)
+                self.snapshot = bundle
+                if affected:
+                    self._reconcile(affected)
+                report.reconciled = affected
+                logger.info("config reloaded", extra={"files": report.files, "reconciled": len(affected)})
+            report.duration_seconds = round(time.perf_counter() - started, 6)
+            self.reloads += 1
+            self.last_reload = report
+            return report
+
+    def _apply(self, bundle: ConfigBundle, diff: ConfigDiff) -> List[str]:
+        """Write the diff to the repository and return the streams whose desired state changed."""
+        repo = self._repository
+        repo.seed = bundle
+        # The YAML definitions that changed now win over rows stored through the API.
+        for kind, entities in (("profile", diff.playback_profiles), ("client", diff.clients), ("stream", diff.streams)):
+            for key in (*entities.added, *entities.changed, *entities.removed):
+                repo.discard_override(kind, key)
+        for name in (*diff.playback_profiles.added, *diff.playback_profiles.changed):
+            repo.add_playback_profile(bundle.playback_profiles[name], persist=False)
+        for client_id in (*diff.clients.added, *diff.clients.changed):
+            repo.add_client(bundle.clients[client_id], persist=False)
+        for stream_id in (*diff.streams.added, *diff.streams.changed):
+            repo.add_stream(bundle.streams[stream_id], persist=False)
+        for stream_id in diff.streams.removed:
+            repo.remove_stream(stream_id, persist=False)
+        for client_id in diff.clients.removed:
+            repo.remove_client(client_id, persist=False)
+        for name in diff.playback_profiles.removed:
+            repo.remove_playback_profile(name, persist=False)
+
+        affected: Set[str] = {*diff.streams.added, *diff.streams.changed}
+        clients = {*diff.clients.added, *diff.clients.changed, *diff.clients.removed}
+        for name in (*diff.playback_profiles.added, *diff.playback_profiles.changed, *diff.playback_profiles.removed):
+            clients.update(client.id for client in repo.clients_for_profile(name))
+        affected.update(self._streams_for(clients))
+        return sorted(affected - set(diff.streams.removed))
+
+    def _streams_for(self, client_ids: Iterable[str]) -> Set[str]:
+        return {stream.id for client_id in client_ids for stream in self._repository.streams_for_client(client_id)}
@@ -0,0 +1,165 @@
+"""Background loop that detects drift between adapters and desired state."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from ..adapters.base import AdapterError, MediaAdapter
+from ..core.models import Stream, StreamStats
+from ..repository import Repository
+from .reconciler import Reconciler
+from .scheduler import ReconcileScheduler
+from .stats import StatsCollector
+
+logger = logging.getLogger(__name__)
+
+MISSING_STATUSES = frozenset({"missing", "absent", "not_found"})
+
+
+@dataclass
+class DriftStatus:
+    runs: int = 0
+    last_run_started: Optional[float] = None
+    last_run_seconds: Optional[float] = None
+    streams_checked: int = 0
+    drifted: List[str] = field(default_factory=list)
+    last_converge_seconds: Optional[float] = None
+    backoff: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class _Backoff:
+    failures: int = 0
+    until: float = 0.0
+
+
+class DriftDetector:
+    """Periodically compares adapter-reported state with desired state.
+
+    Streams whose origin reports the stream as missing, or a rendition set that
+    differs from the assigned playback profiles, are force-reconciled through the
+    scheduler. Runs are spaced by ``interval`` with +/- ``jitter`` randomization,
+    and an adapter host that raises :class:`AdapterError` is skipped with
+    exponential backoff capped at ``max_backoff``. With a ``stats`` collector,
+    its latest sample is used when it is at most three collection intervals
+    old, so only adapters without a fresh sample are called.
+    """
+
+    def __init__(
+        self,
+        *,
+        adapters: Dict[str, MediaAdapter],
+        repository: Repository,
+        reconciler: Reconciler,
+        scheduler: ReconcileScheduler,
+        interval: float = 60.0,
+        jitter: float = 0.2,
+        max_backoff: float = 600.0,
+        concurrency: int = 16,
+        stats: Optional[StatsCollector] = None,
+    ) -> None:
+        self._adapters = adapters
+        self._stats = stats
+        self._repository = repository
+        self._reconciler = reconciler
+        self._scheduler = scheduler
+        self._interval = interval
+        self._jitter = jitter
+        self._max_backoff = max_backoff
+        self._concurrency = concurrency
+        self._backoff: Dict[str, _Backoff] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.status = DriftStatus()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval * random.uniform(1 - self._jitter, 1 + self._jitter))
+            try:
+                await self.run_once()
+            except Exception:  # noqa: BLE001 - keep the loop alive
+                logger.exception("drift detection run failed")
+
+    async def run_once(self) -> List[str]:
+        """Check every stream once, reconcile the drifted ones and return their ids."""
+        started = time.monotonic()
+        self.status.last_run_started = time.time()
+        semaphore = asyncio.Semaphore(self._concurrency)
+        streams = list(self._repository.streams.values())
+
+        async def check(stream: Stream) -> Optional[str]:
+            async with semaphore:
+                return stream.id if await self._is_drifted(stream) else None
+
+        drifted = [stream_id for stream_id in await asyncio.gather(*(check(s) for s in streams)) if stream_id]
+        detected = time.monotonic()
+        if drifted:
+            logger.info("drift detected", extra={"streams": drifted})
+            futures = self._scheduler.submit(drifted, force=True)
+            outcomes = await asyncio.gather(*futures.values(), return_exceptions=True)
+            if not any(isinstance(outcome, BaseException) for outcome in outcomes):
+                self.status.last_converge_seconds = time.monotonic() - detected
+
+        self.status.runs += 1
+        self.status.streams_checked = len(streams)
+        self.status.drifted = drifted
+        self.status.last_run_seconds = time.monotonic() - started
+        now = time.monotonic()
+        self.status.backoff = {host: round(b.until - now, 3) for host, b in self._backoff.items() if b.until > now}
+        return drifted
+
+    async def _is_drifted(self, stream: Stream) -> bool:
+        expected = {
+            rendition.name for profile in self._reconciler.desired_profiles(stream) for rendition in profile.renditions
+        }
+        for label in ("primary", "backup"):
+            adapter_key = f"{stream.id}:{label}"
+            adapter = self._adapters.get(adapter_key)
+            if adapter is None:
+                continue
+            stats = None
+            if self._stats is not None:
+                stats = self._stats.latest(adapter_key, max_age=3 * self._stats.interval)
+            if stats is None:
+                host = getattr(adapter, "base_url", adapter_key)
+                backoff = self._backoff.get(host)
+                if backoff is not None and backoff.until > time.monotonic():
+                    continue
+                try:
+                    stats = await adapter.fetch_stats(stream.id)
+                except AdapterError as exc:
+                    self._record_failure(host, exc)
+                    continue
+                self._backoff.pop(host, None)
+            if self._differs(stats, expected):
+                return True
+        return False
+
+    @staticmethod
+    def _differs(stats: StreamStats, expected_renditions: set) -> bool:
+        if stats.ingest_status in MISSING_STATUSES:
+            return True
+        return bool(stats.renditions) and set(stats.renditions) != expected_renditions
+
+    def _record_failure(self, host: str, exc: Exception) -> None:
+        backoff = self._backoff.setdefault(host, _Backoff())
+        backoff.failures += 1
+        delay = min(self._max_backoff, self._interval * 2 ** (backoff.failures - 1))
+        backoff.until = time.monotonic() + delay * random.uniform(1 - self._jitter, 1 + self._jitter)
+        logger.warning("adapter stats failed, backing off", extra={"host": host, "delay": delay, "error": str(exc)})
+
+    def snapshot(self) -> Dict:
+        return asdict(self.status)
@@ -0,0 +1,105 @@
+"""Tracking of asynchronous reconcile jobs."""
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional
+
+from .reconciler import ReconcileResult
+
+
+class JobState(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+@dataclass
+class JobStep:
+    adapter: str
+    step: str
+    status: str
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+
+@dataclass
+class Job:
+    id: str
+    stream_id: str
+    force: bool
+    state: JobState = JobState.queued
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    applied: int = 0
+    skipped: int = 0
+    error: Optional[str] = None
+    steps: List[JobStep] = field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.state in (JobState.succeeded, JobState.failed)
+
+    def record(self, adapter: str, step: str, status: str, error: Optional[str]) -> None:
+        """Progress callback handed to the reconciler."""
+        now = time.time()
+        if self.state == JobState.queued:
+            self.state = JobState.running
+            self.started_at = now
+        for existing in self.steps:
+            if existing.adapter == adapter and existing.step == step:
+                existing.status, existing.error, existing.updated_at = status, error, now
+                return
+        self.steps.append(JobStep(adapter=adapter, step=step, status=status, error=error, updated_at=now))
+
+    def finish(self, future: asyncio.Future) -> None:
+        self.finished_at = time.time()
+        if future.cancelled():
+            self.state, self.error = JobState.failed, "cancelled"
+        elif future.exception() is not None:
+            self.state, self.error = JobState.failed, str(future.exception())
+        else:
+            result: ReconcileResult = future.result()
+            self.state, self.applied, self.skipped = JobState.succeeded, result.applied, result.skipped
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class JobStore:
+    """Bounded in-memory job history; finished jobs are evicted oldest first."""
+
+    def __init__(self, max_jobs: int = 1000) -> None:
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def create(self, stream_id: str, *, force: bool = False) -> Job:
+        job = Job(id=secrets.token_hex(8), stream_id=stream_id, force=force)
+        self._jobs[job.id] = job
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def recent(self, limit: int = 50) -> List[Job]:
+        """The newest ``limit`` jobs, newest first."""
+        if limit <= 0:
+            return []
+        return list(self._jobs.values())[-limit:][::-1]
+
+    def _evict(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        finished = [job_id for job_id, job in self._jobs.items() if job.done][:excess]
+        for job_id in finished:
+            del self._jobs[job_id]
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
@@ -0,0 +1,170 @@
+"""Push changed stream stats from the collector to live subscribers."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from ..core.health import HealthThresholds
+from ..core.models import StreamStats
+from ..repository import ADAPTER_LABELS
+from .stats import sample_fields
+
+
+@dataclass(frozen=True)
+class FieldThreshold:
+    """When a numeric field counts as changed since the value last pushed.
+
+    A move of at least ``delta`` (or ``relative`` times the old value, whichever
+    is larger) is a change, and so is crossing any of ``levels`` in either
+    direction, however small the move.
+    """
+
+    delta: float = 0.0
+    relative: float = 0.0
+    levels: Tuple[float, ...] = ()
+
+    def changed(self, old: float, new: float) -> bool:
+        if any((old > level) != (new > level) for level in self.levels):
+            return True
+        moved = abs(new - old)
+        return moved > 0 and moved >= max(self.delta, self.relative * abs(old))
+
+
+RENDITION_THRESHOLD = FieldThreshold(relative=0.1)
+
+
+def default_thresholds(health: HealthThresholds = HealthThresholds()) -> Dict[str, FieldThreshold]:
+    """Thresholds that always push when a field crosses an origin health limit."""
+    return {
+        "part_age": FieldThreshold(delta=0.5, levels=(health.part_age, 2 * health.part_age)),
+        "segment_age": FieldThreshold(delta=1.0, levels=(health.segment_age,)),
+        "cpu": FieldThreshold(delta=5.0, levels=(health.cpu,)),
+        "http_error_rate": FieldThreshold(delta=0.01, levels=(health.error_rate,)),
+    }
+
+
+def _fields(stats: Optional[StreamStats]) -> Dict[str, Any]:
+    if stats is None:
+        return {"available": False}
+    return {"available": True, "ingest_status": stats.ingest_status, **sample_fields(stats)}
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    """Changes waiting for one consumer, coalesced per adapter key.
+
+    A consumer that falls behind never holds more than one pending frame per
+    adapter key: newer changes are merged over the undelivered ones, and each
+    frame superseded that way counts as dropped.
+    """
+
+    def __init__(self, stream_ids: Optional[FrozenSet[str]]) -> None:
+        self.stream_ids = stream_ids
+        self.dropped = 0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def wants(self, stream_id: str) -> bool:
+        return self.stream_ids is None or stream_id in self.stream_ids
+
+    def offer(self, adapter_key: str, changes: Mapping[str, Any], now: float) -> bool:
+        """Queue ``changes``; return True if an undelivered frame was superseded."""
+        pending = self._pending.get(adapter_key)
+        superseded = pending is not None
+        if pending is None:
+            pending = self._pending[adapter_key] = {"changes": {}}
+        else:
+            self.dropped += 1
+        pending["ts"] = now
+        pending["changes"].update(changes)
+        self._ready.set()
+        return superseded
+
+    async def next(self, timeout: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Wait up to ``timeout`` seconds and take every pending frame (empty on timeout)."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+        self._ready.clear()
+        frames, self._pending = self._pending, {}
+        return frames
+
+
+class StatsBroadcaster:
+    """Turns collector rounds into per-field change frames for many subscribers.
+
+    Subscribed to :class:`~controller.workers.stats.StatsCollector`, so one
+    upstream poll per origin feeds every consumer. Values are compared with the
+    last value pushed, not the last sample, so slow drift is still reported
+    once it adds up to a threshold.
+    """
+
+    def __init__(
+        self,
+        thresholds: Optional[Dict[str, FieldThreshold]] = None,
+        *,
+        rendition_threshold: FieldThreshold = RENDITION_THRESHOLD,
+        max_subscribers: int = 256,
+    ) -> None:
+        self.thresholds = default_thresholds() if thresholds is None else thresholds
+        self.rendition_threshold = rendition_threshold
+        self.max_subscribers = max_subscribers
+        self._pushed: Dict[str, Dict[str, Any]] = {}
+        self._pushed_at: Dict[str, float] = {}
+        self._subscribers: List[Subscription] = []
+        self.counters = {"frames": 0, "dropped": 0}
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, stream_ids: Optional[Iterable[str]] = None) -> Subscription:
+        """Register a consumer for ``stream_ids`` (all streams when None), primed with current values."""
+        if len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribers(f"at most {self.max_subscribers} live subscribers")
+        subscription = Subscription(None if stream_ids is None else frozenset(stream_ids))
+        for adapter_key, values in self._pushed.items():
+            if subscription.wants(adapter_key.rpartition(":")[0]):
+                subscription.offer(adapter_key, values, self._pushed_at[adapter_key])
+        self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscribers:
+            self._subscribers.remove(subscription)
+
+    def forget(self, stream_id: str) -> None:
+        """Drop the last pushed values of a removed stream; frames already queued still go out."""
+        for label in ADAPTER_LABELS:
+            self._pushed.pop(f"{stream_id}:{label}", None)
+            self._pushed_at.pop(f"{stream_id}:{label}", None)
+
+    def _changed(self, name: str, old: Any, new: Any) -> bool:
+        if not isinstance(old, float) or not isinstance(new, float):
+            return old != new
+        threshold = self.thresholds.get(name)
+        if threshold is None and name.startswith("renditions."):
+            threshold = self.rendition_threshold
+        return threshold.changed(old, new) if threshold is not None else old != new
+
+    def observe_round(self, results: Mapping[str, Optional[StreamStats]], now: float) -> None:
+        """Collector listener: push the fields of each adapter key that moved past their threshold."""
+        for adapter_key, stats in results.items():
+            current = _fields(stats)
+            pushed = self._pushed.setdefault(adapter_key, {})
+            # A failed poll only flips ``available``; the last known values stay as they were.
+            names = current.keys() if stats is None else current.keys() | pushed.keys()
+            changes = {name: current.get(name) for name in names if self._changed(name, pushed.get(name), current.get(name))}
+            if not changes:
+                continue
+            pushed.update(changes)
+            self._pushed_at[adapter_key] = now
+            stream_id = adapter_key.rpartition(":")[0]
+            for subscription in self._subscribers:
+                if subscription.wants(stream_id):
+                    self.counters["frames"] += 1
+                    self.counters["dropped"] += subscription.offer(adapter_key, changes, now)
@@ -2,80 +2,243 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, Iterable
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, is_dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
-from ..adapters.base import MediaAdapter
-from ..config_loader import ConfigBundle
-from ..core.models import Client, PlaybackProfile, Stream, TokenRules
+from ..adapters.base import MediaAdapter, deadline, ensure_token_policies, provision_stream
+from ..core.models import Client, PlaybackProfile, Stream, TokenRules, stream_path_prefix
+from ..metrics import RECONCILE_DURATION
+from ..repository import Repository
 
 logger = logging.getLogger(__name__)
 
 
+ProgressCallback = Callable[[str, str, str, Optional[str]], None]
+"""Called as ``progress(adapter_key, step, status, error)`` while a reconcile runs."""
+
+
+@dataclass
+class ReconcileResult:
+    stream_id: str
+    applied: int = 0
+    skipped: int = 0
+
+
+def fingerprint(payload: Any) -> str:
+    """Stable hash of a desired-state payload built from dataclasses and plain values."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_encode)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _encode(value: Any) -> Any:
+    if is_dataclass(value):
+        return asdict(value)
+    return str(value)
+
+
+class HostLimiter:
+    """Caps concurrent management calls per origin host across all streams."""
+
+    def __init__(self, per_host: int = 4) -> None:
+        if per_host <= 0:
+            raise ValueError("per_host must be positive")
+        self.per_host = per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._active: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str) -> AsyncIterator[None]:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        async with semaphore:
+            self._active[host] = self._active.get(host, 0) + 1
+            try:
+                yield
+            finally:
+                self._active[host] -= 1
+
+    def in_flight(self) -> Dict[str, int]:
+        return {host: count for host, count in self._active.items() if count}
+
+
 class Reconciler:
-    """Idempotent reconciler that drives adapters toward the desired state."""
+    """Idempotent reconciler that drives adapters toward the desired state.
+
+    The fingerprint of the last successfully applied payload is kept per
+    adapter and resource, and calls whose desired state is unchanged are
+    skipped. Every ``resync_interval`` seconds an adapter gets one full pass
+    regardless, to repair drift the fingerprints cannot see. ``call_deadline``
+    bounds each ``apply`` including adapter retries, so a degraded origin
+    cannot hold a worker indefinitely.
+    """
 
     def __init__(
         self,
         *,
         adapters: Dict[str, MediaAdapter],
-        config: ConfigBundle,
+        repository: Repository,
+        resync_interval: float = 900.0,
+        limiter: Optional[HostLimiter] = None,
+        call_deadline: Optional[float] = None,
     ) -> None:
         self._adapters = adapters
-        self._config = config
+        self._call_deadline = call_deadline
+        self._repository = repository
+        self._resync_interval = resync_interval
+        self._limiter = limiter
+        self._fingerprints: Dict[Tuple[str, str], str] = {}
+        self._last_full_sync: Dict[str, float] = {}
+        self.totals = {"applied": 0, "skipped": 0}
+
+    def limiter_in_flight(self) -> Dict[str, int]:
+        return self._limiter.in_flight() if self._limiter else {}
 
-    async def apply(self, stream_id: str) -> None:
-        stream = self._config.streams.get(stream_id)
+    async def apply(
+        self,
+        stream_id: str,
+        *,
+        force: bool = False,
+        progress: Optional[ProgressCallback] = None,
+    ) -> ReconcileResult:
+        stream = self._repository.get_stream(stream_id)
         if stream is None:
             raise ValueError(f"stream {stream_id} not found")
 
-        profiles = list(self._profiles_for_stream(stream))
+        profiles = self._repository.profiles_for_stream(stream)
+        result = ReconcileResult(stream_id=stream_id)
 
         tasks = []
         for label in ("primary", "backup"):
-            adapter = self._adapters.get(f"{stream_id}:{label}")
+            adapter_key = f"{stream_id}:{label}"
+            adapter = self._adapters.get(adapter_key)
             if adapter is None:
                 logger.warning("adapter missing", extra={"stream_id": stream_id, "label": label})
                 continue
-            for profile in profiles:
-                tasks.append(self._reconcile_adapter(adapter, stream, profile))
+            tasks.append(self._reconcile_adapter(adapter_key, adapter, stream, profiles, result, force, progress))
         if tasks:
-            await asyncio.gather(*tasks)
+            with deadline(self._call_deadline):
+                await asyncio.gather(*tasks)
+        return result
 
-    def _profiles_for_stream(self, stream: Stream) -> Iterable[PlaybackProfile]:
-        seen = set()
-        for client_id in stream.assigned_clients:
-            client = self._config.clients.get(client_id)
-            if client is None:
-                logger.warning("client missing during reconciliation", extra={"client_id": client_id})
-                continue
-            profile_name = client.playback_profile
-            if profile_name in seen:
-                continue
-            seen.add(profile_name)
-            profile = self._config.playback_profiles.get(profile_name)
-            if not profile:
-                logger.warning("profile missing during reconciliation", extra={"profile": profile_name})
+    def desired_profiles(self, stream: Stream) -> List[PlaybackProfile]:
+        return self._repository.profiles_for_stream(stream)
+
+    def _changed(
+        self,
+        adapter_key: str,
+        items: Iterable[Tuple[str, Any]],
+        result: ReconcileResult,
+        force: bool,
+    ) -> List[Tuple[str, str, Any]]:
+        """Return ``(resource, digest, payload)`` for items whose payload differs from the last applied one."""
+        changed = []
+        for resource, payload in items:
+            digest = fingerprint(payload)
+            if not force and self._fingerprints.get((adapter_key, resource)) == digest:
+                result.skipped += 1
+                self.totals["skipped"] += 1
                 continue
-            yield profile
+            self._fingerprints.pop((adapter_key, resource), None)
+            changed.append((resource, digest, payload))
+        return changed
+
+    async def _apply(
+        self,
+        adapter_key: str,
+        adapter: MediaAdapter,
+        step: str,
+        changed: List[Tuple[str, str, Any]],
+        call: Callable[[], Awaitable[None]],
+        result: ReconcileResult,
+        progress: Optional[ProgressCallback],
+    ) -> None:
+        if not changed:
+            if progress:
+                progress(adapter_key, step, "skipped", None)
+            return
+        if progress:
+            progress(adapter_key, step, "running", None)
+        host = getattr(adapter, "base_url", adapter_key)
+        started = time.perf_counter()
+        try:
+            if self._limiter is None:
+                await call()
+            else:
+                async with self._limiter.slot(host):
+                    await call()
+        except Exception as exc:
+            RECONCILE_DURATION.observe(time.perf_counter() - started, host, step, "failed")
+            if progress:
+                progress(adapter_key, step, "failed", str(exc))
+            raise
+        RECONCILE_DURATION.observe(time.perf_counter() - started, host, step, "ok")
+        if progress:
+            progress(adapter_key, step, "done", None)
+        for resource, digest, _ in changed:
+            self._fingerprints[(adapter_key, resource)] = digest
+        result.applied += len(changed)
+        self.totals["applied"] += len(changed)
 
     async def _reconcile_adapter(
         self,
+        adapter_key: str,
         adapter: MediaAdapter,
         stream: Stream,
-        profile: PlaybackProfile,
+        profiles: List[PlaybackProfile],
+        result: ReconcileResult,
+        force: bool,
+        progress: Optional[ProgressCallback] = None,
     ) -> None:
-        await adapter.ensure_input(stream.id, stream.ingest)
-        await adapter.ensure_transcode_profile(stream.id, profile)
-        await adapter.ensure_packaging_ll_hls(stream.id, stream.packaging.ll_hls_path, profile)
+        now = time.monotonic()
+        full = force or now - self._last_full_sync.get(adapter_key, float("-inf")) >= self._resync_interval
+        path = stream.packaging.ll_hls_path
+
+        provision = self._changed(
+            adapter_key,
+            [(f"provision:{stream.id}", {"ingest": stream.ingest, "path": path, "profiles": profiles})],
+            result,
+            full,
+        )
 
+        policies: Dict[str, Tuple[str, TokenRules]] = {}
         for client_id in stream.assigned_clients:
-            client: Client | None = self._config.clients.get(client_id)
+            client: Client | None = self._repository.get_client(client_id)
             if client is None:
                 continue
             rules = TokenRules(
                 max_sessions=client.max_sessions,
                 ttl_seconds=client.token_ttl_seconds,
-                path_prefix=f"/live/{stream.id}",
+                path_prefix=stream_path_prefix(stream.id),
             )
-            await adapter.ensure_token_policy(client_id, rules)
+            policies[f"token:{stream.id}:{client_id}"] = (client_id, rules)
+        tokens = self._changed(adapter_key, policies.items(), result, full)
+        batch = [policy for _, _, policy in tokens]
+
+        await asyncio.gather(
+            self._apply(
+                adapter_key,
+                adapter,
+                "provision",
+                provision,
+                lambda: provision_stream(adapter, stream.id, stream.ingest, path, profiles),
+                result,
+                progress,
+            ),
+            self._apply(
+                adapter_key,
+                adapter,
+                "token_policies",
+                tokens,
+                lambda: ensure_token_policies(adapter, batch),
+                result,
+                progress,
+            ),
+        )
+        if full:
+            self._last_full_sync[adapter_key] = now
@@ -0,0 +1,166 @@
+"""Fleet-wide reconcile scheduling with coalescing and priorities."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .reconciler import ProgressCallback, ReconcileResult, Reconciler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Request:
+    stream_id: str
+    priority: bool
+    force: bool
+    future: asyncio.Future
+    seq: int = 0
+    listeners: List[ProgressCallback] = field(default_factory=list)
+
+    def progress(self, adapter_key: str, step: str, status: str, error: Optional[str]) -> None:
+        for listener in self.listeners:
+            listener(adapter_key, step, status, error)
+
+
+def _consume(future: asyncio.Future) -> None:
+    # Fire-and-forget submissions must not log "exception was never retrieved".
+    if not future.cancelled():
+        future.exception()
+
+
+class ReconcileScheduler:
+    """Queues reconcile requests and runs them on a fixed pool of workers.
+
+    Duplicate requests for a stream that is already queued collapse into the
+    queued one; requests arriving while the stream is being reconciled collapse
+    into a single follow-up run. Priority requests, and streams reported live by
+    ``is_live``, jump ahead of the rest. Per-host call limits are enforced by the
+    reconciler's :class:`~controller.workers.reconciler.HostLimiter`.
+    """
+
+    def __init__(
+        self,
+        reconciler: Reconciler,
+        *,
+        workers: int = 8,
+        is_live: Optional[Callable[[str], bool]] = None,
+    ) -> None:
+        self._reconciler = reconciler
+        self._worker_count = workers
+        self._is_live = is_live
+        self._heap: List[Tuple[int, int, str]] = []
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._pending: Dict[str, _Request] = {}
+        self._running: Dict[str, _Request] = {}
+        self._followups: Dict[str, _Request] = {}
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self.counters = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0}
+
+    def submit(
+        self,
+        stream_ids: Iterable[str],
+        *,
+        priority: bool = False,
+        force: bool = False,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, asyncio.Future]:
+        """Queue streams for reconciliation and return one future per stream.
+
+        ``progress`` receives per-adapter step updates of the run that ends up
+        serving the request, including runs it was coalesced into.
+        """
+        self._ensure_workers()
+        futures: Dict[str, asyncio.Future] = {}
+        for stream_id in dict.fromkeys(stream_ids):
+            self.counters["submitted"] += 1
+            urgent = priority or bool(self._is_live and self._is_live(stream_id))
+            if stream_id in self._running:
+                request = self._followups.get(stream_id)
+                if request is None:
+                    request = self._followups[stream_id] = self._new_request(stream_id, urgent, force)
+                else:
+                    self._merge(request, urgent, force)
+            else:
+                request = self._pending.get(stream_id)
+                if request is None:
+                    request = self._pending[stream_id] = self._new_request(stream_id, urgent, force)
+                    self._push(request)
+                elif self._merge(request, urgent, force):
+                    self._push(request)
+            if progress is not None:
+                request.listeners.append(progress)
+            futures[stream_id] = request.future
+        return futures
+
+    def _new_request(self, stream_id: str, priority: bool, force: bool) -> _Request:
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        return _Request(stream_id=stream_id, priority=priority, force=force, future=future)
+
+    def _merge(self, request: _Request, priority: bool, force: bool) -> bool:
+        """Fold a duplicate into ``request``; return True if it must be re-queued at higher priority."""
+        self.counters["coalesced"] += 1
+        request.force = request.force or force
+        if priority and not request.priority:
+            request.priority = True
+            return True
+        return False
+
+    def _push(self, request: _Request) -> None:
+        request.seq = next(self._seq)
+        heapq.heappush(self._heap, (0 if request.priority else 1, request.seq, request.stream_id))
+        self._ready.put_nowait(None)
+
+    def _ensure_workers(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self._worker_count)]
+
+    async def _work(self) -> None:
+        while True:
+            await self._ready.get()
+            _, seq, stream_id = heapq.heappop(self._heap)
+            request = self._pending.get(stream_id)
+            if request is None or request.seq != seq:
+                continue
+            del self._pending[stream_id]
+            self._running[stream_id] = request
+            try:
+                result: ReconcileResult = await self._reconciler.apply(
+                    stream_id, force=request.force, progress=request.progress if request.listeners else None
+                )
+            except asyncio.CancelledError:
+                request.future.cancel()
+                raise
+            except Exception as exc:  # noqa: BLE001 - reported through the future
+                logger.warning("reconcile failed", extra={"stream_id": stream_id, "error": str(exc)})
+                self.counters["failed"] += 1
+                request.future.set_exception(exc)
+            else:
+                self.counters["completed"] += 1
+                request.future.set_result(result)
+            finally:
+                del self._running[stream_id]
+                followup = self._followups.pop(stream_id, None)
+                if followup is not None:
+                    self._pending[stream_id] = followup
+                    self._push(followup)
+
+    def status(self) -> Dict:
+        return {
+            "pending": len(self._pending),
+            "running": sorted(self._running),
+            "workers": self._worker_count,
+            **self.counters,
+        }
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
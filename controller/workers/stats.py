@@ -0,0 +1,254 @@
+"""Background collector that keeps recent stream stats in memory."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..adapters.base import AdapterError, MediaAdapter, deadline
+from ..core.models import StreamStats
+from ..repository import ADAPTER_LABELS, Repository
+
+logger = logging.getLogger(__name__)
+
+RoundListener = Callable[[Dict[str, Optional[StreamStats]], float], None]
+
+NAN = float("nan")
+
+SCALAR_FIELDS = {
+    "part_age": "last_part_age_seconds",
+    "segment_age": "last_segment_age_seconds",
+    "cpu": "cpu_percent",
+    "http_error_rate": "http_error_rate",
+}
+
+
+def sample_fields(stats: StreamStats) -> Dict[str, float]:
+    """Flatten numeric ``StreamStats`` fields into series names."""
+    values = {name: getattr(stats, attr) for name, attr in SCALAR_FIELDS.items()}
+    for rendition, metrics in stats.renditions.items():
+        for metric, value in metrics.items():
+            values[f"renditions.{rendition}.{metric}"] = value
+    return {name: float(value) for name, value in values.items() if isinstance(value, (int, float))}
+
+
+def _clean(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class SeriesRing:
+    """Fixed-capacity time series backed by ``array('d')`` rings sharing one clock column.
+
+    Every series has one slot per sample; a series that is missing from a
+    sample (or appears later) holds NaN there. At most ``max_series`` series
+    are kept so a misbehaving origin cannot grow memory without bound.
+    """
+
+    def __init__(self, capacity: int = 720, *, max_series: int = 64) -> None:
+        self.capacity = capacity
+        self.max_series = max_series
+        self._times = array("d", [NAN]) * capacity
+        self._series: Dict[str, array] = {}
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, ts: float, values: Dict[str, float]) -> None:
+        for name in values:
+            if name not in self._series and len(self._series) < self.max_series:
+                self._series[name] = array("d", [NAN]) * self.capacity
+        slot = self._head
+        self._times[slot] = ts
+        for name, column in self._series.items():
+            column[slot] = values.get(name, NAN)
+        self._head = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _slots(self, since: float) -> Iterator[int]:
+        """Slot indices in chronological order with timestamps >= ``since``."""
+        start = (self._head - self._size) % self.capacity
+        for offset in range(self._size):
+            slot = (start + offset) % self.capacity
+            if self._times[slot] >= since:
+                yield slot
+
+    def latest(self) -> Dict[str, Optional[float]]:
+        if not self._size:
+            return {}
+        slot = (self._head - 1) % self.capacity
+        return {name: _clean(column[slot]) for name, column in self._series.items()}
+
+    def window(self, since: float) -> Dict[str, Any]:
+        slots = list(self._slots(since))
+        return {
+            "t": [self._times[slot] for slot in slots],
+            "series": {name: [_clean(column[slot]) for slot in slots] for name, column in self._series.items()},
+        }
+
+    def downsample(self, since: float, step: float) -> List[Dict[str, Any]]:
+        """Aggregate samples since ``since`` into ``step``-second buckets of min/max/avg."""
+        buckets: Dict[int, Dict[str, List[float]]] = {}
+        for slot in self._slots(since):
+            bucket = buckets.setdefault(int((self._times[slot] - since) // step), {})
+            for name, column in self._series.items():
+                value = column[slot]
+                if math.isnan(value):
+                    continue
+                agg = bucket.get(name)
+                if agg is None:
+                    bucket[name] = [value, value, value, 1]
+                else:
+                    agg[0] = min(agg[0], value)
+                    agg[1] = max(agg[1], value)
+                    agg[2] += value
+                    agg[3] += 1
+        return [
+            {
+                "t": since + index * step,
+                "series": {
+                    name: {"min": agg[0], "max": agg[1], "avg": agg[2] / agg[3]} for name, agg in sorted(bucket.items())
+                },
+            }
+            for index, bucket in sorted(buckets.items())
+        ]
+
+
+class StatsCollector:
+    """Polls ``fetch_stats`` for every adapter of every stream on a fixed cadence.
+
+    The latest ``StreamStats`` per adapter key (``stream:label``) and a
+    :class:`SeriesRing` of numeric fields are kept in memory, so the API can
+    answer without touching the origins. Each poll is bounded by one interval.
+    """
+
+    def __init__(
+        self,
+        *,
+        adapters: Dict[str, MediaAdapter],
+        repository: Repository,
+        interval: float = 5.0,
+        capacity: int = 720,
+        concurrency: int = 16,
+    ) -> None:
+        self._adapters = adapters
+        self._repository = repository
+        self._keys: List[Tuple[str, str]] = []
+        self._keys_version: Optional[Tuple[int, int]] = None
+        self.interval = interval
+        self._capacity = capacity
+        self._concurrency = concurrency
+        self._latest: Dict[str, StreamStats] = {}
+        self._sampled_at: Dict[str, float] = {}
+        self._rings: Dict[str, SeriesRing] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[RoundListener] = []
+        self.counters = {"polls": 0, "errors": 0}
+
+    def subscribe(self, listener: RoundListener) -> None:
+        """Call ``listener(results, now)`` after every round; failed polls map to ``None``."""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        next_run = time.monotonic()
+        while True:
+            try:
+                await self.collect_once()
+            except Exception:  # noqa: BLE001 - keep the loop alive
+                logger.exception("stats collection failed")
+            # A round that overran skips the ticks it missed instead of running back to back.
+            next_run = max(next_run + self.interval, time.monotonic())
+            await asyncio.sleep(max(0.0, next_run - time.monotonic()))
+
+    async def collect_once(self, now: Optional[float] = None) -> int:
+        """Poll every adapter once and return how many answered."""
+        now = time.time() if now is None else now
+        semaphore = asyncio.Semaphore(self._concurrency)
+        keys = self._poll_keys()
+
+        async def poll(stream_id: str, adapter_key: str) -> Optional[StreamStats]:
+            async with semaphore:
+                adapter = self._adapters.get(adapter_key)
+                if adapter is None:
+                    return None
+                try:
+                    with deadline(self.interval):
+                        stats = await adapter.fetch_stats(stream_id)
+                except AdapterError as exc:
+                    self.counters["errors"] += 1
+                    logger.debug("stats poll failed", extra={"adapter": adapter_key, "error": str(exc)})
+                    return None
+            if adapter_key in self._adapters:
+                self.record(adapter_key, stats, now)
+            return stats
+
+        polled = await asyncio.gather(*(poll(stream_id, key) for stream_id, key in keys))
+        self.counters["polls"] += 1
+        # Streams removed while the round ran are left out, so listeners do not bring them back.
+        results = {key: stats for (_, key), stats in zip(keys, polled) if key in self._adapters}
+        for listener in self._listeners:
+            listener(results, now)
+        return sum(stats is not None for stats in polled)
+
+    def _poll_keys(self) -> List[Tuple[str, str]]:
+        """``(stream_id, adapter_key)`` pairs to poll, rebuilt only after repository or adapter changes."""
+        version = (self._repository.version, len(self._adapters))
+        if version != self._keys_version:
+            self._keys = [
+                (stream_id, f"{stream_id}:{label}")
+                for stream_id in self._repository.streams
+                for label in ADAPTER_LABELS
+                if f"{stream_id}:{label}" in self._adapters
+            ]
+            self._keys_version = version
+        return self._keys
+
+    def record(self, adapter_key: str, stats: StreamStats, now: float) -> None:
+        ring = self._rings.get(adapter_key)
+        if ring is None:
+            ring = self._rings[adapter_key] = SeriesRing(self._capacity)
+        ring.append(now, sample_fields(stats))
+        self._latest[adapter_key] = stats
+        self._sampled_at[adapter_key] = now
+
+    def forget(self, stream_id: str) -> None:
+        """Drop everything collected for a stream that is no longer managed."""
+        for label in ADAPTER_LABELS:
+            adapter_key = f"{stream_id}:{label}"
+            self._latest.pop(adapter_key, None)
+            self._sampled_at.pop(adapter_key, None)
+            self._rings.pop(adapter_key, None)
+
+    def latest(self, adapter_key: str, *, max_age: Optional[float] = None) -> Optional[StreamStats]:
+        """Last collected stats, or ``None`` if there are none newer than ``max_age`` seconds."""
+        sampled_at = self._sampled_at.get(adapter_key)
+        if sampled_at is None or (max_age is not None and time.time() - sampled_at > max_age):
+            return None
+        return self._latest[adapter_key]
+
+    def snapshot(self) -> Dict[str, Tuple[StreamStats, float]]:
+        """Latest stats and sample time per adapter key."""
+        return {key: (stats, self._sampled_at[key]) for key, stats in self._latest.items()}
+
+    def history(self, adapter_key: str, *, window: float, step: float = 0.0) -> Optional[Dict[str, Any]]:
+        ring = self._rings.get(adapter_key)
+        if ring is None:
+            return None
+        since = time.time() - window
+        if step > 0:
+            return {"step": step, "buckets": ring.downsample(since, step)}
+        return ring.window(since)
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+
+from controller.adapters.registry import AdapterRegistry, origin_of
+from controller.core.models import AdapterKind
+
+
+def test_adapters_and_pools_are_shared_per_origin():
+    registry = AdapterRegistry()
+    a = registry.get(AdapterKind.nimble, "https://nimble-a.example/", "key-a")
+    assert registry.get(AdapterKind.nimble, "https://nimble-a.example", "key-a") is a
+    other_key = registry.get(AdapterKind.nimble, "https://nimble-a.example", "key-b")
+    assert other_key is not a and other_key._pool is a._pool
+    registry.get(AdapterKind.nimble, "https://nimble-b.example:8443/api", "key-a")
+    stats = registry.stats()
+    assert stats["adapters"] == 3
+    assert set(stats["pools"]) == {"https://nimble-a.example:443", "https://nimble-b.example:8443"}
+    assert stats["pools"]["https://nimble-a.example:443"]["connections"] == 0
+    asyncio.run(registry.close())
+
+
+def test_pool_counts_requests_and_sends_adapter_key():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((str(request.url), request.headers["X-API-KEY"]))
+        return httpx.Response(200, json={"ingest_status": "live"})
+
+    async def scenario():
+        registry = AdapterRegistry()
+        adapter = registry.get(AdapterKind.nimble, "http://origin.test/nimble", "secret")
+        pool = registry.pool("http://origin.test")
+        pool.client._transport = httpx.MockTransport(handler)
+        stats = await adapter.fetch_stats("s1")
+        await registry.close()
+        return stats, pool.stats()
+
+    stats, pool_stats = asyncio.run(scenario())
+    assert stats.ingest_status == "live"
+    assert seen == [("http://origin.test/nimble/api/streams/s1/stats", "secret")]
+    assert pool_stats["requests"] == 1 and pool_stats["in_flight"] == 0
+    assert pool_stats["connections"] is None  # a mock transport has no pool to count
+    assert origin_of("http://origin.test/nimble") == "http://origin.test:80"
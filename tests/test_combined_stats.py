@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+from controller.core.models import StreamStats
+from controller.state import AppState
+
+STREAM_ID = "TT-2025-10-07-001"
+
+
+class StatsAdapter:
+    def __init__(self, delay=0.0, renditions=None):
+        self.delay = delay
+        self.renditions = renditions or {"720p": {"kbps": 3000.0}}
+
+    async def fetch_stats(self, stream_id):
+        await asyncio.sleep(self.delay)
+        return StreamStats(stream_id=stream_id, ingest_status="live", renditions=self.renditions)
+
+
+def _state(primary_delay=0.0, backup_delay=0.0):
+    state = AppState()
+    state.stats_deadline = 0.1
+    state.adapters[f"{STREAM_ID}:primary"] = StatsAdapter(primary_delay)
+    state.adapters[f"{STREAM_ID}:backup"] = StatsAdapter(backup_delay, {"720p": {"kbps": 2900.0}, "1080p": {"kbps": 6000.0}})
+    return state
+
+
+def test_combined_stats_merges_both_origins():
+    combined = asyncio.run(_state().combined_stats(STREAM_ID))
+    assert not combined.partial and combined.healthy_origins == ["primary", "backup"]
+    assert combined.renditions["720p"] == {"primary": {"kbps": 3000.0}, "backup": {"kbps": 2900.0}}
+    assert set(combined.renditions["1080p"]) == {"backup"}
+    assert combined.origins["primary"].source == "live" and combined.selected_origin == "primary"
+
+
+def test_slow_origin_is_reported_as_timeout_within_budget():
+    state = _state(backup_delay=5.0)
+    started = time.perf_counter()
+    combined = asyncio.run(state.combined_stats(STREAM_ID))
+    assert time.perf_counter() - started < 1.0
+    assert combined.partial and combined.origins["backup"].error == "timeout"
+    assert combined.origins["primary"].stats is not None
+
+
+def test_many_streams_share_budget_and_report_unknown_ids():
+    results = asyncio.run(_state().combined_stats_many([STREAM_ID, "nope", STREAM_ID]))
+    assert list(results) == [STREAM_ID, "nope"]
+    assert results["nope"] == {"error": "stream not found"}
+    assert results[STREAM_ID].healthy_origins == ["primary", "backup"]
+
+
+def test_removed_stream_is_forgotten_by_collector_selector_and_live_stats():
+    state = _state()
+    asyncio.run(state.stats.collect_once())
+    state.origins.override(STREAM_ID, "backup")
+    assert state.stats.snapshot() and asyncio.run(state.live_stats.subscribe().next(timeout=0.1))
+
+    state.repository.remove_stream(STREAM_ID)
+    assert state.stats.snapshot() == {} and state.stats.history(f"{STREAM_ID}:primary", window=60) is None
+    assert STREAM_ID not in state.origins.snapshot() and not state.origins.use_backup(STREAM_ID)
+    # New live subscribers are no longer primed with the removed stream's values.
+    assert asyncio.run(state.live_stats.subscribe().next(timeout=0.1)) == {}
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import shutil
+from pathlib import Path
+
+from controller.config_loader import IncrementalLoader, SnapshotCache, diff_bundles
+from controller.core.models import AdapterKind
+from controller.repository import Repository
+from controller.workers.config_watch import ConfigWatcher
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+STREAM_ID = "TT-2025-10-07-001"
+
+NEW_STREAM = """
+  - id: "TT-2025-10-07-002"
+    description: "Table Tennis - Arena 2"
+    adapters:
+      primary: {kind: "nimble", base_url: "https://nimble-a.internal", api_key: "k"}
+      backup:  {kind: "nimble", base_url: "https://nimble-b.internal", api_key: "k"}
+    ingest:
+      srt: {mode: "listener", port: 9002, passphrase_env: "SRT_PASSPHRASE"}
+    packaging:
+      ll_hls_path: "/live/TT-2025-10-07-002/index.m3u8"
+    assigned_clients: ["superbet"]
+"""
+
+
+def _edit(path: Path, old: str, new: str) -> None:
+    path.write_text(path.read_text().replace(old, new) if old else path.read_text() + new)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _watcher(tmp_path: Path):
+    config_dir = tmp_path / "config"
+    shutil.copytree(CONFIG_DIR, config_dir)
+    loader = IncrementalLoader(config_dir)
+    snapshot, parsed = loader.load()
+    assert len(parsed) == 3
+    repository = Repository.from_config(snapshot)
+    queued = []
+    watcher = ConfigWatcher(loader, repository, snapshot, reconcile=queued.append)
+    return config_dir, loader, repository, watcher, queued
+
+
+def test_reload_parses_changed_files_and_reconciles_affected_streams(tmp_path):
+    config_dir, loader, repository, watcher, queued = _watcher(tmp_path)
+    assert loader.changed_files() == []
+    previous_profiles = watcher.snapshot.playback_profiles
+
+    _edit(config_dir / "streams.yaml", "", NEW_STREAM)
+    _edit(config_dir / "clients.yaml", "token_ttl_seconds: 90", "token_ttl_seconds: 120")
+    assert loader.changed_files() == ["clients.yaml", "streams.yaml"]
+    report = asyncio.run(watcher.reload())
+
+    assert report.error is None and report.files == ["clients.yaml", "streams.yaml"]
+    assert report.diff.clients.changed == ["betsson"] and not report.diff.playback_profiles
+    assert report.diff.streams.added == ["TT-2025-10-07-002"]
+    assert report.reconciled == [STREAM_ID, "TT-2025-10-07-002"] and queued == [report.reconciled]
+    assert repository.get_client("betsson").token_ttl_seconds == 120
+    assert watcher.snapshot.playback_profiles is previous_profiles
+
+    _edit(config_dir / "playback_profiles.yaml", "kbps: 700", "kbps: 800")
+    report = asyncio.run(watcher.reload())
+    assert report.diff.playback_profiles.changed == ["economy_abr"]
+    # Only superbet uses economy_abr; both streams list it.
+    assert report.reconciled == [STREAM_ID, "TT-2025-10-07-002"]
+
+
+def test_broken_file_keeps_previous_config(tmp_path):
+    config_dir, loader, repository, watcher, queued = _watcher(tmp_path)
+    version = repository.version
+    _edit(config_dir / "clients.yaml", "token_ttl_seconds: 90", "token_ttl_seconds: [")
+
+    report = asyncio.run(watcher.reload())
+    assert report.error is not None and queued == []
+    assert repository.version == version and repository.get_client("betsson").token_ttl_seconds == 90
+    assert loader.changed_files() == []
+
+
+def test_snapshot_cache_is_reused_until_contents_change(tmp_path):
+    config_dir = tmp_path / "config"
+    shutil.copytree(CONFIG_DIR, config_dir)
+    cache = SnapshotCache(tmp_path / "snapshots")
+
+    first = IncrementalLoader(config_dir, snapshots=cache)
+    bundle, parsed = first.load()
+    assert first.source == "yaml" and len(parsed) == 3
+    assert len(list(cache.directory.glob("config-*.json"))) == 1
+
+    second = IncrementalLoader(config_dir, snapshots=cache)
+    cached, parsed = second.load()
+    assert second.source == "snapshot" and parsed == []
+    assert not diff_bundles(bundle, cached)
+    assert cached.streams[STREAM_ID].adapters.primary.kind is AdapterKind.nimble
+
+    _edit(config_dir / "clients.yaml", "token_ttl_seconds: 90", "token_ttl_seconds: 120")
+    third = IncrementalLoader(config_dir, snapshots=cache)
+    reparsed, parsed = third.load()
+    assert third.source == "yaml" and reparsed.clients["betsson"].token_ttl_seconds == 120
+    assert len(list(cache.directory.glob("config-*.json"))) == 1
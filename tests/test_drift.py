@@ -0,0 +1,82 @@
+import asyncio
+from pathlib import Path
+
+from controller.adapters.base import AdapterError
+from controller.config_loader import load_from_directory
+from controller.core.models import StreamStats
+from controller.repository import Repository
+from controller.workers.drift import DriftDetector
+from controller.workers.reconciler import Reconciler
+from controller.workers.scheduler import ReconcileScheduler
+from controller.workers.stats import StatsCollector
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+STREAM_ID = "TT-2025-10-07-001"
+
+
+class StatsAdapter:
+    def __init__(self, base_url, status="online", renditions=None, fail=False):
+        self.base_url = base_url
+        self.status = status
+        self.renditions = renditions or {}
+        self.fail = fail
+        self.stats_calls = 0
+        self.provisioned = 0
+
+    async def fetch_stats(self, stream_id):
+        self.stats_calls += 1
+        if self.fail:
+            raise AdapterError("boom")
+        return StreamStats(stream_id=stream_id, ingest_status=self.status, renditions=self.renditions)
+
+    async def provision_stream(self, stream_id, spec, path, profiles):
+        self.provisioned += 1
+
+    async def ensure_token_policies(self, policies):
+        pass
+
+
+def run_detector(primary, backup, runs=1, collect=False):
+    async def scenario():
+        repository = Repository.from_config(load_from_directory(CONFIG_DIR))
+        adapters = {f"{STREAM_ID}:primary": primary, f"{STREAM_ID}:backup": backup}
+        reconciler = Reconciler(adapters=adapters, repository=repository)
+        scheduler = ReconcileScheduler(reconciler, workers=1)
+        stats = StatsCollector(adapters=adapters, repository=repository, interval=5)
+        if collect:
+            await stats.collect_once()
+        detector = DriftDetector(
+            adapters=adapters, repository=repository, reconciler=reconciler, scheduler=scheduler, interval=30, stats=stats
+        )
+        results = [await detector.run_once() for _ in range(runs)]
+        await scheduler.stop()
+        return results, detector.snapshot()
+
+    return asyncio.run(scenario())
+
+
+def test_missing_stream_is_force_reconciled():
+    primary = StatsAdapter("https://a", renditions={"1080p": {}, "720p": {}, "540p": {}, "360p": {}})
+    backup = StatsAdapter("https://b", status="missing")
+    (drifted,), status = run_detector(primary, backup)
+    assert drifted == [STREAM_ID]
+    assert primary.provisioned == 1 and backup.provisioned == 1
+    assert status["last_converge_seconds"] is not None
+
+
+def test_failing_adapter_backs_off_and_in_sync_stream_is_left_alone():
+    primary = StatsAdapter("https://a", fail=True)
+    backup = StatsAdapter("https://b")
+    results, status = run_detector(primary, backup, runs=2)
+    assert results == [[], []]
+    assert primary.stats_calls == 1 and backup.stats_calls == 2
+    assert "https://a" in status["backoff"]
+
+
+def test_fresh_collector_samples_replace_live_stats_calls():
+    primary = StatsAdapter("https://a", renditions={"1080p": {}, "720p": {}, "540p": {}, "360p": {}})
+    backup = StatsAdapter("https://b", status="missing")
+    (drifted,), _ = run_detector(primary, backup, collect=True)
+    assert drifted == [STREAM_ID]
+    # One call each from the collection round; the drift run reads its samples.
+    assert primary.stats_calls == 1 and backup.stats_calls == 1
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from controller.api.routes import get_state, router
+from controller.state import AppState
+from controller.workers.jobs import JobState, JobStore
+from controller.workers.reconciler import ReconcileResult
+from controller.workers.scheduler import ReconcileScheduler
+
+
+class SteppingReconciler:
+    async def apply(self, stream_id, *, force=False, progress=None):
+        progress("a:primary", "provision", "running", None)
+        await asyncio.sleep(0)
+        progress("a:primary", "provision", "done", None)
+        if stream_id == "broken":
+            raise RuntimeError("origin down")
+        return ReconcileResult(stream_id=stream_id, applied=2, skipped=1)
+
+
+def test_job_tracks_progress_and_result():
+    async def scenario():
+        store = JobStore()
+        scheduler = ReconcileScheduler(SteppingReconciler(), workers=1)
+        jobs = []
+        for stream_id in ("ok", "broken"):
+            job = store.create(stream_id)
+            future = scheduler.submit([stream_id], progress=job.record)[stream_id]
+            future.add_done_callback(job.finish)
+            jobs.append((job, future))
+        assert all(job.state == JobState.queued for job, _ in jobs)
+        await asyncio.gather(*(future for _, future in jobs), return_exceptions=True)
+        await asyncio.sleep(0)
+        await scheduler.stop()
+        return [job for job, _ in jobs]
+
+    ok, broken = asyncio.run(scenario())
+    assert ok.state == JobState.succeeded and (ok.applied, ok.skipped) == (2, 1)
+    assert [(s.step, s.status) for s in ok.steps] == [("provision", "done")]
+    assert broken.state == JobState.failed and broken.error == "origin down"
+
+
+def test_job_store_evicts_finished_jobs_first():
+    store = JobStore(max_jobs=2)
+    first = store.create("a")
+    first.state = JobState.succeeded
+    second = store.create("b")
+    store.create("c")
+    assert store.get(first.id) is None
+    assert store.get(second.id) is second
+    assert [job.stream_id for job in store.recent()] == ["c", "b"]
+    assert [job.stream_id for job in store.recent(1)] == ["c"]
+    assert store.recent(0) == [] and store.recent(-1) == []
+
+
+def test_jobs_route_validates_limit():
+    state = AppState()
+    for stream_id in ("a", "b", "c"):
+        state.jobs.create(stream_id)
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_state] = lambda: state
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return [await client.get("/v1/jobs", params=params) for params in ({"limit": 2}, {"limit": 0}, {"limit": -1}, {"limit": 5000})]
+
+    ok, zero, negative, huge = asyncio.run(scenario())
+    assert [job["stream_id"] for job in ok.json()] == ["c", "b"]
+    assert zero.status_code == negative.status_code == huge.status_code == 422
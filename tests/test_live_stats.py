@@ -0,0 +1,63 @@
+import asyncio
+
+from controller.core.models import StreamStats
+from controller.workers.live import FieldThreshold, StatsBroadcaster, TooManySubscribers
+
+KEY = "TT-1:primary"
+
+
+def _stats(part_age, kbps=3000.0, status="live"):
+    return StreamStats(
+        stream_id="TT-1", ingest_status=status, last_part_age_seconds=part_age, renditions={"720p": {"kbps": kbps}}
+    )
+
+
+def test_field_threshold_pushes_on_delta_or_level_crossing():
+    threshold = FieldThreshold(delta=0.5, levels=(1.5,))
+    assert not threshold.changed(1.0, 1.3)
+    assert threshold.changed(1.3, 1.6)
+    assert threshold.changed(0.4, 1.0)
+    assert FieldThreshold(relative=0.1).changed(3000.0, 3400.0)
+    assert not FieldThreshold(relative=0.1).changed(3000.0, 3100.0)
+
+
+def test_only_changed_fields_are_pushed():
+    async def scenario():
+        broadcaster = StatsBroadcaster()
+        subscription = broadcaster.subscribe(["TT-1"])
+        other = broadcaster.subscribe(["TT-2"])
+        broadcaster.observe_round({KEY: _stats(0.5)}, 1.0)
+        first = await subscription.next(0.1)
+        broadcaster.observe_round({KEY: _stats(0.6, kbps=3050.0)}, 2.0)
+        assert await subscription.next(0.01) == {}
+        broadcaster.observe_round({KEY: _stats(1.6)}, 3.0)
+        crossed = await subscription.next(0.1)
+        broadcaster.observe_round({KEY: None}, 4.0)
+        failed = await subscription.next(0.1)
+        return first, crossed, failed, await other.next(0.01)
+
+    first, crossed, failed, other = asyncio.run(scenario())
+    assert first[KEY]["changes"]["part_age"] == 0.5 and first[KEY]["changes"]["available"] is True
+    assert crossed[KEY] == {"ts": 3.0, "changes": {"part_age": 1.6}}
+    assert failed[KEY]["changes"] == {"available": False}
+    assert other == {}
+
+
+def test_slow_subscriber_gets_coalesced_frames_and_new_subscriber_is_primed():
+    async def scenario():
+        broadcaster = StatsBroadcaster(max_subscribers=2)
+        slow = broadcaster.subscribe()
+        for tick, part_age in enumerate((0.5, 1.6, 3.5, 0.4)):
+            broadcaster.observe_round({KEY: _stats(part_age)}, float(tick))
+        late = broadcaster.subscribe()
+        try:
+            broadcaster.subscribe()
+        except TooManySubscribers:
+            limited = True
+        return broadcaster, slow, await slow.next(0.1), await late.next(0.1), limited
+
+    broadcaster, slow, frames, primed, limited = asyncio.run(scenario())
+    assert frames[KEY]["changes"]["part_age"] == 0.4 and frames[KEY]["ts"] == 3.0
+    assert slow.dropped == 3 and broadcaster.counters["dropped"] == 3
+    assert primed[KEY]["changes"]["part_age"] == 0.4 and primed[KEY]["changes"]["ingest_status"] == "live"
+    assert limited
@@ -0,0 +1,26 @@
+from controller.metrics import Histogram, MetricFamily, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("media_test_seconds", "Test.", ("outcome",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "ok")
+    lines = histogram.render()
+    assert 'media_test_seconds_bucket{outcome="ok",le="0.1"} 2' in lines
+    assert 'media_test_seconds_bucket{outcome="ok",le="1.0"} 3' in lines
+    assert 'media_test_seconds_bucket{outcome="ok",le="+Inf"} 4' in lines
+    assert 'media_test_seconds_sum{outcome="ok"} 3.65' in lines
+    assert histogram.count("ok") == 4 and histogram.count("denied") == 0
+
+
+def test_registry_renders_instruments_and_scrape_time_families():
+    registry = Registry()
+    counter = registry.counter("media_test_total", "Test.", ("reason",))
+    counter.inc('bad"quote')
+    counter.inc('bad"quote', amount=2)
+    family = MetricFamily("media_ingest_up", "Up.", [({"stream": "s1", "origin": "primary"}, 1.0)])
+    text = registry.render([lambda: [family]])
+    assert '# TYPE media_test_total counter' in text
+    assert 'media_test_total{reason="bad\\"quote"} 3' in text
+    assert 'media_ingest_up{stream="s1",origin="primary"} 1' in text
+    assert text.endswith("\n")
@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+
+from benchmarks.load import run_load
+from benchmarks.nimble_sim import SimConfig, create_app
+from controller.adapters.base import ResiliencePolicy
+from controller.adapters.registry import AdapterRegistry, PoolSettings
+from controller.core.models import AdapterKind, IngestSpec, PlaybackProfile, TokenRules
+
+
+def _adapter(app, policy=None, *, bulk_api=True):
+    registry = AdapterRegistry(PoolSettings(bulk_api=bulk_api), transport=httpx.ASGITransport(app=app), policy=policy)
+    return registry, registry.get(AdapterKind.nimble, "http://nimble-sim", "key")
+
+
+def test_simulator_serves_every_adapter_call():
+    app = create_app(SimConfig(latency_ms=0, api_key="key", seed=1))
+
+    async def scenario():
+        registry, adapter = _adapter(app)
+        assert (await adapter.fetch_stats("s1")).ingest_status == "missing"
+        await adapter.ensure_token_policies([("betsson", TokenRules(max_sessions=5, ttl_seconds=60, path_prefix="/live/s1/"))])
+        await adapter.provision_stream("s1", _ingest(), "/live/s1/index.m3u8", [_profile()])
+        stats = await adapter.fetch_stats("s1")
+        await adapter.delete_stream("s1")
+        await registry.close()
+        return stats
+
+    stats = asyncio.run(scenario())
+    sim = app.state.sim
+    assert stats.ingest_status == "live" and set(stats.renditions) == {"720p"}
+    assert sim.requests["provision"] == 1 and sim.requests["token_policy_bulk"] == 1
+    assert "betsson" in sim.token_policies and "s1" not in sim.inputs
+
+
+def test_bulk_calls_fall_back_to_per_resource_calls():
+    policies = [(f"c{i}", TokenRules(max_sessions=5, ttl_seconds=60, path_prefix="/live/s1/")) for i in range(3)]
+
+    async def scenario(app, bulk_api):
+        registry, adapter = _adapter(app, bulk_api=bulk_api)
+        for stream_id in ("s1", "s2"):
+            await adapter.ensure_token_policies(policies)
+            await adapter.provision_stream(stream_id, _ingest(), f"/live/{stream_id}/index.m3u8", [_profile()])
+        await registry.close()
+
+    stock = create_app(SimConfig(latency_ms=0, bulk_api=False))
+    asyncio.run(scenario(stock, True))
+    sim = stock.state.sim
+    # The first 404 is remembered for the host, so only one bulk call is attempted.
+    assert sim.requests["token_policy_bulk"] == 1 and sim.requests["provision"] == 0
+    assert sim.requests["token_policy"] == 6 and set(sim.inputs) == {"s1", "s2"}
+
+    opted_out = create_app(SimConfig(latency_ms=0))
+    asyncio.run(scenario(opted_out, False))
+    sim = opted_out.state.sim
+    assert sim.requests["token_policy_bulk"] == 0 and sim.requests["provision"] == 0
+    assert sim.requests["token_policy"] == 6 and sim.requests["packaging"] == 2
+
+
+def test_injected_errors_and_throttling_are_retried():
+    app = create_app(SimConfig(latency_ms=0, error_rate=1.0, seed=1))
+    policy = ResiliencePolicy(attempts=3, base_delay=0.001, max_delay=0.001)
+
+    async def scenario():
+        registry, adapter = _adapter(app, policy)
+        try:
+            await adapter.fetch_stats("s1")
+        except Exception as exc:  # noqa: BLE001
+            return exc
+        finally:
+            await registry.close()
+
+    assert "503" in str(asyncio.run(scenario()))
+    assert app.state.sim.requests["stats"] == 3
+
+    throttled = create_app(SimConfig(latency_ms=0, rate_limit=1))
+    asyncio.run(_fetch_twice(throttled))
+    assert throttled.state.sim.failures["throttled"] >= 1
+
+
+async def _fetch_twice(app):
+    registry, adapter = _adapter(app, ResiliencePolicy(attempts=1))
+    await adapter.fetch_stats("s1")
+    try:
+        await adapter.fetch_stats("s1")
+    except Exception:  # noqa: BLE001 - the 429 is what we want
+        pass
+    await registry.close()
+
+
+def test_load_harness_reconciles_all_streams():
+    outcome = asyncio.run(run_load(20, sim=SimConfig(latency_ms=0), workers=4, per_host=4, stats_rounds=1))
+    results = {result.name: result for result in outcome["results"]}
+    assert results["load.reconcile.initial"].iterations == 20
+    assert outcome["failures"]["load.reconcile.initial"] == 0
+    assert outcome["simulator"]["streams"] == 20
+
+
+def _ingest():
+    return IngestSpec(srt={"mode": "listener", "port": 9001, "passphrase_env": "SRT"})
+
+
+def _profile():
+    return PlaybackProfile(
+        name="p",
+        gop_seconds=2,
+        parts_seconds=0.5,
+        segment_seconds=2,
+        renditions=[{"name": "720p", "w": 1280, "h": 720, "kbps": 3000, "fps": 50}],
+    )
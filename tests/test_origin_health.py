@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from controller.api.routes import get_state, router
+from controller.core.health import OriginSelector, score
+from controller.core.models import SignRequest, StreamStats
+from controller.state import AppState
+
+STREAM_ID = "TT-2025-10-07-001"
+
+
+def _stats(part_age=0.5, status="live"):
+    return StreamStats(stream_id=STREAM_ID, ingest_status=status, last_part_age_seconds=part_age)
+
+
+def _round(selector, primary, backup):
+    selector.observe_round({f"{STREAM_ID}:primary": primary, f"{STREAM_ID}:backup": backup}, now=0)
+
+
+def test_score_penalizes_part_age_and_down_ingest():
+    assert score(_stats()) == 1.0
+    assert score(_stats(part_age=2.0)) < 0.5
+    assert score(_stats(status="missing")) == 0.0
+    assert score(None) == 0.0
+
+
+def test_failover_and_recovery_need_consecutive_rounds():
+    selector = OriginSelector()
+    _round(selector, _stats(part_age=2.0), _stats())
+    assert not selector.use_backup(STREAM_ID)
+    _round(selector, _stats(part_age=2.0), _stats())
+    assert selector.use_backup(STREAM_ID)
+    assert selector.decision(STREAM_ID).reason == "primary_degraded"
+
+    _round(selector, _stats(), _stats())
+    _round(selector, _stats(part_age=2.0), _stats())
+    _round(selector, _stats(), _stats())
+    _round(selector, _stats(), _stats())
+    assert selector.use_backup(STREAM_ID)
+    _round(selector, _stats(), _stats())
+    assert not selector.use_backup(STREAM_ID)
+
+
+def test_override_pins_until_cleared():
+    selector = OriginSelector()
+    selector.override(STREAM_ID, "backup")
+    for _ in range(5):
+        _round(selector, _stats(), _stats(status="missing"))
+    assert selector.use_backup(STREAM_ID)
+    selector.override(STREAM_ID, None)
+    assert not selector.use_backup(STREAM_ID)
+
+
+def test_unpinned_sign_follows_selected_origin():
+    state = AppState()
+    state.origins.override(STREAM_ID, "backup")
+    request = SignRequest(client_id="betsson", stream_id=STREAM_ID, ip="203.0.113.10", country="SE")
+    assert "backup=1" in asyncio.run(state.sign(request)).url
+    pinned = SignRequest(client_id="betsson", stream_id=STREAM_ID, use_backup=False, ip="203.0.113.10", country="SE")
+    assert "backup=1" not in asyncio.run(state.sign(pinned)).url
+
+
+def test_override_route_requires_an_origin():
+    state = AppState()
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_state] = lambda: state
+    state.origins.override(STREAM_ID, "backup")
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            missing = await client.put(f"/v1/origins/{STREAM_ID}/override", json={})
+            assert state.origins.use_backup(STREAM_ID)
+            pinned = await client.put(f"/v1/origins/{STREAM_ID}/override", json={"origin": "primary"})
+        return missing, pinned
+
+    missing, pinned = asyncio.run(scenario())
+    assert missing.status_code == 422
+    assert pinned.status_code == 200 and pinned.json()["override"] == "primary"
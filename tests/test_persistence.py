@@ -0,0 +1,188 @@
+import asyncio
+import shutil
+import sqlite3
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from controller.config_loader import IncrementalLoader, load_from_directory
+from controller.persistence import SQLiteStore, SQLStore, WriteBehind, bulk_load
+from controller.repository import Repository
+from controller.workers.config_watch import ConfigWatcher
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+STREAM_ID = "TT-2025-10-07-001"
+
+
+def _attached(path: Path, bundle=None, **kwargs):
+    bundle = bundle or load_from_directory(CONFIG_DIR)
+    repository = Repository.from_config(bundle)
+    writer = WriteBehind(SQLiteStore(str(path)), **kwargs)
+    bulk_load(repository, writer.store)
+    clock = kwargs.get("clock")
+    repository.attach(writer, **({"clock": clock} if clock else {}))
+    return bundle, repository, writer
+
+
+def test_writes_are_coalesced_and_survive_a_restart(tmp_path):
+    bundle, repository, writer = _attached(tmp_path / "repo.db")
+    assert writer.pending == 0  # the YAML seed is not persisted
+
+    client = bundle.clients["betsson"]
+    repository.add_client(replace(client, id="newco", token_ttl_seconds=30))
+    repository.add_client(replace(client, id="newco", token_ttl_seconds=45))
+    stream = replace(bundle.streams[STREAM_ID], id="TT-NEW", assigned_clients=["newco"])
+    repository.add_stream(stream)
+    assert writer.stats()["pending"] == 2 and writer.counters["coalesced"] == 1
+
+    assert asyncio.run(writer.flush()) == 2
+    assert writer.counters["batches"] == 1 and writer.pending == 0
+    writer.close()
+
+    restarted = Repository.from_config(load_from_directory(CONFIG_DIR))
+    store = SQLiteStore(str(tmp_path / "repo.db"))
+    assert bulk_load(restarted, store) == 2
+    assert restarted.get_client("newco").token_ttl_seconds == 45
+    assert restarted.get_stream("TT-NEW") == stream
+    assert [s.id for s in restarted.streams_for_client("newco")] == ["TT-NEW"]
+    store.close()
+
+
+def test_ensure_loaded_picks_up_rows_written_by_another_worker(tmp_path):
+    now = [0.0]
+    bundle, repository, writer = _attached(tmp_path / "repo.db", clock=lambda: now[0])
+    _, other, other_writer = _attached(tmp_path / "repo.db")
+    assert not asyncio.run(repository.ensure_loaded("client", "newco"))
+
+    other.add_client(replace(bundle.clients["betsson"], id="newco"))
+    asyncio.run(other_writer.flush())
+    # Lookups never leave memory, and the miss is remembered for a few seconds.
+    assert repository.get_client("newco") is None
+    assert not asyncio.run(repository.ensure_loaded("client", "newco"))
+    now[0] += 10
+    assert asyncio.run(repository.ensure_loaded("client", "newco"))
+    assert repository.get_client("newco").id == "newco" and writer.pending == 0
+    other_writer.close()
+    writer.close()
+
+
+def test_updates_and_deletes_reach_other_workers_through_the_poll(tmp_path):
+    bundle, repository, writer = _attached(tmp_path / "repo.db")
+    _, other, other_writer = _attached(tmp_path / "repo.db")
+    betsson = bundle.clients["betsson"]
+    repository.add_client(replace(betsson, id="newco"))
+    asyncio.run(writer.flush())
+    assert asyncio.run(other.ensure_loaded("client", "newco"))
+
+    # Revocations: narrow a YAML client's allowlist and delete the API-created one.
+    repository.add_client(replace(betsson, ip_allowlist=["198.51.100.0/24"]))
+    repository.remove_client("newco")
+    asyncio.run(writer.flush())
+    # A write this worker has not flushed yet is not overwritten by the poll.
+    other.add_playback_profile(replace(bundle.playback_profiles["default_abr"], name="local"))
+    assert asyncio.run(other_writer.poll()) == 2
+    assert other.get_client("betsson").ip_allowlist == ["198.51.100.0/24"]
+    assert other.get_client("newco") is None and other.get_playback_profile("local") is not None
+    version = other.version
+    assert asyncio.run(other_writer.poll()) == 2  # re-read within the overlap window, nothing changes
+    assert other.version == version
+
+    # Deleting a YAML entity through the API also holds across a restart.
+    repository.remove_client("betsson")
+    asyncio.run(writer.flush())
+    _, restarted, restarted_writer = _attached(tmp_path / "repo.db")
+    assert restarted.get_client("betsson") is None
+    for w in (writer, other_writer, restarted_writer):
+        w.close()
+
+
+def test_pending_delete_is_not_resurrected_from_the_store(tmp_path):
+    bundle, repository, writer = _attached(tmp_path / "repo.db")
+    repository.add_client(replace(bundle.clients["betsson"], id="newco"))
+    asyncio.run(writer.flush())
+
+    repository.remove_client("newco")
+    assert writer.pending_write("client", "newco") == (True, None)
+    assert not asyncio.run(repository.ensure_loaded("client", "newco"))
+
+    asyncio.run(writer.flush())
+    assert writer.store.get("client", "newco") is None
+    writer.close()
+
+
+def test_yaml_changes_win_over_stored_rows_at_runtime_and_on_restart(tmp_path):
+    config_dir = tmp_path / "config"
+    shutil.copytree(CONFIG_DIR, config_dir)
+    loader = IncrementalLoader(config_dir)
+    bundle, _ = loader.load()
+    _, repository, writer = _attached(tmp_path / "repo.db", bundle)
+    edited = replace(bundle.streams[STREAM_ID], description="edited through the API")
+    repository.add_stream(edited)
+    repository.add_client(replace(bundle.clients["betsson"], token_ttl_seconds=15))
+    asyncio.run(writer.flush())
+
+    # Unchanged YAML: the API edits survive a restart.
+    _, restarted, other = _attached(tmp_path / "repo.db", load_from_directory(config_dir))
+    assert restarted.get_stream(STREAM_ID) == edited and restarted.get_client("betsson").token_ttl_seconds == 15
+    other.close()
+
+    # Removing the stream from the YAML removes it for good, even though the store had it.
+    streams = config_dir / "streams.yaml"
+    streams.write_text("streams: []\n")
+    watcher = ConfigWatcher(loader, repository, bundle, reconcile=lambda ids: None)
+    report = asyncio.run(watcher.reload())
+    assert report.diff.streams.removed == [STREAM_ID]
+    assert not asyncio.run(repository.ensure_loaded("stream", STREAM_ID))
+    asyncio.run(writer.flush())
+    assert writer.store.get("stream", STREAM_ID) is None
+    writer.close()
+
+    # The YAML client changed while stopped (here: differs from the one the API edit replaced) wins too.
+    clients = config_dir / "clients.yaml"
+    clients.write_text(clients.read_text().replace("token_ttl_seconds: 90", "token_ttl_seconds: 120"))
+    _, restarted, other = _attached(tmp_path / "repo.db", load_from_directory(config_dir))
+    assert restarted.get_client("betsson").token_ttl_seconds == 120 and STREAM_ID not in restarted.streams
+    assert [entity for _, _, entity, _ in other.store.load_all()] == [None, None]  # tombstones only
+    other.close()
+
+
+def test_failed_flushes_back_off_and_keep_newer_writes(tmp_path):
+    now = [0.0]
+    bundle, repository, writer = _attached(tmp_path / "repo.db", clock=lambda: now[0])
+    client = bundle.clients["betsson"]
+    repository.add_client(replace(client, id="newco", token_ttl_seconds=30))
+    store_write = writer.store.write_batch
+
+    def failing(batch):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    writer.store.write_batch = failing
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(writer.flush())
+    repository.add_client(replace(client, id="newco", token_ttl_seconds=60))
+    stats = writer.stats()
+    assert stats["failures"] == 1 and not stats["healthy"] and stats["retry_in"] > 0
+    assert stats["last_error"] == "OperationalError: disk I/O error"
+
+    writer.store.write_batch = store_write
+    asyncio.run(writer.flush())
+    assert writer.healthy and writer.store.get("client", "newco").token_ttl_seconds == 60
+    writer.close()
+
+
+def test_broken_connection_is_reopened(tmp_path):
+    opened = []
+
+    def connect():
+        opened.append(sqlite3.connect(str(tmp_path / "repo.db"), check_same_thread=False))
+        return opened[-1]
+
+    store = SQLStore(connect, broken=(sqlite3.ProgrammingError,))
+    opened[0].close()  # operating on a closed connection raises ProgrammingError
+    client = load_from_directory(CONFIG_DIR).clients["betsson"]
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.write_batch({("client", "betsson"): (client, "")})
+    store.write_batch({("client", "betsson"): (client, "")})
+    assert store.reconnects == 1 and store.get("client", "betsson") == client
+    store.close()
@@ -1,7 +1,12 @@
 import pytest
 
 from controller.core.models import Client, GeoPolicy, SignRequest, Stream, StreamAdapters, PackagingSpec, IngestSpec, IngestSRT, AdapterSpec
-from controller.core.policy import AuthorizationError, PolicyEngine
+from controller.core.policy import AuthorizationError, CompiledPolicyEngine, IntervalTable, PolicyEngine
+
+
+@pytest.fixture(params=[PolicyEngine, CompiledPolicyEngine], ids=["plain", "compiled"])
+def engine_cls(request):
+    return request.param
 
 
 @pytest.fixture
@@ -34,22 +39,41 @@ def stream(client: Client) -> Stream:
     )
 
 
-def test_authorize_ok(client: Client, stream: Stream):
-    engine = PolicyEngine({client.id: client}, {stream.id: stream})
+def test_authorize_ok(engine_cls, client: Client, stream: Stream):
+    engine = engine_cls({client.id: client}, {stream.id: stream})
     req = SignRequest(client_id=client.id, stream_id=stream.id, use_backup=False, ip="203.0.113.10", country="SE")
     result = engine.authorize(req, ip=req.ip, country=req.country)
     assert result.id == client.id
 
 
-def test_authorize_denied_ip(client: Client, stream: Stream):
-    engine = PolicyEngine({client.id: client}, {stream.id: stream})
+def test_authorize_denied_ip(engine_cls, client: Client, stream: Stream):
+    engine = engine_cls({client.id: client}, {stream.id: stream})
     req = SignRequest(client_id=client.id, stream_id=stream.id, use_backup=False, ip="10.0.0.1", country="SE")
     with pytest.raises(AuthorizationError):
         engine.authorize(req, ip=req.ip, country=req.country)
 
 
-def test_authorize_denied_geo(client: Client, stream: Stream):
-    engine = PolicyEngine({client.id: client}, {stream.id: stream})
+def test_authorize_denied_geo(engine_cls, client: Client, stream: Stream):
+    engine = engine_cls({client.id: client}, {stream.id: stream})
     req = SignRequest(client_id=client.id, stream_id=stream.id, use_backup=False, ip="203.0.113.10", country="US")
     with pytest.raises(AuthorizationError):
         engine.authorize(req, ip=req.ip, country=req.country)
+
+
+def test_compiled_engine_ipv6_and_change_tracking(client: Client, stream: Stream):
+    clients = {client.id: client}
+    engine = CompiledPolicyEngine(clients, {stream.id: stream})
+    req = SignRequest(client_id=client.id, stream_id=stream.id, ip="2001:db8::1", country="SE")
+    with pytest.raises(AuthorizationError):
+        engine.authorize(req, ip=req.ip, country=req.country)
+
+    client.ip_allowlist = ["203.0.113.0/24", "2001:db8::/32"]
+    engine.on_change("client", client.id)
+    assert engine.authorize(req, ip=req.ip, country=req.country).id == client.id
+
+
+def test_interval_table_merges_overlaps():
+    table = IntervalTable.build([(10, 20), (15, 30), (31, 40), (50, 60)])
+    assert table.starts == (10, 50)
+    assert 40 in table and 50 in table
+    assert 9 not in table and 45 not in table and 61 not in table
@@ -0,0 +1,83 @@
+import asyncio
+from pathlib import Path
+
+from controller.config_loader import load_from_directory
+from controller.core.models import StreamStats
+from controller.repository import Repository
+from controller.workers.reconciler import Reconciler
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+STREAM_ID = "TT-2025-10-07-001"
+
+
+class RecordingAdapter:
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def ensure_input(self, stream_id, spec):
+        self.calls.append(("input", stream_id))
+
+    async def ensure_transcode_profile(self, stream_id, profile):
+        self.calls.append(("transcode", profile.name))
+
+    async def ensure_packaging_ll_hls(self, stream_id, path, profile):
+        self.calls.append(("packaging", profile.name))
+
+    async def ensure_token_policy(self, client_id, rules):
+        self.calls.append(("token", client_id))
+
+    async def fetch_stats(self, stream_id):
+        return StreamStats(stream_id=stream_id, ingest_status="online")
+
+    async def delete_stream(self, stream_id):
+        self.calls.append(("delete", stream_id))
+
+
+def build_reconciler(**kwargs):
+    repository = Repository.from_config(load_from_directory(CONFIG_DIR))
+    adapters = {f"{STREAM_ID}:primary": RecordingAdapter(), f"{STREAM_ID}:backup": RecordingAdapter()}
+    return repository, adapters, Reconciler(adapters=adapters, repository=repository, **kwargs)
+
+
+def test_unchanged_state_is_skipped_until_forced_or_changed():
+    repository, adapters, reconciler = build_reconciler()
+    first = asyncio.run(reconciler.apply(STREAM_ID))
+    assert first.applied > 0
+
+    adapters[f"{STREAM_ID}:primary"].calls.clear()
+    second = asyncio.run(reconciler.apply(STREAM_ID))
+    assert second.applied == 0 and second.skipped > 0
+    assert adapters[f"{STREAM_ID}:primary"].calls == []
+
+    repository.clients["betsson"].token_ttl_seconds = 120
+    third = asyncio.run(reconciler.apply(STREAM_ID))
+    assert third.applied == 2
+    assert ("token", "betsson") in adapters[f"{STREAM_ID}:primary"].calls
+
+    forced = asyncio.run(reconciler.apply(STREAM_ID, force=True))
+    assert forced.skipped == 0 and forced.applied == first.applied
+
+
+def test_periodic_resync_ignores_fingerprints():
+    _, _, reconciler = build_reconciler(resync_interval=0)
+    first = asyncio.run(reconciler.apply(STREAM_ID))
+    again = asyncio.run(reconciler.apply(STREAM_ID))
+    assert again.applied == first.applied
+
+
+class BulkAdapter(RecordingAdapter):
+    async def ensure_token_policies(self, policies):
+        self.calls.append(("token-bulk", tuple(client_id for client_id, _ in policies)))
+
+    async def provision_stream(self, stream_id, spec, path, profiles):
+        self.calls.append(("provision", tuple(profile.name for profile in profiles)))
+
+
+def test_bulk_adapters_get_one_call_per_resource_kind():
+    repository = Repository.from_config(load_from_directory(CONFIG_DIR))
+    bulk, plain = BulkAdapter(), RecordingAdapter()
+    reconciler = Reconciler(adapters={f"{STREAM_ID}:primary": bulk, f"{STREAM_ID}:backup": plain}, repository=repository)
+    asyncio.run(reconciler.apply(STREAM_ID))
+
+    assert sorted(bulk.calls) == [("provision", ("default_abr", "economy_abr")), ("token-bulk", ("betsson", "superbet"))]
+    assert sorted(call for call in plain.calls if call[0] == "token") == [("token", "betsson"), ("token", "superbet")]
@@ -0,0 +1,52 @@
+from dataclasses import replace
+from pathlib import Path
+
+from controller.config_loader import load_from_directory
+from controller.core.models import AdapterSpec, StreamAdapters
+from controller.repository import Repository
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+STREAM_ID = "TT-2025-10-07-001"
+
+
+def _repository() -> Repository:
+    return Repository.from_config(load_from_directory(CONFIG_DIR))
+
+
+def test_secondary_indexes_follow_writes():
+    repo = _repository()
+    stream = repo.get_stream(STREAM_ID)
+    client_id = stream.assigned_clients[0]
+    primary = stream.adapters.primary
+    version = repo.version
+
+    assert STREAM_ID in [s.id for s in repo.streams_for_client(client_id)]
+    assert client_id in [c.id for c in repo.clients_for_profile(repo.get_client(client_id).playback_profile)]
+    assert STREAM_ID in [s.id for s in repo.streams_on_host(primary.base_url)]
+    assert f"{STREAM_ID}:primary" in repo.adapters_of_kind(primary.kind)
+
+    moved = replace(
+        stream,
+        assigned_clients=[],
+        adapters=StreamAdapters(primary=AdapterSpec(kind="wowza", base_url="http://new", api_key="k"), backup=stream.adapters.backup),
+    )
+    repo.add_stream(moved)
+    assert repo.version == version + 1
+    assert STREAM_ID not in [s.id for s in repo.streams_for_client(client_id)]
+    assert [s.id for s in repo.streams_on_host("http://new")] == [STREAM_ID]
+    assert repo.adapters_of_kind("wowza") == [f"{STREAM_ID}:primary"]
+    assert f"{STREAM_ID}:primary" not in repo.adapters_of_kind(primary.kind)
+
+    assert repo.remove_stream(STREAM_ID) and not repo.remove_stream(STREAM_ID)
+    assert repo.streams_on_host("http://new") == [] and repo.adapters_of_kind("wowza") == []
+
+
+def test_profiles_for_stream_dedupes_and_skips_missing():
+    repo = _repository()
+    stream = repo.get_stream(STREAM_ID)
+    client = repo.get_client(stream.assigned_clients[0])
+    stream = replace(stream, assigned_clients=[client.id, client.id, "ghost"])
+    assert [p.name for p in repo.profiles_for_stream(stream)] == [client.playback_profile]
+
+    repo.remove_playback_profile(client.playback_profile)
+    assert repo.profiles_for_stream(stream) == []
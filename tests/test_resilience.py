@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from controller.adapters.base import (
+    AdapterError,
+    CircuitOpenError,
+    DeadlineExceeded,
+    Resilience,
+    ResiliencePolicy,
+    TransientAdapterError,
+    deadline,
+)
+
+FAST = ResiliencePolicy(attempts=3, base_delay=0.001, max_delay=0.001, failure_threshold=2, reset_timeout=10)
+
+
+class Flaky:
+    def __init__(self, failures, exc=TransientAdapterError):
+        self.failures = failures
+        self.exc = exc
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.exc("boom")
+        return "ok"
+
+
+def test_transient_failures_are_retried_for_idempotent_calls_only():
+    resilience = Resilience(ResiliencePolicy(attempts=3, base_delay=0.001, max_delay=0.001))
+    flaky = Flaky(2)
+    assert asyncio.run(resilience.call(flaky)) == "ok" and flaky.calls == 3
+
+    once = Flaky(1)
+    with pytest.raises(TransientAdapterError):
+        asyncio.run(resilience.call(once, idempotent=False))
+    assert once.calls == 1
+
+    client_error = Flaky(1, exc=AdapterError)
+    with pytest.raises(AdapterError):
+        asyncio.run(resilience.call(client_error))
+    assert client_error.calls == 1 and resilience.breaker.state == "closed"
+
+
+def test_breaker_opens_then_probes_after_reset_timeout():
+    now = [0.0]
+    resilience = Resilience(FAST, clock=lambda: now[0])
+    with pytest.raises(TransientAdapterError):
+        asyncio.run(resilience.call(Flaky(5)))
+    assert resilience.breaker.state == "open"
+
+    untouched = Flaky(0)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilience.call(untouched))
+    assert untouched.calls == 0
+
+    now[0] = 11.0
+    assert asyncio.run(resilience.call(untouched)) == "ok"
+    assert resilience.snapshot()["state"] == "closed"
+
+
+def test_deadline_bounds_slow_calls():
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def scenario():
+        with deadline(0.05):
+            with deadline(5):
+                await Resilience(FAST).call(slow)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+
+
+def test_caller_deadline_does_not_trip_the_breaker():
+    resilience = Resilience(FAST)
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(1)
+
+    async def scenario():
+        for _ in range(FAST.failure_threshold + 1):
+            with deadline(0.01):
+                with pytest.raises(DeadlineExceeded):
+                    await resilience.call(slow)
+        with deadline(0):  # already spent: nothing is sent
+            with pytest.raises(DeadlineExceeded):
+                await resilience.call(slow)
+
+    asyncio.run(scenario())
+    assert len(calls) == FAST.failure_threshold + 1
+    assert resilience.breaker.state == "closed" and resilience.breaker.failures == 0
+    assert asyncio.run(resilience.call(Flaky(0))) == "ok"
+
+
+def test_hedged_request_returns_first_success():
+    delays = [1.0, 0.0]
+
+    async def fetch():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    resilience = Resilience(ResiliencePolicy(hedge_delay=0.01))
+    assert asyncio.run(resilience.call(fetch, hedge=True)) == 0.0
+    assert resilience.hedges == 1
@@ -0,0 +1,54 @@
+import asyncio
+
+from controller.workers.reconciler import HostLimiter, ReconcileResult
+from controller.workers.scheduler import ReconcileScheduler
+
+
+class SlowReconciler:
+    def __init__(self) -> None:
+        self.order = []
+        self.release = asyncio.Event()
+
+    async def apply(self, stream_id, *, force=False, progress=None):
+        self.order.append((stream_id, force))
+        await self.release.wait()
+        return ReconcileResult(stream_id=stream_id, applied=1)
+
+
+def test_duplicates_coalesce_and_priority_runs_first():
+    async def scenario():
+        reconciler = SlowReconciler()
+        scheduler = ReconcileScheduler(reconciler, workers=1)
+        first = scheduler.submit(["a"])
+        await asyncio.sleep(0)
+        queued = scheduler.submit(["b", "c", "b"])
+        urgent = scheduler.submit(["c"], priority=True, force=True)
+        during = scheduler.submit(["a"])
+        assert queued["c"] is urgent["c"]
+        assert during["a"] is not first["a"]
+
+        reconciler.release.set()
+        await asyncio.gather(*first.values(), *queued.values(), *during.values())
+        await scheduler.stop()
+        return reconciler.order, scheduler.counters
+
+    order, counters = asyncio.run(scenario())
+    assert order == [("a", False), ("c", True), ("b", False), ("a", False)]
+    assert counters["coalesced"] == 1 and counters["completed"] == 4
+
+
+def test_host_limiter_caps_concurrency():
+    async def scenario():
+        limiter = HostLimiter(per_host=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot("https://nimble-a.internal"):
+                peak = max(peak, limiter.in_flight()["https://nimble-a.internal"])
+                await asyncio.sleep(0.001)
+
+        await asyncio.gather(*(call() for _ in range(10)))
+        return peak, limiter.in_flight()
+
+    assert asyncio.run(scenario()) == (2, {})
@@ -0,0 +1,45 @@
+import pytest
+
+from controller.core.policy import AuthorizationError
+from controller.core.sessions import SessionTable, TimerWheel
+
+
+def build_table(now: int = 1000) -> SessionTable:
+    return SessionTable(wheel=TimerWheel(slots=16, now=now))
+
+
+def test_admission_enforces_limit_and_release():
+    table = build_table()
+    first = table.admit("betsson", "match-1", limit=2, expires_at=1060, now=1000)
+    table.admit("betsson", "match-2", limit=2, expires_at=1060, now=1000)
+    with pytest.raises(AuthorizationError) as exc:
+        table.admit("betsson", "match-1", limit=2, expires_at=1060, now=1000)
+    assert exc.value.reason == "max_sessions_exceeded"
+
+    assert table.admit("betsson", "match-1", limit=2, expires_at=1090, session_id=first, now=1000) == first
+    assert table.release("betsson", first)
+    assert table.count("betsson") == 1
+    assert table.snapshot() == {"betsson": {"total": 1, "streams": {"match-2": 1}}}
+
+
+def test_expired_sessions_reclaimed_and_refresh_survives():
+    table = build_table()
+    refreshed = table.admit("superbet", "match-1", limit=10, expires_at=1010, now=1000)
+    table.admit("superbet", "match-1", limit=10, expires_at=1010, now=1000)
+    table.admit("superbet", "match-1", limit=10, expires_at=1100, now=1000)
+    table.admit("superbet", "match-1", limit=10, expires_at=1040, session_id=refreshed, now=1005)
+
+    assert table.expire(1020) == 1
+    assert table.count("superbet", "match-1") == 2
+    assert table.expire(1050) == 1
+    assert table.expire(1200) == 1
+    assert table.count("superbet") == 0
+
+
+def test_expiry_reports_clients_whose_counts_changed():
+    changed = []
+    table = SessionTable(wheel=TimerWheel(slots=16, now=1000), on_expire=changed.append)
+    table.admit("betsson", "match-1", limit=2, expires_at=1010, now=1000)
+    table.admit("superbet", "match-1", limit=2, expires_at=1100, now=1000)
+    assert table.expire(1005) == 0 and changed == []
+    assert table.expire(1020) == 1 and changed == [{"betsson"}]
@@ -0,0 +1,123 @@
+import asyncio
+import struct
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from controller.core.models import SignRequest
+from controller.core.policy import AuthorizationError
+from controller.core.signer import SigningKey
+import pytest
+
+from controller.shared_state import KIND_COUNTER, KIND_GAUGE, MAX_KEYS, MIN_COUNTERS, CounterTableFull, SharedState
+from controller.state import AppState
+
+
+def test_key_ring_versioning_and_eviction(tmp_path):
+    shared = SharedState(tmp_path / "state")
+    assert shared.read_keys() == (0, [], None)
+
+    version = shared.publish_key(SigningKey(kid="v1", secret=b"one"))
+    assert version == 2
+    for i in range(2, MAX_KEYS + 3):
+        version = shared.publish_key(SigningKey(kid=f"v{i}", secret=b"x"))
+
+    other = SharedState(tmp_path / "state")
+    seen_version, keys, current = other.read_keys()
+    assert seen_version == version
+    assert current == f"v{MAX_KEYS + 2}"
+    assert len(keys) == MAX_KEYS and keys[0].kid == "v3"
+
+
+def test_counters_and_gauges_sum_across_rows(tmp_path):
+    shared = SharedState(tmp_path / "state")
+    shared.register("sign_total:betsson", KIND_COUNTER)
+    shared.register("sessions:betsson", KIND_GAUGE)
+    shared.incr("sign_total:betsson")
+    shared.incr("sign_total:betsson", 4)
+    shared.set_gauge("sessions:betsson", 7)
+    shared.set_gauge("sessions:betsson", 3)
+    assert shared.totals() == {"sign_total:betsson": 5, "sessions:betsson": 3}
+
+
+def test_read_keys_retries_reads_torn_by_a_concurrent_rotation(tmp_path):
+    writer = SharedState(tmp_path / "state")
+    reader = SharedState(tmp_path / "state")
+    writer.publish_key(SigningKey(kid="k0", secret=b"s"))
+    version = writer.key_version
+    locked, release = threading.Event(), threading.Event()
+
+    def rotate():
+        with writer._locked():
+            # What a reader sees when a rotation starts after it checked the version:
+            # a header pointing past the stored keys.
+            struct.pack_into("<II", writer._mm, 16, 7, 2)
+            locked.set()
+            release.wait(1)
+            struct.pack_into("<II", writer._mm, 16, 0, 1)
+
+    thread = threading.Thread(target=rotate)
+    thread.start()
+    locked.wait(1)
+    threading.Timer(0.05, release.set).start()
+    assert reader.read_keys() == (version, [SigningKey(kid="k0", secret=b"s")], "k0")
+    thread.join()
+
+
+def test_peer_total_counts_other_live_workers_only(tmp_path):
+    path = tmp_path / "state"
+    shared = SharedState(path)
+    shared.register("sessions:betsson", KIND_GAUGE)
+    shared.set_gauge("sessions:betsson", 2)
+    peer = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from pathlib import Path; from controller.shared_state import SharedState; "
+            "s = SharedState(Path(sys.argv[1])); s.register('sessions:betsson', 2); s.set_gauge('sessions:betsson', 3); "
+            "print('ready', flush=True); sys.stdin.read()",
+            str(path),
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        cwd=Path(__file__).resolve().parent.parent,
+        text=True,
+    )
+    try:
+        assert peer.stdout.readline().strip() == "ready"
+        assert shared.peer_total("sessions:betsson") == 0  # peers are only re-read by the sweep
+        shared.refresh_peers()
+        assert shared.peer_total("sessions:betsson") == 3
+        assert shared.totals()["sessions:betsson"] == 5
+    finally:
+        peer.communicate("")
+    shared.refresh_peers()
+    assert shared.peer_total("sessions:betsson") == 0
+
+
+def test_counter_table_is_sized_by_its_creator_and_fails_loudly_when_full(tmp_path):
+    shared = SharedState(tmp_path / "state", counters=300)
+    other = SharedState(tmp_path / "state")  # later workers adopt the creator's size
+    assert shared.capacity == other.capacity == 300
+    for index in range(300):
+        shared.register(f"c{index}", KIND_COUNTER)
+    assert other.register("c7", KIND_COUNTER) == 7
+    with pytest.raises(CounterTableFull):
+        other.register("one-too-many", KIND_GAUGE)
+    with pytest.raises(KeyError):
+        other.incr("one-too-many")
+
+
+def test_signing_is_refused_when_a_client_has_no_shared_slot(tmp_path, monkeypatch):
+    path = tmp_path / "state"
+    filler = SharedState(path, counters=MIN_COUNTERS)
+    for index in range(MIN_COUNTERS - 1):
+        filler.register(f"other:{index}", KIND_COUNTER)
+    monkeypatch.setenv("CONTROLLER_SHARED_STATE", str(path))
+    state = AppState()
+    request = SignRequest(client_id="betsson", stream_id="TT-2025-10-07-001", ip="203.0.113.10", country="SE")
+    with pytest.raises(AuthorizationError) as exc:
+        asyncio.run(state.sign(request))
+    assert exc.value.reason == "session_limit_unavailable"
+    state.shared.close()
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+
+from controller.api import routes
+from controller.api.routes import NDJSON_MEDIA_TYPE, get_state, router
+from controller.state import AppState
+
+STREAM_ID = "TT-2025-10-07-001"
+OK = {"client_id": "betsson", "stream_id": STREAM_ID, "ip": "203.0.113.10", "country": "SE"}
+BLOCKED = {**OK, "country": "US"}
+UNKNOWN = {**OK, "stream_id": "no-such-stream"}
+
+
+def _app(state):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_state] = lambda: state
+    return app
+
+
+def _post(state, **kwargs):
+    async def scenario():
+        transport = httpx.ASGITransport(app=_app(state))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/v1/sign/batch", **kwargs)
+
+    # A response that polls ``receive`` for disconnects steals body messages and hangs here.
+    return asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def _ndjson(items):
+    return "".join(item if isinstance(item, str) else json.dumps(item) for item in items)
+
+
+def test_json_batch_keeps_item_order_and_reports_errors_per_item():
+    response = _post(AppState(), json={"items": [OK, BLOCKED, UNKNOWN, OK]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["error"] for result in results] == [None, "geo_not_allowed", "unknown_stream", None]
+    assert results[0]["url"] and results[0]["kid"] and results[3]["url"]
+    assert results[1]["url"] is None
+
+
+def test_json_batch_rejects_an_invalid_body():
+    response = _post(AppState(), json={"items": [{"client_id": "betsson"}]})
+    assert response.status_code == 422
+
+
+def test_ndjson_batch_streams_results_in_input_order(monkeypatch):
+    monkeypatch.setattr(routes, "BATCH_CHUNK_SIZE", 2)
+    lines = [OK, "not json", BLOCKED, UNKNOWN, OK]
+    body = "\n".join(_ndjson([line]) for line in lines) + "\n"
+    response = _post(AppState(), content=body, headers={"content-type": NDJSON_MEDIA_TYPE})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(NDJSON_MEDIA_TYPE)
+    results = [json.loads(line) for line in response.text.splitlines()]
+    # Invalid lines are reported in place, not appended at the end of their chunk.
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert [result["error"] for result in results] == [None, "invalid_request", "geo_not_allowed", "unknown_stream", None]
+    assert results[0]["url"] and results[4]["url"]
+
+
+def test_ndjson_batch_signs_chunks_while_the_body_is_still_arriving(monkeypatch):
+    monkeypatch.setattr(routes, "BATCH_CHUNK_SIZE", 2)
+    state = AppState()
+    signed = []
+    sign_batch = state.sign_batch
+
+    async def counting(items, **kwargs):
+        results = await sign_batch(items, **kwargs)
+        signed.append(len(results))
+        return results
+
+    state.sign_batch = counting
+    seen_before_last_part = []
+
+    async def body():
+        # Items split across body messages, including a line cut in half.
+        yield (json.dumps(OK) + "\n" + json.dumps(OK)[:10]).encode()
+        yield (json.dumps(OK)[10:] + "\n").encode()
+        await asyncio.sleep(0)
+        seen_before_last_part.extend(signed)
+        yield (json.dumps(BLOCKED) + "\n").encode()
+
+    response = _post(state, content=body(), headers={"content-type": NDJSON_MEDIA_TYPE})
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["error"] for result in results] == [None, None, "geo_not_allowed"]
+    # The first chunk was signed before the client finished sending.
+    assert seen_before_last_part == [2]
+    assert signed == [2, 1]
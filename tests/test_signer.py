@@ -1,7 +1,8 @@
 from datetime import datetime
 
+from controller.core.edge_auth import EdgeAuthorizer
 from controller.core.models import Client, SignRequest, Stream, StreamAdapters, PackagingSpec, IngestSpec, IngestSRT, AdapterSpec
-from controller.core.signer import SigningKey, URLSigner
+from controller.core.signer import SignedURLCache, SigningKey, URLSigner
 
 
 def build_stream() -> Stream:
@@ -48,3 +49,89 @@ def test_sign_and_verify_url():
     signature = next(v for k, v in pairs if k == "sig")
     payload = f"{stream.packaging.ll_hls_path}?" + "&".join(f"{k}={v}" for k, v in filtered)
     assert signer.verify(payload, signature=signature)
+
+
+def test_sign_many_matches_single_sign():
+    signer = URLSigner({"v1": SigningKey(kid="v1", secret=b"secret")})
+    stream = build_stream()
+    client = build_client()
+    requests = [
+        SignRequest(client_id="test", stream_id="test-stream", use_backup=False),
+        SignRequest(client_id="test", stream_id="test-stream", use_backup=True),
+    ]
+    expiry = 1700000000
+    batch = signer.sign_many((client, stream, request, expiry) for request in requests)
+
+    assert [response.url for response in batch] == [
+        signer.sign(client=client, stream=stream, request=request, expiry=expiry).url for request in requests
+    ]
+
+
+def test_signed_url_cache_buckets_and_rotation():
+    cache = SignedURLCache(max_entries=2, bucket_seconds=30)
+    signer = URLSigner({"v1": SigningKey(kid="v1", secret=b"secret")}, cache=cache)
+    stream = build_stream()
+    client = build_client()
+    request = SignRequest(client_id="test", stream_id="test-stream")
+
+    first = signer.sign(client=client, stream=stream, request=request, expiry=1700000001)
+    second = signer.sign(client=client, stream=stream, request=request, expiry=1700000009)
+    assert first.url == second.url
+    assert "exp=1700000010" in first.url
+    assert (first.ttl, second.ttl) == (client.token_ttl_seconds + 9, client.token_ttl_seconds + 1)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    signer.rotate(SigningKey(kid="v2", secret=b"other"))
+    rotated = signer.sign(client=client, stream=stream, request=request, expiry=1700000001)
+    assert rotated.kid == "v2" and rotated.url != first.url
+    assert cache.stats()["size"] == 1
+
+
+def test_verify_uri_uses_key_ring_and_expiry():
+    signer = URLSigner({"v1": SigningKey(kid="v1", secret=b"secret")})
+    stream = build_stream()
+    client = build_client()
+    request = SignRequest(client_id="test", stream_id="test-stream")
+    url = signer.sign(client=client, stream=stream, request=request, expiry=1700000000).url
+
+    signer.rotate(SigningKey(kid="v2", secret=b"other"))
+    assert signer.verify_uri(url, now=1699999999) is None
+    assert signer.verify_uri(url, now=1700000001) == "expired"
+    assert signer.verify_uri(url[:-1] + ("A" if url[-1] != "A" else "B"), now=1699999999) == "bad_signature"
+    assert signer.verify_uri(url.replace("kid=v1", "kid=v9"), now=1699999999) == "unknown_kid"
+    assert signer.verify_uri("/live/test-stream/index.m3u8", now=1699999999) == "missing_signature"
+
+
+def test_edge_authorizer_negative_cache_resets_on_rotation():
+    signer = URLSigner({"v1": SigningKey(kid="v1", secret=b"secret")})
+    request = SignRequest(client_id="test", stream_id="test-stream")
+    url = signer.sign(client=build_client(), stream=build_stream(), request=request, expiry=1700000000).url
+    future_uri = url.replace("kid=v1", "kid=v2")
+    authorizer = EdgeAuthorizer(signer)
+
+    assert authorizer.check(future_uri, now=1699999999) == "unknown_kid"
+    assert len(authorizer._negative) == 1
+    signer.rotate(SigningKey(kid="v2", secret=b"secret"))
+    assert authorizer.check(future_uri, now=1699999999) == "bad_signature"
+
+
+def test_prefix_token_covers_stream_paths():
+    signer = URLSigner({"v1": SigningKey(kid="v1", secret=b"secret")})
+    request = SignRequest(client_id="test", stream_id="test-stream", scope="prefix")
+    response = signer.sign(client=build_client(), stream=build_stream(), request=request, expiry=1700000000)
+    authorizer = EdgeAuthorizer(signer)
+
+    assert response.token and f"token={response.token}" in response.url
+    assert signer.verify_token(response.token, "/live/test-stream/720p/part12.m4s", now=1699999999) is None
+    assert signer.verify_token(response.token, "/live/other-stream/index.m3u8", now=1699999999) == "path_not_covered"
+    for escape in (
+        "/live/test-stream/../other-stream/index.m3u8",
+        "/live/test-stream/%2e%2e/other-stream/index.m3u8",
+        "/live/test-stream/%2E%2E%2Fother-stream/index.m3u8",
+        "/live/test-stream/%252e%252e/other-stream/index.m3u8",
+        "/live/test-stream/..%5Cother-stream/index.m3u8",
+    ):
+        assert signer.verify_token(response.token, escape, now=1699999999) == "path_not_covered", escape
+    assert signer.verify_token(response.token, "/live/test-stream/./720p/%70art12.m4s", now=1699999999) is None
+    assert authorizer.check("/live/test-stream/540p/seg3.m4s", token=response.token, now=1699999999) is None
+    assert authorizer.check(f"/live/test-stream/540p/index.m3u8?token={response.token}", now=1700000001) == "expired"
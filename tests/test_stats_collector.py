@@ -0,0 +1,94 @@
+import asyncio
+import math
+from pathlib import Path
+
+import pytest
+
+from controller.adapters.base import AdapterError
+from controller.config_loader import load_from_directory
+from controller.core.models import StreamStats
+from controller.repository import Repository
+from controller.workers import stats as stats_module
+from controller.workers.stats import SeriesRing, StatsCollector
+
+
+def test_ring_wraps_and_keeps_chronological_order():
+    ring = SeriesRing(capacity=3)
+    for ts in range(5):
+        ring.append(float(ts), {"cpu": ts * 10.0})
+    window = ring.window(since=0)
+    assert window["t"] == [2.0, 3.0, 4.0]
+    assert window["series"]["cpu"] == [20.0, 30.0, 40.0]
+    assert ring.latest() == {"cpu": 40.0}
+
+
+def test_late_series_are_backfilled_and_downsampled():
+    ring = SeriesRing(capacity=8)
+    ring.append(0.0, {"cpu": 1.0})
+    ring.append(1.0, {"cpu": 3.0, "part_age": 0.5})
+    ring.append(2.0, {"cpu": 5.0, "part_age": 1.5})
+    assert ring.window(0)["series"]["part_age"] == [None, 0.5, 1.5]
+    buckets = ring.downsample(0.0, 2.0)
+    assert buckets[0]["series"]["cpu"] == {"min": 1.0, "max": 3.0, "avg": 2.0}
+    assert buckets[0]["series"]["part_age"] == {"min": 0.5, "max": 0.5, "avg": 0.5}
+    assert buckets[1]["t"] == 2.0 and buckets[1]["series"]["cpu"]["avg"] == 5.0
+
+
+CONFIG_DIR = Path(__file__).resolve().parent.parent / "config"
+STREAM_ID = "TT-2025-10-07-001"
+
+
+class StatsAdapter:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def fetch_stats(self, stream_id):
+        if self.fail:
+            raise AdapterError("down")
+        return StreamStats(
+            stream_id=stream_id,
+            ingest_status="live",
+            last_part_age_seconds=0.4,
+            renditions={"720p": {"kbps": 3000}},
+        )
+
+
+def test_collector_polls_every_adapter_and_skips_failures():
+    repository = Repository.from_config(load_from_directory(CONFIG_DIR))
+    adapters = {f"{STREAM_ID}:primary": StatsAdapter(), f"{STREAM_ID}:backup": StatsAdapter(fail=True)}
+    collector = StatsCollector(adapters=adapters, repository=repository, interval=1.0, capacity=4)
+
+    assert asyncio.run(collector.collect_once()) == 1
+    assert collector.counters == {"polls": 1, "errors": 1}
+    assert collector.latest(f"{STREAM_ID}:primary").ingest_status == "live"
+    assert collector.latest(f"{STREAM_ID}:backup") is None
+    series = collector.history(f"{STREAM_ID}:primary", window=60)["series"]
+    assert series["part_age"] == [0.4] and series["renditions.720p.kbps"] == [3000.0]
+    assert math.isclose(collector.history(f"{STREAM_ID}:primary", window=60, step=30)["buckets"][0]["series"]["part_age"]["max"], 0.4)
+
+
+def test_overrunning_round_skips_missed_ticks(monkeypatch):
+    now = [0.0]
+    sleeps = []
+    durations = iter([15.0, 0.0, 0.0])
+
+    class Stop(Exception):
+        pass
+
+    async def collect_once():
+        now[0] += next(durations)
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+        if len(sleeps) == 3:
+            raise Stop
+
+    collector = StatsCollector(adapters={}, repository=Repository(), interval=5.0)
+    collector.collect_once = collect_once
+    monkeypatch.setattr(stats_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(stats_module.asyncio, "sleep", sleep)
+    with pytest.raises(Stop):
+        asyncio.run(collector._loop())
+    # Rounds were due at 5 and 10 while the first one ran; only one runs late, then the cadence resumes.
+    assert sleeps == [0.0, 5.0, 5.0]
@@ -5,7 +5,7 @@ import asyncio
 import json
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import httpx
 import typer
@@ -20,6 +20,11 @@ async def _post(path: str, payload: dict | None = None) -> httpx.Response:
         return await client.post(path, json=payload)
 
 
+async def _get(path: str) -> httpx.Response:
+    async with httpx.AsyncClient(base_url=default_api) as client:
+        return await client.get(path)
+
+
 @cli.command("import-config")
 def import_config(config_dir: Path = typer.Argument(..., exists=True, file_okay=False)) -> None:
     """Import config YAML files and show summary."""
@@ -39,10 +44,47 @@ def import_config(config_dir: Path = typer.Argument(..., exists=True, file_okay=
 
 
 @cli.command()
-def reconcile(stream_id: str) -> None:
+def reconcile(
+    stream_id: str,
+    force: bool = typer.Option(False, "--force", help="Re-apply resources even if unchanged"),
+    wait: bool = typer.Option(True, "--wait/--no-wait", help="Poll the job until it finishes"),
+    timeout: float = typer.Option(300.0, "--timeout", help="Seconds to wait for the job"),
+) -> None:
     """Trigger reconciliation for a stream via the API."""
     async def _run() -> None:
-        resp = await _post(f"/reconcile/{stream_id}")
+        resp = await _post(f"/reconcile/{stream_id}?force={str(force).lower()}")
+        resp.raise_for_status()
+        job = resp.json()
+        if not wait:
+            typer.echo(job)
+            return
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            resp = await _get(f"/jobs/{job['job_id']}")
+            resp.raise_for_status()
+            job = resp.json()
+            if job["state"] in ("succeeded", "failed"):
+                break
+            if asyncio.get_running_loop().time() >= deadline:
+                typer.echo(f"job {job['id']} still {job['state']} after {timeout:.0f}s", err=True)
+                raise typer.Exit(code=2)
+            await asyncio.sleep(1.0)
+        typer.echo(json.dumps(job, indent=2))
+        if job["state"] == "failed":
+            raise typer.Exit(code=1)
+
+    asyncio.run(_run())
+
+
+@cli.command("reconcile-all")
+def reconcile_all(
+    streams: Optional[List[str]] = typer.Argument(None, help="Streams to queue; omit for the whole fleet"),
+    priority: List[str] = typer.Option([], "--priority", help="Streams to reconcile first"),
+    force: bool = typer.Option(False, "--force", help="Re-apply resources even if unchanged"),
+) -> None:
+    """Queue many streams for reconciliation via the API."""
+    async def _run() -> None:
+        resp = await _post("/reconcile", {"streams": streams or None, "priority": priority, "force": force})
         resp.raise_for_status()
         typer.echo(resp.json())
 
@@ -53,23 +95,18 @@ def reconcile(stream_id: str) -> None:
 def sign(
     client: str = typer.Option(..., "--client"),
     stream: str = typer.Option(..., "--stream"),
-    primary: bool = typer.Option(False, "--primary"),
-    backup: bool = typer.Option(False, "--backup"),
+    primary: bool = typer.Option(False, "--primary", help="Pin the primary origin"),
+    backup: bool = typer.Option(False, "--backup", help="Pin the backup origin"),
 ) -> None:
-    """Sign a playback URL for a client."""
+    """Sign a playback URL for a client; without --primary/--backup the controller picks the origin."""
     if primary and backup:
         raise typer.BadParameter("Choose either --primary or --backup")
-    use_backup = backup
+    payload = {"client_id": client, "stream_id": stream}
+    if primary or backup:
+        payload["use_backup"] = backup
 
     async def _run() -> None:
-        resp = await _post(
-            "/sign",
-            {
-                "client_id": client,
-                "stream_id": stream,
-                "use_backup": use_backup,
-            },
-        )
+        resp = await _post("/sign", payload)
         resp.raise_for_status()
         data = resp.json()
         typer.echo(data["url"])